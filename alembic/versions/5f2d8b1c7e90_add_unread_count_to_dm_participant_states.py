@@ -0,0 +1,38 @@
+"""add unread_count to dm_participant_states
+
+Revision ID: 5f2d8b1c7e90
+Revises: e41c7a9d2b6f
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5f2d8b1c7e90'
+down_revision = 'e41c7a9d2b6f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('dm_participant_states', sa.Column(
+        'unread_count', sa.Integer(), nullable=False, server_default='0'))
+
+    # Backfill from last_read_at
+    op.execute("""
+        UPDATE dm_participant_states AS s
+        SET unread_count = (
+            SELECT COUNT(m.id)
+            FROM dm_messages AS m
+            WHERE m.thread_id = s.thread_id
+              AND m.sender_id != s.user_id
+              AND m.deleted_at IS NULL
+              AND (s.last_read_at IS NULL OR m.created_at > s.last_read_at)
+        )
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('dm_participant_states', 'unread_count')
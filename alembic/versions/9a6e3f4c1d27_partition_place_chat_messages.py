@@ -0,0 +1,122 @@
+"""partition place_chat_messages by day and add archive table
+
+Revision ID: 9a6e3f4c1d27
+Revises: 5f2d8b1c7e90
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from datetime import datetime, time, timedelta, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a6e3f4c1d27'
+down_revision = '5f2d8b1c7e90'
+branch_labels = None
+depends_on = None
+
+# Rows newer than this stay live; older rows go to the archive table
+KEEP_DAYS = 2
+DAYS_AHEAD = 3
+
+
+def _create_archive_table() -> None:
+    op.create_table(
+        'place_chat_messages_archive',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('place_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('text', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_place_chat_messages_archive_place_id',
+                    'place_chat_messages_archive', ['place_id'])
+    op.create_index('ix_place_chat_messages_archive_user_id',
+                    'place_chat_messages_archive', ['user_id'])
+
+
+def upgrade() -> None:
+    _create_archive_table()
+
+    if op.get_bind().dialect.name != 'postgresql':
+        op.create_index('ix_place_chat_messages_place_created',
+                        'place_chat_messages', ['place_id', 'created_at'])
+        return
+
+    # Range partitions require the partition key in the primary key
+    op.execute("""
+        CREATE TABLE place_chat_messages_new (
+            id VARCHAR(36) NOT NULL,
+            place_id INTEGER NOT NULL REFERENCES places(id) ON DELETE CASCADE,
+            user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+            text TEXT NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
+        ) PARTITION BY RANGE (created_at)
+    """)
+
+    today = datetime.now(timezone.utc).date()
+    first_day = today - timedelta(days=KEEP_DAYS)
+    for offset in range(KEEP_DAYS + DAYS_AHEAD + 1):
+        day = first_day + timedelta(days=offset)
+        start = datetime.combine(day, time.min, tzinfo=timezone.utc)
+        end = start + timedelta(days=1)
+        op.execute(
+            f"CREATE TABLE place_chat_messages_p{day:%Y%m%d} PARTITION OF place_chat_messages_new "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+    # Catches rows outside the pre-created days so inserts never fail. The
+    # retention job moves a day's rows out of it when creating that day's
+    # partition and expires old rows left in it.
+    op.execute("CREATE TABLE place_chat_messages_default PARTITION OF place_chat_messages_new DEFAULT")
+
+    cutoff = datetime.combine(first_day, time.min, tzinfo=timezone.utc).isoformat()
+    op.execute(f"""
+        INSERT INTO place_chat_messages_archive (id, place_id, user_id, text, created_at)
+        SELECT id, place_id, user_id, text, created_at
+        FROM place_chat_messages WHERE created_at < '{cutoff}'
+    """)
+    op.execute(f"""
+        INSERT INTO place_chat_messages_new (id, place_id, user_id, text, created_at)
+        SELECT id, place_id, user_id, text, created_at
+        FROM place_chat_messages WHERE created_at >= '{cutoff}'
+    """)
+
+    op.execute("DROP TABLE place_chat_messages")
+    op.execute("ALTER TABLE place_chat_messages_new RENAME TO place_chat_messages")
+    op.execute("ALTER TABLE place_chat_messages ADD PRIMARY KEY (id, created_at)")
+    op.create_index('ix_place_chat_messages_place_id', 'place_chat_messages', ['place_id'])
+    op.create_index('ix_place_chat_messages_user_id', 'place_chat_messages', ['user_id'])
+    op.create_index('ix_place_chat_messages_place_created',
+                    'place_chat_messages', ['place_id', 'created_at'])
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        op.drop_index('ix_place_chat_messages_place_created', table_name='place_chat_messages')
+    else:
+        op.execute("ALTER TABLE place_chat_messages RENAME TO place_chat_messages_partitioned")
+        op.execute("""
+            CREATE TABLE place_chat_messages (
+                id VARCHAR(36) NOT NULL PRIMARY KEY,
+                place_id INTEGER NOT NULL REFERENCES places(id) ON DELETE CASCADE,
+                user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+                text TEXT NOT NULL,
+                created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
+            )
+        """)
+        op.execute("""
+            INSERT INTO place_chat_messages (id, place_id, user_id, text, created_at)
+            SELECT id, place_id, user_id, text, created_at FROM place_chat_messages_partitioned
+        """)
+        # Dropping the parent drops every partition
+        op.execute("DROP TABLE place_chat_messages_partitioned")
+        op.create_index('ix_place_chat_messages_place_id', 'place_chat_messages', ['place_id'])
+        op.create_index('ix_place_chat_messages_user_id', 'place_chat_messages', ['user_id'])
+
+    op.drop_index('ix_place_chat_messages_archive_user_id', table_name='place_chat_messages_archive')
+    op.drop_index('ix_place_chat_messages_archive_place_id', table_name='place_chat_messages_archive')
+    op.drop_table('place_chat_messages_archive')
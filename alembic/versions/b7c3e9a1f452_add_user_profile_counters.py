@@ -0,0 +1,42 @@
+"""add materialized profile counters to users
+
+Revision ID: b7c3e9a1f452
+Revises: 9a6e3f4c1d27
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7c3e9a1f452'
+down_revision = '9a6e3f4c1d27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column(
+        'followers_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('users', sa.Column(
+        'following_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('users', sa.Column(
+        'check_ins_count', sa.Integer(), nullable=False, server_default='0'))
+
+    # Backfill from follows and check_ins
+    op.execute("""
+        UPDATE users AS u
+        SET followers_count = (
+                SELECT COUNT(f.id) FROM follows AS f WHERE f.followee_id = u.id),
+            following_count = (
+                SELECT COUNT(f.id) FROM follows AS f WHERE f.follower_id = u.id),
+            check_ins_count = (
+                SELECT COUNT(c.id) FROM check_ins AS c WHERE c.user_id = u.id)
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'check_ins_count')
+    op.drop_column('users', 'following_count')
+    op.drop_column('users', 'followers_count')
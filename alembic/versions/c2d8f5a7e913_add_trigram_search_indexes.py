@@ -0,0 +1,50 @@
+"""add pg_trgm GIN indexes for place and user search
+
+Revision ID: c2d8f5a7e913
+Revises: b7c3e9a1f452
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2d8f5a7e913'
+down_revision = 'b7c3e9a1f452'
+branch_labels = None
+depends_on = None
+
+# (index name, table, column); keep in sync with services/search_service.py
+TRIGRAM_INDEXES = [
+    ('ix_places_name_trgm', 'places', 'name'),
+    ('ix_places_categories_trgm', 'places', 'categories'),
+    ('ix_places_address_trgm', 'places', 'address'),
+    ('ix_places_city_trgm', 'places', 'city'),
+    ('ix_users_username_trgm', 'users', 'username'),
+    ('ix_users_name_trgm', 'users', 'name'),
+]
+
+
+def upgrade() -> None:
+    # Trigram indexes are PostgreSQL only; other databases search unindexed
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Build without blocking writes on large tables
+    with op.get_context().autocommit_block():
+        for name, table, column in TRIGRAM_INDEXES:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+                f"ON {table} USING gin ({column} gin_trgm_ops)"
+            )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    with op.get_context().autocommit_block():
+        for name, _, _ in TRIGRAM_INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
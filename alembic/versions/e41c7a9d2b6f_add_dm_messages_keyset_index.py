@@ -0,0 +1,31 @@
+"""add dm_messages (thread_id, created_at, id) index
+
+Revision ID: e41c7a9d2b6f
+Revises: abc123456789
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e41c7a9d2b6f'
+down_revision = 'abc123456789'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Composite index for keyset pagination of thread history
+    op.create_index(
+        'ix_dm_messages_thread_created_id',
+        'dm_messages',
+        ['thread_id', 'created_at', 'id'],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_dm_messages_thread_created_id',
+                  table_name='dm_messages', if_exists=True)
@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings
 from pydantic import Field
-from typing import Optional, List
+from typing import Dict, Optional, List
 from typing import Optional
 
 
@@ -100,6 +100,19 @@ class Settings(BaseSettings):
     # DM behavior
     # If true, bypass DM request gate and auto-accept new threads (still respects blocks)
     dm_allow_direct: bool = Field(default=True, env="DM_ALLOW_DIRECT")
+    # Typing indicators are kept in memory only
+    typing_ttl_seconds: float = Field(default=5.0, env="TYPING_TTL_SECONDS")
+    typing_rebroadcast_seconds: float = Field(
+        default=2.0, env="TYPING_REBROADCAST_SECONDS")
+
+    # WebSocket chat messages are written in small batches
+    message_batch_max_latency_ms: float = Field(
+        default=5.0, env="MESSAGE_BATCH_MAX_LATENCY_MS")
+    message_batch_max_size: int = Field(
+        default=100, env="MESSAGE_BATCH_MAX_SIZE")
+
+    # Cross-node events: "local" (single node) or "postgres" (LISTEN/NOTIFY)
+    event_bus_backend: str = Field(default="local", env="EVENT_BUS_BACKEND")
 
     # Timeouts
     http_timeout_seconds: int = Field(default=30, env="HTTP_TIMEOUT_SECONDS")
@@ -142,6 +155,134 @@ class Settings(BaseSettings):
     photo_aggregation_hours: int = Field(
         default=6, env="PHOTO_AGGREGATION_HOURS"
     )
+    # Retention: messages older than this (never less than the chat window)
+    # are dropped or moved to place_chat_messages_archive
+    place_chat_retention_enabled: bool = Field(
+        default=True, env="PLACE_CHAT_RETENTION_ENABLED"
+    )
+    place_chat_retention_hours: int = Field(
+        default=48, env="PLACE_CHAT_RETENTION_HOURS"
+    )
+    # "archive" or "drop"
+    place_chat_retention_mode: str = Field(
+        default="archive", env="PLACE_CHAT_RETENTION_MODE"
+    )
+    place_chat_retention_interval_minutes: int = Field(
+        default=60, env="PLACE_CHAT_RETENTION_INTERVAL_MINUTES"
+    )
+    # Daily partitions created ahead of time on PostgreSQL
+    place_chat_partition_days_ahead: int = Field(
+        default=3, env="PLACE_CHAT_PARTITION_DAYS_AHEAD"
+    )
+    # Recent messages kept in memory per active room, and rooms kept
+    place_chat_buffer_size: int = Field(
+        default=200, env="PLACE_CHAT_BUFFER_SIZE"
+    )
+    place_chat_buffer_max_rooms: int = Field(
+        default=1000, env="PLACE_CHAT_BUFFER_MAX_ROOMS"
+    )
+
+    # Place detail responses (viewer-independent part), invalidated on check-in
+    place_detail_cache_ttl_seconds: int = Field(
+        default=30, env="PLACE_DETAIL_CACHE_TTL_SECONDS"
+    )
+    place_detail_cache_max_entries: int = Field(
+        default=5000, env="PLACE_DETAIL_CACHE_MAX_ENTRIES"
+    )
+
+    # Per-place check-in counts and recent photos, invalidated on check-in
+    place_stats_cache_ttl_seconds: int = Field(
+        default=60, env="PLACE_STATS_CACHE_TTL_SECONDS"
+    )
+    place_stats_cache_max_entries: int = Field(
+        default=20000, env="PLACE_STATS_CACHE_MAX_ENTRIES"
+    )
+
+    # Followee ids per user kept in memory for follow checks
+    follow_graph_cache_ttl_seconds: int = Field(
+        default=600, env="FOLLOW_GRAPH_CACHE_TTL_SECONDS"
+    )
+    follow_graph_cache_max_users: int = Field(
+        default=10000, env="FOLLOW_GRAPH_CACHE_MAX_USERS"
+    )
+
+    # Collection cover photos per collection (dropped when its places change)
+    collection_cover_cache_ttl_seconds: int = Field(
+        default=300, env="COLLECTION_COVER_CACHE_TTL_SECONDS"
+    )
+    collection_cover_cache_max_entries: int = Field(
+        default=20000, env="COLLECTION_COVER_CACHE_MAX_ENTRIES"
+    )
+
+    # Periodic repair of the materialized profile counters
+    user_counters_reconcile_enabled: bool = Field(
+        default=True, env="USER_COUNTERS_RECONCILE_ENABLED"
+    )
+    user_counters_reconcile_interval_minutes: int = Field(
+        default=360, env="USER_COUNTERS_RECONCILE_INTERVAL_MINUTES"
+    )
+
+    # Search type-ahead: rebuild interval, places suggested by name, and the
+    # most keys scanned per prefix lookup
+    autocomplete_refresh_minutes: int = Field(
+        default=60, env="AUTOCOMPLETE_REFRESH_MINUTES"
+    )
+    autocomplete_max_places: int = Field(
+        default=200000, env="AUTOCOMPLETE_MAX_PLACES"
+    )
+    autocomplete_max_scan: int = Field(
+        default=5000, env="AUTOCOMPLETE_MAX_SCAN"
+    )
+
+    # In-memory country/city/neighborhood lookups; reloaded from the
+    # database on this interval, with new values added from place events.
+    lookup_refresh_minutes: int = Field(
+        default=30, env="LOOKUP_REFRESH_MINUTES"
+    )
+
+    # Offline gazetteer built by scripts/build_gazetteer.py; empty means
+    # app/data/gazetteer.json (the Docker image sets its own build)
+    gazetteer_path: str = Field(default="", env="GAZETTEER_PATH")
+    # Optional GeoNames web API fallback for countries the gazetteer does not
+    # cover and cities it has no neighborhoods for; off so lookups stay local
+    geonames_fallback: bool = Field(default=False, env="GEONAMES_FALLBACK")
+    geonames_username: str = Field(default="demo", env="GEONAMES_USERNAME")
+    geonames_timeout_seconds: float = Field(
+        default=3.0, env="GEONAMES_TIMEOUT_SECONDS")
+    geonames_cache_ttl_seconds: int = Field(
+        default=86400, env="GEONAMES_CACHE_TTL_SECONDS")
+
+    # Offline reverse geocoding from bundled boundaries (override with a
+    # scripts/build_boundaries.py build); Nominatim is only asked when the
+    # local lookup finds no city or neighborhood and the fallback is enabled.
+    # Off by default: the seed has no neighborhoods, so it would be asked for
+    # every new place
+    boundaries_path: str = Field(default="", env="BOUNDARIES_PATH")
+    reverse_geocode_nominatim_fallback: bool = Field(
+        default=False, env="REVERSE_GEOCODE_NOMINATIM_FALLBACK"
+    )
+
+    # Response cache for public, user-independent GET endpoints.
+    # Keys are paths, or prefixes ending in "/"; values are TTLs in seconds.
+    response_cache_enabled: bool = Field(
+        default=True, env="RESPONSE_CACHE_ENABLED"
+    )
+    response_cache_ttls: Dict[str, int] = Field(
+        default={
+            "/places/trending": 60,
+            "/places/nearby": 60,
+            "/places/lookups/": 300,
+            "/lookups/cities/all": 3600,
+        },
+        env="RESPONSE_CACHE_TTLS",
+    )
+    # Decimal places kept for lat/lng in cache keys (3 is roughly 110 m)
+    response_cache_coord_precision: int = Field(
+        default=3, env="RESPONSE_CACHE_COORD_PRECISION"
+    )
+    response_cache_max_entries: int = Field(
+        default=5000, env="RESPONSE_CACHE_MAX_ENTRIES"
+    )
 
     # Auto-seeding
     autoseed_enabled: bool = Field(default=True, env="AUTOSEED_ENABLED")
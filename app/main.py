@@ -17,6 +17,8 @@ from .database import create_tables
 from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
 from .config import settings
+from .response_cache import ResponseCacheMiddleware
+from .utils import FastJSONResponse
 import uuid
 from fastapi import Request
 from fastapi import HTTPException
@@ -125,8 +127,64 @@ async def lifespan(app: FastAPI):
     # except Exception as e:
     #     logger.error(f"Auto-seeding error: {e}")
 
+    # Cross-node event delivery (typing indicators, cache invalidation)
+    try:
+        from .services.event_bus import event_bus
+        await event_bus.start()
+    except RuntimeError:
+        raise
+    except Exception as e:
+        logger.error(f"Error starting event bus: {e}")
+
+    # Active check-ins for who's-here and chat gating
+    try:
+        from .services.presence_index import presence_index
+        await presence_index.load()
+    except Exception as e:
+        logger.error(f"Error loading presence index: {e}")
+
+    # Offline gazetteer for the city and neighborhood pickers
+    try:
+        from .services.gazetteer import gazetteer
+        gazetteer.ensure_loaded()
+    except Exception as e:
+        logger.error(f"Error loading gazetteer: {e}")
+
+    # Bundled boundaries for offline reverse geocoding of new places
+    try:
+        from .services.reverse_geocoder import reverse_geocoder
+        reverse_geocoder.ensure_loaded()
+    except Exception as e:
+        logger.error(f"Error loading reverse geocoder boundaries: {e}")
+
+    # Scheduled expiry of old place chat messages
+    try:
+        from .services.place_chat_retention import place_chat_retention
+        place_chat_retention.start()
+    except Exception as e:
+        logger.error(f"Error starting place chat retention: {e}")
+
+    # Scheduled repair of profile counter drift
+    try:
+        from .services.user_counters import user_counter_reconciler
+        user_counter_reconciler.start()
+    except Exception as e:
+        logger.error(f"Error starting profile counter reconciler: {e}")
+
     yield
 
+    try:
+        from .services.place_chat_retention import place_chat_retention
+        await place_chat_retention.stop()
+    except Exception as e:
+        logger.error(f"Error stopping place chat retention: {e}")
+
+    try:
+        from .services.user_counters import user_counter_reconciler
+        await user_counter_reconciler.stop()
+    except Exception as e:
+        logger.error(f"Error stopping profile counter reconciler: {e}")
+
     # Shutdown WebSocket connection manager
     try:
         from .routers.dms_ws import manager
@@ -134,6 +192,20 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Error shutting down WebSocket manager: {e}")
 
+    # Flush chat messages still waiting in the write-behind batchers
+    try:
+        from .services.message_batcher import dm_message_batcher, place_chat_batcher
+        await dm_message_batcher.stop()
+        await place_chat_batcher.stop()
+    except Exception as e:
+        logger.error(f"Error flushing message batchers: {e}")
+
+    try:
+        from .services.event_bus import event_bus
+        await event_bus.stop()
+    except Exception as e:
+        logger.error(f"Error stopping event bus: {e}")
+
 
 app = FastAPI(
     title="Circles - Social Location App",
@@ -222,7 +294,8 @@ All endpoints return consistent error responses with descriptive messages.
         "name": "MIT",
         "url": "https://opensource.org/licenses/MIT",
     },
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
 # Include routers
@@ -242,6 +315,10 @@ app.include_router(debug_router)
 # Serve uploaded media
 app.mount("/media", StaticFiles(directory="media"), name="media")
 
+# Whole-response cache for public place and lookup endpoints. Registered
+# before CORS so CORS wraps it and adds per-Origin headers to cached replies.
+app.add_middleware(ResponseCacheMiddleware)
+
 # CORS for UI
 app.add_middleware(
     CORSMiddleware,
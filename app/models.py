@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text, Float, UniqueConstraint, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text, Float, UniqueConstraint, JSON, Index
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -48,6 +48,14 @@ class User(Base):
     availability_mode = Column(String, nullable=False,
                                server_default="auto")
 
+    # Materialized profile counters (see services/user_counters.py)
+    followers_count = Column(Integer, nullable=False,
+                             default=0, server_default="0")
+    following_count = Column(Integer, nullable=False,
+                             default=0, server_default="0")
+    check_ins_count = Column(Integer, nullable=False,
+                             default=0, server_default="0")
+
     # Relationships
     otp_codes = relationship("OTPCode", back_populates="user")
     check_ins = relationship("CheckIn", back_populates="user")
@@ -353,6 +361,25 @@ class PlaceChatMessage(Base):
     place = relationship("Place")
     user = relationship("User")
 
+    # On PostgreSQL the table is range-partitioned by day on created_at (the
+    # database primary key is (id, created_at)); see
+    # services/place_chat_retention.py
+    __table_args__ = (
+        Index('ix_place_chat_messages_place_created', 'place_id', 'created_at'),
+    )
+
+
+class PlaceChatMessageArchive(Base):
+    """Place chat messages moved out of the live table by the retention job."""
+    __tablename__ = "place_chat_messages_archive"
+
+    id = Column(String(36), primary_key=True)
+    place_id = Column(Integer, nullable=False, index=True)
+    user_id = Column(Integer, nullable=False, index=True)
+    text = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
 
 class DMMessage(Base):
     __tablename__ = "dm_messages"
@@ -429,6 +456,12 @@ class DMMessage(Base):
         "User", foreign_keys=[forwarded_from_user_id])
     deleted_by_user = relationship("User", foreign_keys=[deleted_by_user_id])
 
+    # Backs keyset pagination of a thread's history on (created_at, id)
+    __table_args__ = (
+        Index('ix_dm_messages_thread_created_id',
+              'thread_id', 'created_at', 'id'),
+    )
+
 
 class DMMessageLike(Base):
     __tablename__ = "dm_message_likes"
@@ -479,6 +512,9 @@ class DMParticipantState(Base):
     pinned = Column(Boolean, default=False)
     archived = Column(Boolean, default=False)
     typing_until = Column(DateTime(timezone=True), nullable=True)
+    # Maintained on message insert / mark read; see services/dm_unread_service.py
+    unread_count = Column(Integer, nullable=False,
+                          default=0, server_default='0')
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True),
                         server_default=func.now(), onupdate=func.now())
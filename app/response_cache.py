@@ -0,0 +1,124 @@
+"""
+Response cache middleware for public GET endpoints.
+
+Routes listed in ``settings.response_cache_ttls`` return the same body for
+every caller, so whole responses are cached in memory. Keys combine the path
+with the sorted query string; latitude and longitude are rounded to
+``response_cache_coord_precision`` decimals so nearby requests share an
+entry. Responses carry an ETag and ``Cache-Control: public, max-age=<ttl>``
+so CDNs and clients can cache too; ``If-None-Match`` gets a 304.
+
+Entries for place routes are dropped whenever places are written (see
+services.place_events).
+"""
+import hashlib
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import Response
+
+from .config import settings
+from .services.event_bus import event_bus
+from .services.place_events import PLACES_CHANGED_TOPIC
+from .services.ttl_cache import TTLCache
+
+COORD_PARAMS = {"lat", "lng", "lon", "latitude", "longitude"}
+# Hop-by-hop or per-response headers that must not be replayed from cache
+SKIP_HEADERS = {"content-length", "x-request-id", "etag", "cache-control"}
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    headers: List[Tuple[str, str]]
+    etag: str
+    ttl: int
+
+
+response_cache = TTLCache(
+    ttl_seconds=60,
+    max_entries=settings.response_cache_max_entries,
+)
+
+
+def route_ttl(path: str) -> Optional[int]:
+    """TTL configured for a path, matching exact paths before prefixes."""
+    ttls = settings.response_cache_ttls
+    if path in ttls:
+        return ttls[path]
+    for prefix, ttl in ttls.items():
+        if prefix.endswith("/") and path.startswith(prefix):
+            return ttl
+    return None
+
+
+def cache_key(path: str, query_items: List[Tuple[str, str]]) -> str:
+    params = []
+    for name, value in query_items:
+        if name in COORD_PARAMS:
+            try:
+                value = f"{float(value):.{settings.response_cache_coord_precision}f}"
+            except ValueError:
+                pass
+        params.append((name, value))
+    query = "&".join(f"{name}={value}" for name, value in sorted(params))
+    return f"{path}?{query}"
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return etag in candidates
+
+
+def _cached_response(entry: CachedResponse, request: Request, hit: bool) -> Response:
+    headers = {
+        "ETag": entry.etag,
+        "Cache-Control": f"public, max-age={entry.ttl}",
+        "X-Cache": "HIT" if hit else "MISS",
+    }
+    if _etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, status_code=200,
+                    headers={**dict(entry.headers), **headers})
+
+
+class ResponseCacheMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        if not settings.response_cache_enabled or request.method != "GET":
+            return await call_next(request)
+        ttl = route_ttl(request.url.path)
+        if ttl is None:
+            return await call_next(request)
+
+        key = cache_key(request.url.path, list(request.query_params.multi_items()))
+        entry = response_cache.get(key)
+        if entry is not None:
+            return _cached_response(entry, request, hit=True)
+
+        response = await call_next(request)
+        if response.status_code != 200:
+            return response
+
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        entry = CachedResponse(
+            body=body,
+            headers=[(name, value) for name, value in response.headers.items()
+                     if name.lower() not in SKIP_HEADERS],
+            etag=f'"{hashlib.sha1(body).hexdigest()}"',
+            ttl=ttl,
+        )
+        response_cache.set(key, entry, ttl_seconds=ttl)
+        return _cached_response(entry, request, hit=False)
+
+
+def invalidate_place_responses(payload: Optional[Dict[str, Any]] = None) -> None:
+    """Drop cached responses of place routes after a place write."""
+    response_cache.invalidate_where(
+        lambda key: key.startswith(("/places/", "/lookups/")))
+
+
+event_bus.subscribe(PLACES_CHANGED_TOPIC, invalidate_place_responses)
@@ -6,8 +6,7 @@ from ..schemas import PhoneOTPRequest, PhoneOTPVerify, OTPResponse, AuthResponse
 from ..services.otp_service import OTPService
 from ..services.jwt_service import JWTService, security
 from ..services.storage import StorageService
-from ..models import User, Follow, CheckIn
-from sqlalchemy import select, func
+from ..models import User
 from ..config import settings
 from datetime import datetime, timedelta, timezone
 
@@ -143,20 +142,6 @@ async def get_current_user(
     - Verify authentication status
     """
     try:
-        followers_count = await db.scalar(
-            select(func.count(Follow.id)).where(
-                Follow.followee_id == current_user.id)
-        )
-        following_count = await db.scalar(
-            select(func.count(Follow.id)).where(
-                Follow.follower_id == current_user.id)
-        )
-
-        check_in_count = await db.scalar(
-            select(func.count(CheckIn.id)).where(
-                CheckIn.user_id == current_user.id)
-        )
-
         return UserResponse(
             id=current_user.id,
             phone=current_user.phone,
@@ -168,9 +153,9 @@ async def get_current_user(
             availability_status=current_user.availability_status,
             availability_mode=current_user.availability_mode,
             created_at=current_user.created_at,
-            followers_count=followers_count or 0,
-            following_count=following_count or 0,
-            check_in_count=check_in_count or 0,
+            followers_count=current_user.followers_count or 0,
+            following_count=current_user.following_count or 0,
+            check_in_count=current_user.check_ins_count or 0,
         )
     except Exception as e:
         raise HTTPException(
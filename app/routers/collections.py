@@ -5,18 +5,18 @@ from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 import sqlalchemy as sa
-from sqlalchemy import and_, desc, func, select
+from sqlalchemy import desc, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..config import settings
 from ..database import get_db
+from ..services.collection_covers import fetch_cover_photos
 from ..services.collection_sync import ensure_default_collection
 from ..services.jwt_service import JWTService
+from ..services.place_stats import checkin_totals, recent_photos
 from ..services.storage import StorageService
 from ..utils import can_view_collection
 from ..models import (
-    CheckIn,
-    CheckInPhoto,
     Place,
     User,
     UserCollection,
@@ -92,28 +92,11 @@ async def _fetch_collection_responses(
         for row in counts_result.fetchall()
     }
 
+    covers = await fetch_cover_photos(db, collection_ids)
+
     responses: list[CollectionResponse] = []
     for collection in collections:
-        photos_query = (
-            select(CheckInPhoto.url)
-            .join(CheckIn, CheckInPhoto.check_in_id == CheckIn.id)
-            .join(
-                UserCollectionPlace,
-                UserCollectionPlace.place_id == CheckIn.place_id,
-            )
-            .where(
-                and_(
-                    UserCollectionPlace.collection_id == collection.id,
-                    CheckInPhoto.url.isnot(None),
-                )
-            )
-            .order_by(desc(CheckInPhoto.created_at))
-            .limit(3)
-        )
-
-        photos_result = await db.execute(photos_query)
-        photo_urls = [row[0] for row in photos_result.fetchall()]
-        photo_urls = [p for p in _convert_to_signed_urls(photo_urls) if p]
+        photo_urls = [p for p in _convert_to_signed_urls(covers[collection.id]) if p]
 
         visibility_value = collection.visibility or (
             "public" if collection.is_public else "private"
@@ -245,38 +228,24 @@ async def get_collection_items(
     )
     place_rows = await db.execute(places_stmt)
 
+    rows = place_rows.all()
+    page_place_ids = [place.id for _, place in rows]
+    checkin_counts = await checkin_totals(db, page_place_ids)
+    photos_by_place = await recent_photos(db, page_place_ids)
+
     items: list[CollectionPlaceResponse] = []
-    for association, place in place_rows.all():
+    for association, place in rows:
         photo_candidate = place.photo_url
         signed_photo = _convert_to_signed_url(photo_candidate)
 
-        photos_query = (
-            select(CheckInPhoto.url)
-            .join(CheckIn, CheckInPhoto.check_in_id == CheckIn.id)
-            .where(
-                and_(
-                    CheckIn.place_id == place.id,
-                    CheckInPhoto.url.isnot(None),
-                )
-            )
-            .order_by(desc(CheckInPhoto.created_at))
-            .limit(3)
-        )
-        photos_result = await db.execute(photos_query)
-        user_photo_urls = [row[0] for row in photos_result.fetchall()]
-        signed_user_photos = _convert_to_signed_urls(user_photo_urls)
+        signed_user_photos = _convert_to_signed_urls(photos_by_place[place.id])
         combined_photo_urls: list[str] = []
         if signed_user_photos:
             combined_photo_urls.extend(signed_user_photos)
         elif signed_photo:
             combined_photo_urls.append(signed_photo)
 
-        checkin_count = (
-            await db.execute(
-                select(func.count(CheckIn.id)).where(
-                    CheckIn.place_id == place.id)
-            )
-        ).scalar_one()
+        checkin_count = checkin_counts[place.id]
 
         items.append(
             CollectionPlaceResponse(
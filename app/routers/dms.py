@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, UploadFile, File
 from datetime import datetime, timezone, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_, and_, func, desc, nullslast
+from sqlalchemy import delete, select, or_, and_, func, nullslast, tuple_
 from sqlalchemy.orm import aliased
 from sqlalchemy.sql import expression as sql_expr
 from typing import Optional
@@ -12,6 +12,11 @@ from ..config import settings
 from ..services.storage import StorageService
 from ..services.block_service import has_block_between
 from ..services.websocket_service import WebSocketService
+from ..services.typing_store import typing_store
+from ..services.dm_unread_service import increment_unread, mark_thread_read, get_total_unread
+from ..services.follow_graph import follow_graph
+from ..services.user_counters import record_follow
+from .dms_ws import invalidate_thread_context, manager
 from ..schemas import (
     DMThreadResponse,
     PaginatedDMThreads,
@@ -42,6 +47,7 @@ from ..schemas import (
     LocationShareRequest,
 )
 from ..services.jwt_service import JWTService
+from ..utils import encode_cursor, decode_cursor, FastJSONResponse
 # from ..routers.users import _convert_single_to_signed_url  # Function removed in cleaned version
 
 
@@ -90,6 +96,18 @@ router = APIRouter(
     tags=["direct messages"],
 )
 
+
+async def _get_thread_for_participant(db: AsyncSession, thread_id: int, user_id: int) -> DMThread:
+    res = await db.execute(select(DMThread).where(DMThread.id == thread_id))
+    thread = res.scalar_one_or_none()
+    if not thread:
+        raise HTTPException(status_code=404, detail="Thread not found")
+    if user_id not in (thread.user_a_id, thread.user_b_id):
+        raise HTTPException(
+            status_code=403, detail="You are not part of this conversation")
+    return thread
+
+
 # ============================================================================
 # DM INBOX ENDPOINT (Used by frontend)
 # ============================================================================
@@ -98,68 +116,127 @@ router = APIRouter(
 @router.get("/inbox", response_model=PaginatedDMThreads)
 async def get_inbox(
     limit: int = Query(20, ge=1, le=100),
-    offset: int = Query(0, ge=0),
+    offset: int = Query(0, ge=0, description="Deprecated; use the before cursor"),
+    before: Optional[str] = Query(
+        None, description="Cursor; return threads updated before this position"),
+    include_total: bool = Query(
+        False, description="Also compute the exact thread count (slower)"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(JWTService.get_current_user),
 ):
     """
-    Get user's DM inbox with pagination.
+    Get user's DM inbox, most recently updated first.
+
+    Threads, the other participant, the last message and the materialized
+    unread count are loaded in a single query. Pass `next_cursor` as `before` for the next page.
 
     **Authentication Required:** Yes
     """
     try:
-        # Get threads where user is a participant
-        query = select(DMThread).join(DMParticipantState).where(
-            and_(
-                DMParticipantState.user_id == current_user.id,
-                DMParticipantState.blocked == False
+        me = aliased(DMParticipantState)
+        other_state = aliased(DMParticipantState)
+        other_user = aliased(User)
+        last_message = aliased(DMMessage)
+
+        other_user_id = sql_expr.case(
+            (DMThread.user_a_id == current_user.id, DMThread.user_b_id),
+            else_=DMThread.user_a_id,
+        )
+        # Latest message per thread; served by ix_dm_messages_thread_created_id
+        last_message_id = (
+            select(DMMessage.id)
+            .where(DMMessage.thread_id == DMThread.id)
+            .order_by(DMMessage.created_at.desc(), DMMessage.id.desc())
+            .limit(1)
+            .correlate(DMThread)
+            .scalar_subquery()
+        )
+        query = (
+            select(
+                DMThread,
+                other_user,
+                me.muted,
+                other_state.blocked,
+                last_message.text,
+                last_message.sender_id,
+                last_message.created_at,
+                last_message.deleted_at,
+                me.unread_count,
             )
-        ).order_by(desc(DMThread.updated_at))
+            .join(me, and_(me.thread_id == DMThread.id, me.user_id == current_user.id))
+            .join(other_user, other_user.id == other_user_id)
+            .outerjoin(other_state, and_(
+                other_state.thread_id == DMThread.id,
+                other_state.user_id == other_user.id,
+            ))
+            .outerjoin(last_message, last_message.id == last_message_id)
+            .where(me.blocked == False)
+        )
 
-        # Get total count
-        count_query = select(func.count()).select_from(query.subquery())
-        total_result = await db.execute(count_query)
-        total = total_result.scalar()
+        total = None
+        if include_total:
+            count_query = (
+                select(func.count(me.id))
+                .where(me.user_id == current_user.id, me.blocked == False)
+            )
+            total = (await db.execute(count_query)).scalar()
 
-        # Apply pagination
-        query = query.offset(offset).limit(limit)
-        result = await db.execute(query)
-        threads = result.scalars().all()
+        if before:
+            query = query.where(
+                tuple_(DMThread.updated_at, DMThread.id) < tuple_(*decode_cursor(before)))
+        elif offset:
+            query = query.offset(offset)
+        query = query.order_by(
+            DMThread.updated_at.desc(), DMThread.id.desc()).limit(limit + 1)
 
-        # Convert to response format
-        thread_responses = []
-        for thread in threads:
-            # Determine which user is the "other" user
-            other_user_id = thread.user_b_id if thread.user_a_id == current_user.id else thread.user_a_id
-
-            # Get other user details
-            other_user_query = select(User).where(User.id == other_user_id)
-            other_result = await db.execute(other_user_query)
-            other_user = other_result.scalar_one_or_none()
-
-            if other_user:
-                thread_resp = DMThreadResponse(
-                    id=thread.id,
-                    user_a_id=thread.user_a_id,
-                    user_b_id=thread.user_b_id,
-                    initiator_id=thread.initiator_id,
-                    status=thread.status,
-                    created_at=thread.created_at,
-                    updated_at=thread.updated_at,
-                    other_user_name=other_user.name,
-                    other_user_username=other_user.username,
-                    other_user_avatar=_convert_single_to_signed_url(
-                        other_user.avatar_url),
-                    last_message=None,  # TODO: Get last message
-                    last_message_time=thread.updated_at,
-                    is_muted=False,  # TODO: Get mute status
-                    is_blocked=False,  # TODO: Get block status
-                    sender_photo_url=None,  # TODO: Get last message sender photo
-                )
-                thread_responses.append(thread_resp)
+        rows = (await db.execute(query)).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
 
-        return PaginatedDMThreads(items=thread_responses, total=total, limit=limit, offset=offset)
+        # Sign each avatar once, however many threads it appears in
+        avatars = {current_user.id: _convert_single_to_signed_url(
+            current_user.avatar_url)}
 
+        thread_responses = []
+        for thread, other, muted, other_blocked, last_text, last_sender_id, last_at, last_deleted_at, unread in rows:
+            if other.id not in avatars:
+                avatars[other.id] = _convert_single_to_signed_url(
+                    other.avatar_url)
+            thread_responses.append(DMThreadResponse(
+                id=thread.id,
+                user_a_id=thread.user_a_id,
+                user_b_id=thread.user_b_id,
+                initiator_id=thread.initiator_id,
+                status=thread.status,
+                created_at=thread.created_at,
+                updated_at=thread.updated_at,
+                other_user_name=other.name,
+                other_user_username=other.username,
+                other_user_avatar=avatars[other.id],
+                last_message=last_text if last_deleted_at is None else None,
+                last_message_time=last_at or thread.updated_at,
+                is_muted=bool(muted),
+                is_blocked=bool(other_blocked),
+                sender_photo_url=avatars.get(last_sender_id),
+                unread_count=unread or 0,
+            ))
+
+        next_cursor = None
+        if has_more and rows:
+            last_thread = rows[-1][0]
+            next_cursor = encode_cursor(last_thread.updated_at, last_thread.id)
+
+        return PaginatedDMThreads(
+            items=thread_responses,
+            total=total,
+            limit=limit,
+            offset=offset,
+            next_cursor=next_cursor,
+            has_more=has_more,
+        )
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail="Failed to get inbox")
 
@@ -172,15 +249,28 @@ async def get_inbox(
 async def get_thread_messages(
     thread_id: int,
     limit: int = Query(50, ge=1, le=100),
-    offset: int = Query(0, ge=0),
+    offset: int = Query(0, ge=0, description="Deprecated; use before/after cursors"),
+    before: Optional[str] = Query(
+        None, description="Cursor; return messages older than this position"),
+    after: Optional[str] = Query(
+        None, description="Cursor; return messages newer than this position"),
+    include_total: bool = Query(
+        False, description="Also compute the exact message count (slower)"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(JWTService.get_current_user),
 ):
     """
-    Get messages from a specific thread.
+    Get messages from a specific thread, newest first.
+
+    Uses keyset pagination on (created_at, id): pass `next_cursor` as `before`
+    to scroll back and `prev_cursor` as `after` to fetch newer messages.
 
     **Authentication Required:** Yes
     """
+    if before and after:
+        raise HTTPException(
+            status_code=400, detail="Use either before or after, not both")
+
     try:
         # Verify user is participant in thread
         participant_query = select(DMParticipantState).where(
@@ -206,25 +296,58 @@ async def get_thread_messages(
                     DMMessage.deleted_by_user_id != current_user.id
                 )
             )
-        ).order_by(desc(DMMessage.created_at))
-
-        # Get total count
-        count_query = select(func.count()).select_from(query.subquery())
-        total_result = await db.execute(count_query)
-        total = total_result.scalar()
+        )
 
-        # Apply pagination
-        query = query.offset(offset).limit(limit)
-        result = await db.execute(query)
-        messages = result.scalars().all()
+        total = None
+        if include_total:
+            count_query = select(func.count()).select_from(query.subquery())
+            total = (await db.execute(count_query)).scalar()
+
+        position = tuple_(DMMessage.created_at, DMMessage.id)
+        if after:
+            # Newer than the cursor: walk forward, then flip to newest first
+            query = query.where(position > tuple_(*decode_cursor(after))).order_by(
+                DMMessage.created_at.asc(), DMMessage.id.asc())
+        else:
+            if before:
+                query = query.where(position < tuple_(*decode_cursor(before)))
+            query = query.order_by(
+                DMMessage.created_at.desc(), DMMessage.id.desc())
+            if offset and not before:
+                query = query.offset(offset)
+
+        # Fetch one extra row to know whether another page exists
+        result = await db.execute(query.limit(limit + 1))
+        messages = list(result.scalars().all())
+        has_more = len(messages) > limit
+        messages = messages[:limit]
+        if after:
+            messages.reverse()
+
+        next_cursor = prev_cursor = None
+        if messages:
+            prev_cursor = encode_cursor(
+                messages[0].created_at, messages[0].id)
+            next_cursor = encode_cursor(
+                messages[-1].created_at, messages[-1].id)
+
+        # Resolve the (at most two) senders once per page and sign each
+        # avatar once, instead of a lookup per message
+        sender_ids = {message.sender_id for message in messages}
+        senders = {}
+        if sender_ids:
+            sender_result = await db.execute(
+                select(User).where(User.id.in_(sender_ids)))
+            senders = {user.id: user for user in sender_result.scalars().all()}
+        sender_avatars = {
+            user_id: _convert_single_to_signed_url(user.avatar_url)
+            for user_id, user in senders.items()
+        }
 
         # Convert to response format
         message_responses = []
         for message in messages:
-            # Get sender info
-            sender_query = select(User).where(User.id == message.sender_id)
-            sender_result = await db.execute(sender_query)
-            sender = sender_result.scalar_one_or_none()
+            sender = senders.get(message.sender_id)
 
             if sender:
                 message_resp = DMMessageResponse(
@@ -233,8 +356,7 @@ async def get_thread_messages(
                     sender_id=message.sender_id,
                     sender_username=sender.username,
                     sender_display_name=sender.name,
-                    sender_avatar_url=_convert_single_to_signed_url(
-                        sender.avatar_url),
+                    sender_avatar_url=sender_avatars[sender.id],
                     text=message.text,
                     message_type=message.message_type,
                     photo_url=message.photo_urls,
@@ -248,7 +370,16 @@ async def get_thread_messages(
                 )
                 message_responses.append(message_resp)
 
-        return PaginatedDMMessages(items=message_responses, total=total, limit=limit, offset=offset)
+        # Already validated; skip response_model re-validation
+        return FastJSONResponse(PaginatedDMMessages(
+            items=message_responses,
+            total=total,
+            limit=limit,
+            offset=offset,
+            next_cursor=next_cursor,
+            prev_cursor=prev_cursor,
+            has_more=has_more,
+        ))
 
     except HTTPException:
         raise
@@ -296,6 +427,7 @@ async def send_message(
 
         db.add(message)
         await db.flush()  # Get the ID
+        await increment_unread(db, [(thread_id, current_user.id)])
 
         # Update thread timestamp
         thread_query = select(DMThread).where(DMThread.id == thread_id)
@@ -596,6 +728,15 @@ async def unlike_message(
             status_code=500, detail=f"Failed to unlike message: {str(e)}")
 
 
+@router.get("/unread-count", response_model=UnreadCountResponse)
+async def get_unread_count(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(JWTService.get_current_user)
+):
+    """Get total unread messages across all threads (from materialized counters)."""
+    return UnreadCountResponse(unread=await get_total_unread(db, current_user.id))
+
+
 @router.get("/threads/{thread_id}/unread-count", response_model=dict)
 async def get_thread_unread_count(
     thread_id: int,
@@ -616,16 +757,7 @@ async def get_thread_unread_count(
             raise HTTPException(
                 status_code=403, detail="You are not part of this conversation")
 
-        # Count unread messages (messages created after last_read_at)
-        from datetime import datetime
-        unread_query = select(func.count(DMMessage.id)).where(
-            DMMessage.thread_id == thread_id,
-            DMMessage.created_at > (participant.last_read_at or datetime.min)
-        )
-        unread_result = await db.execute(unread_query)
-        unread_count = unread_result.scalar() or 0
-
-        return {"unread_count": unread_count}
+        return {"unread_count": participant.unread_count or 0}
 
     except HTTPException:
         raise
@@ -637,6 +769,20 @@ async def get_thread_unread_count(
             status_code=500, detail=f"Failed to get unread count: {str(e)}")
 
 
+@router.post("/threads/{thread_id}/mark-read", status_code=status.HTTP_204_NO_CONTENT)
+async def mark_read(
+    thread_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(JWTService.get_current_user)
+):
+    """Mark a thread as read and reset its unread counter."""
+    await _get_thread_for_participant(db, thread_id, current_user.id)
+    read_at = await mark_thread_read(db, thread_id, current_user.id)
+    await db.commit()
+    await manager.broadcast_read_receipt(thread_id, current_user.id, read_at)
+    return None
+
+
 @router.post("/threads/{thread_id}/accept", response_model=dict)
 async def accept_thread(
     thread_id: int,
@@ -678,3 +824,112 @@ async def accept_thread(
         logging.error(f"Error accepting thread {thread_id}: {e}")
         raise HTTPException(
             status_code=500, detail=f"Failed to accept thread: {str(e)}")
+
+
+@router.put("/threads/{user_id}/block", response_model=DMThreadBlockUpdate)
+async def block_user(
+    user_id: int,
+    payload: DMThreadBlockUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(JWTService.get_current_user)
+):
+    """
+    Block or unblock a user.
+
+    Blocking removes follow relationships in both directions. Connected DM
+    sockets are told to reload their cached thread state.
+    """
+    if user_id == current_user.id:
+        raise HTTPException(status_code=400, detail="Cannot block yourself")
+
+    other_user = (await db.execute(select(User).where(User.id == user_id))).scalar_one_or_none()
+    if not other_user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    try:
+        thread_result = await db.execute(select(DMThread).where(or_(
+            and_(DMThread.user_a_id == current_user.id,
+                 DMThread.user_b_id == user_id),
+            and_(DMThread.user_a_id == user_id,
+                 DMThread.user_b_id == current_user.id),
+        )).order_by(DMThread.id).limit(1))
+        thread = thread_result.scalar_one_or_none()
+
+        if not thread:
+            # Create thread if it doesn't exist (for blocking purposes)
+            thread = DMThread(
+                user_a_id=current_user.id,
+                user_b_id=user_id,
+                initiator_id=current_user.id,
+                status="accepted",
+            )
+            db.add(thread)
+            await db.flush()
+
+        state_result = await db.execute(select(DMParticipantState).where(
+            DMParticipantState.thread_id == thread.id,
+            DMParticipantState.user_id == current_user.id,
+        ))
+        state = state_result.scalar_one_or_none()
+        if not state:
+            state = DMParticipantState(
+                thread_id=thread.id, user_id=current_user.id)
+            db.add(state)
+        state.blocked = payload.blocked
+
+        removed_follows = []
+        if payload.blocked:
+            # Counters move only for rows this request actually deleted
+            for follower_id, followee_id in ((current_user.id, user_id), (user_id, current_user.id)):
+                deleted = await db.execute(delete(Follow).where(
+                    Follow.follower_id == follower_id, Follow.followee_id == followee_id))
+                if deleted.rowcount:
+                    removed_follows.append((follower_id, followee_id))
+                    await record_follow(db, follower_id, followee_id, delta=-deleted.rowcount)
+
+        await db.commit()
+        for follower_id, followee_id in removed_follows:
+            await follow_graph.publish_unfollow(follower_id, followee_id)
+    except Exception as e:
+        await db.rollback()
+        import logging
+        logging.error(f"Error updating block for user {user_id}: {e}")
+        raise HTTPException(
+            status_code=500, detail=f"Failed to update block: {str(e)}")
+
+    await invalidate_thread_context(thread.id)
+    return DMThreadBlockUpdate(blocked=payload.blocked)
+
+
+# ============================================================================
+# TYPING INDICATORS (in-memory, see services/typing_store.py)
+# ============================================================================
+
+@router.post("/threads/{thread_id}/typing", status_code=status.HTTP_204_NO_CONTENT)
+async def set_typing(
+    thread_id: int,
+    payload: TypingUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(JWTService.get_current_user)
+):
+    """Set typing state for clients that are not connected over WebSocket."""
+    await _get_thread_for_participant(db, thread_id, current_user.id)
+    await typing_store.update(thread_id, current_user.id, payload.typing)
+    return None
+
+
+@router.get("/threads/{thread_id}/typing", response_model=TypingStatusResponse)
+async def get_typing(
+    thread_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(JWTService.get_current_user)
+):
+    """Get whether the other participant is typing.
+
+    typing_until is resolved from the in-memory store on demand; it is no
+    longer persisted on DMParticipantState.
+    """
+    thread = await _get_thread_for_participant(db, thread_id, current_user.id)
+    other_id = thread.user_a_id if current_user.id == thread.user_b_id else thread.user_b_id
+    until = typing_store.get_typing_until(thread_id, other_id)
+    return TypingStatusResponse(typing=until is not None, until=until)
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, HTTPException
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, HTTPException
 from typing import Dict, Set, Tuple, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update
@@ -7,12 +7,18 @@ import asyncio
 import json
 import logging
 
-from ..database import get_db
+from ..database import AsyncSessionLocal
 from ..services.jwt_service import JWTService
-from ..models import DMThread, DMParticipantState, DMMessage, User, CheckIn, PlaceChatMessage
+from ..models import DMThread, DMParticipantState, User
 from ..config import settings
 from ..services.storage import StorageService
 from ..services.place_chat_service import create_private_reply_from_place_chat
+from ..services.event_bus import event_bus
+from ..services.typing_store import typing_store, TYPING_TOPIC
+from ..services.message_batcher import dm_message_batcher, place_chat_batcher
+from ..services.place_chat_buffer import place_chat_buffer
+from ..services.presence_index import presence_index
+from ..services.dm_unread_service import mark_thread_read
 
 
 logger = logging.getLogger(__name__)
@@ -62,31 +68,23 @@ router = APIRouter()
 
 
 @router.websocket("/ws/places/{place_id}/chat")
-async def place_chat_ws(websocket: WebSocket, place_id: int, db: AsyncSession = Depends(get_db)):
+async def place_chat_ws(websocket: WebSocket, place_id: int):
     user_id = await _authenticate(websocket)
     if not user_id:
         await websocket.close(code=4401)
         return
 
     # Only allow users with a recent check-in within window
-    window_start = datetime.now(
-        timezone.utc) - timedelta(hours=int(settings.place_chat_window_hours))
-    res = await db.execute(
-        select(CheckIn).where(
-            CheckIn.user_id == user_id,
-            CheckIn.place_id == place_id,
-            CheckIn.created_at >= window_start,
-        )
-    )
-    recent = res.scalar_one_or_none()
-    if not recent:
+    if not await presence_index.confirm(place_id, user_id, active_only=False):
         await websocket.close(code=4403)
         return
 
     # Use a synthetic thread id for room: negative ID space to avoid collision
     thread_id = -int(place_id)
     await manager.connect(thread_id, user_id, websocket)
-    await update_user_availability_from_connection(db, user_id, True)
+    await _set_availability(user_id, True)
+    # Loaded on the first message and reused for the rest of the connection
+    sender_info = None
 
     try:
         await websocket.send_json({"type": "connection_established", "place_id": place_id, "user_id": user_id, "window_hours": settings.place_chat_window_hours})
@@ -104,7 +102,7 @@ async def place_chat_ws(websocket: WebSocket, place_id: int, db: AsyncSession =
                 continue
 
             if msg_type == "typing":
-                await manager.broadcast_typing(thread_id, user_id, bool(data.get("typing", True)))
+                await typing_store.update(thread_id, user_id, bool(data.get("typing", True)))
                 continue
 
             if msg_type == "message":
@@ -118,36 +116,39 @@ async def place_chat_ws(websocket: WebSocket, place_id: int, db: AsyncSession =
                     })
                     continue
 
-                chat_message = PlaceChatMessage(
-                    place_id=place_id,
-                    user_id=user_id,
-                    text=text,
-                )
-                db.add(chat_message)
+                # Persisted through the write-behind batcher; returns after commit
                 try:
-                    await db.commit()
+                    chat_message = await place_chat_batcher.submit({
+                        "place_id": place_id,
+                        "user_id": user_id,
+                        "text": text,
+                    })
                 except Exception:
-                    await db.rollback()
                     await websocket.send_json({
                         "type": "error",
                         "detail": "Failed to send message",
                     })
                     continue
 
-                await db.refresh(chat_message)
-                sender_info = await _get_user_info(db, user_id)
+                if sender_info is None:
+                    async with AsyncSessionLocal() as db:
+                        sender_info = await _get_user_info(db, user_id)
+                created_at = chat_message["created_at"]
+                if created_at.tzinfo is None:
+                    created_at = created_at.replace(tzinfo=timezone.utc)
                 message_payload = {
-                    "id": str(chat_message.id),
+                    "id": str(chat_message["id"]),
                     "room_id": place_id,
                     "place_id": place_id,
                     "user_id": user_id,
                     "author_id": str(user_id),
                     "author_name": sender_info.get("name") or f"User {user_id}",
                     "author_avatar_url": sender_info.get("avatar_url"),
-                    "text": chat_message.text,
-                    "created_at": chat_message.created_at.isoformat(),
+                    "text": chat_message["text"],
+                    "created_at": created_at.isoformat(),
                     "status": "sent",
                 }
+                await place_chat_buffer.publish(message_payload)
                 payload = {
                     "type": "message",
                     "message": message_payload,
@@ -161,26 +162,27 @@ async def place_chat_ws(websocket: WebSocket, place_id: int, db: AsyncSession =
                 target_user_id = data.get("target_user_id")
                 context = data.get("context") or {}
 
-                try:
-                    thread, dm_message, place = await create_private_reply_from_place_chat(
-                        db=db,
-                        place_id=place_id,
-                        sender_id=user_id,
-                        target_user_id=target_user_id,
-                        message_text=data.get("text") or "",
-                        context_text=context.get("text"),
-                    )
-                except HTTPException as exc:
-                    await websocket.send_json({
-                        "type": "error",
-                        "detail": exc.detail,
-                    })
-                    continue
+                async with AsyncSessionLocal() as db:
+                    try:
+                        thread, dm_message, place = await create_private_reply_from_place_chat(
+                            db=db,
+                            place_id=place_id,
+                            sender_id=user_id,
+                            target_user_id=target_user_id,
+                            message_text=data.get("text") or "",
+                            context_text=context.get("text"),
+                        )
+                    except HTTPException as exc:
+                        await websocket.send_json({
+                            "type": "error",
+                            "detail": exc.detail,
+                        })
+                        continue
+                    sender_info = await _get_user_info(db, user_id)
 
                 try:
                     from ..services.websocket_service import WebSocketService
 
-                    sender_info = await _get_user_info(db, user_id)
                     notification_payload = {
                         "sender_id": user_id,
                         "sender_name": sender_info.get("name"),
@@ -223,7 +225,7 @@ async def place_chat_ws(websocket: WebSocket, place_id: int, db: AsyncSession =
     finally:
         manager.disconnect(thread_id, user_id, websocket)
         if not manager.is_user_online(user_id):
-            await update_user_availability_from_connection(db, user_id, False)
+            await _set_availability(user_id, False)
 
 
 class ConnectionManager:
@@ -401,6 +403,8 @@ class ConnectionManager:
                     except Exception:
                         pass
 
+                typing_store.prune()
+
             except Exception:
                 # Continue cleanup even if there are errors
                 pass
@@ -429,6 +433,21 @@ class ConnectionManager:
 manager = ConnectionManager()
 
 
+async def _on_typing_event(payload: dict) -> None:
+    """Apply a typing event (local or from another node) and notify local sockets."""
+    thread_id = int(payload["thread_id"])
+    user_id = int(payload["user_id"])
+    typing = bool(payload.get("typing"))
+    until = payload.get("until")
+    typing_store.apply(thread_id, user_id, typing,
+                       datetime.fromisoformat(until) if until else None)
+    if thread_id in manager.active:
+        await manager.broadcast_typing(thread_id, user_id, typing)
+
+
+event_bus.subscribe(TYPING_TOPIC, _on_typing_event)
+
+
 async def _authenticate(websocket: WebSocket) -> int | None:
     token = websocket.query_params.get("token")
     if not token:
@@ -483,41 +502,123 @@ async def _get_or_create_state(db: AsyncSession, thread_id: int, user_id: int) -
     return state
 
 
+async def _set_availability(user_id: int, online: bool) -> None:
+    """Update auto availability using a short-lived session."""
+    try:
+        async with AsyncSessionLocal() as db:
+            await update_user_availability_from_connection(db, user_id, online)
+    except Exception as e:
+        logger.warning(f"Failed to update availability for user {user_id}: {e}")
+
+
+THREAD_INVALIDATE_TOPIC = "dm.thread_invalidate"
+
+
+class DMThreadContext:
+    """Per-connection cache of thread authorization and participant metadata.
+
+    Loaded once when the socket connects and reloaded lazily after a
+    ``dm.thread_invalidate`` event (block/unblock, status change), so message
+    frames do not need a database round-trip to check blocking.
+    """
+
+    def __init__(self, thread_id: int, user_id: int) -> None:
+        self.thread_id = thread_id
+        self.user_id = user_id
+        self.other_id: Optional[int] = None
+        self.status: Optional[str] = None
+        self.user_info: dict = {}
+        self.other_user_info: dict = {}
+        self.blocked_by_me = False
+        self.blocked_by_other = False
+        self.stale = True
+
+    @property
+    def is_participant(self) -> bool:
+        return self.other_id is not None
+
+    async def load(self, db: AsyncSession) -> bool:
+        """(Re)load the context. Returns False if the thread no longer exists."""
+        res = await db.execute(select(DMThread).where(DMThread.id == self.thread_id))
+        thread = res.scalar_one_or_none()
+        if not thread:
+            return False
+
+        self.status = thread.status
+        if self.user_id in (thread.user_a_id, thread.user_b_id):
+            self.other_id = thread.user_a_id if self.user_id == thread.user_b_id else thread.user_b_id
+        else:
+            self.other_id = None
+            self.stale = False
+            return True
+
+        res = await db.execute(select(DMParticipantState.user_id, DMParticipantState.blocked).where(
+            DMParticipantState.thread_id == self.thread_id,
+            DMParticipantState.user_id.in_([self.user_id, self.other_id]),
+        ))
+        blocked = {uid: bool(flag) for uid, flag in res.all()}
+        self.blocked_by_me = blocked.get(self.user_id, False)
+        self.blocked_by_other = blocked.get(self.other_id, False)
+
+        self.user_info = await _get_user_info(db, self.user_id)
+        self.other_user_info = await _get_user_info(db, self.other_id)
+        self.stale = False
+        return True
+
+
+# thread_id -> contexts of the sockets connected to it on this node
+_thread_contexts: Dict[int, Set[DMThreadContext]] = {}
+
+
+def _on_thread_invalidate(payload: dict) -> None:
+    for context in _thread_contexts.get(int(payload["thread_id"]), ()):
+        context.stale = True
+
+
+event_bus.subscribe(THREAD_INVALIDATE_TOPIC, _on_thread_invalidate)
+
+
+async def invalidate_thread_context(thread_id: int) -> None:
+    """Tell every node to reload cached metadata for a DM thread."""
+    await event_bus.publish(THREAD_INVALIDATE_TOPIC, {"thread_id": thread_id})
+
+
 @router.websocket("/ws/dms/{thread_id}")
-async def dm_ws(websocket: WebSocket, thread_id: int, db: AsyncSession = Depends(get_db)):
+async def dm_ws(websocket: WebSocket, thread_id: int):
     user_id = await _authenticate(websocket)
     if not user_id:
         logger.warning(f"WebSocket authentication failed for thread {thread_id}")
         await websocket.close(code=4401)
         return
 
-    # Authorize participant and accepted status
-    res = await db.execute(select(DMThread).where(DMThread.id == thread_id))
-    thread = res.scalar_one_or_none()
-    if not thread:
+    # Authorize participant and accepted status. The session is only held
+    # while loading; frames borrow their own short-lived sessions for writes.
+    context = DMThreadContext(thread_id, user_id)
+    async with AsyncSessionLocal() as db:
+        found = await context.load(db)
+
+    if not found:
         logger.warning(f"Thread {thread_id} not found for user {user_id}")
         await websocket.close(code=4404)
         return
 
-    if user_id not in (thread.user_a_id, thread.user_b_id):
-        logger.warning(f"User {user_id} not participant in thread {thread_id} (participants: {thread.user_a_id}, {thread.user_b_id})")
+    if not context.is_participant:
+        logger.warning(f"User {user_id} not participant in thread {thread_id}")
         await websocket.close(code=4403)
         return
 
-    if thread.status != "accepted":
-        logger.warning(f"Thread {thread_id} status is {thread.status}, not accepted")
+    if context.status != "accepted":
+        logger.warning(f"Thread {thread_id} status is {context.status}, not accepted")
         await websocket.close(code=4403)
         return
 
     logger.info(f"WebSocket connection established for user {user_id} in thread {thread_id}")
 
     await manager.connect(thread_id, user_id, websocket)
-    await update_user_availability_from_connection(db, user_id, True)
+    _thread_contexts.setdefault(thread_id, set()).add(context)
+    await _set_availability(user_id, True)
 
     try:
-        # Get user info for presence
-        user_info = await _get_user_info(db, user_id)
-
         # Announce presence online
         await manager.broadcast_presence(thread_id, user_id, True)
 
@@ -529,17 +630,13 @@ async def dm_ws(websocket: WebSocket, thread_id: int, db: AsyncSession = Depends
             "timestamp": datetime.now(timezone.utc).isoformat()
         })
 
-        # Send current thread participants info
-        other_user_id = thread.user_a_id if user_id == thread.user_b_id else thread.user_b_id
-        other_user_info = await _get_user_info(db, other_user_id)
-
         # Check if other user is online
         thread_connections = manager.active.get(thread_id, {})
-        other_online = other_user_id in thread_connections
+        other_online = context.other_id in thread_connections
 
         await websocket.send_json({
             "type": "thread_info",
-            "participants": [user_info, other_user_info],
+            "participants": [context.user_info, context.other_user_info],
             "other_user_online": other_online,
             "timestamp": datetime.now(timezone.utc).isoformat()
         })
@@ -556,13 +653,8 @@ async def dm_ws(websocket: WebSocket, thread_id: int, db: AsyncSession = Depends
                 })
 
             elif msg_type == "typing":
-                typing = bool(data.get("typing", False))
-                # Update typing_until ~5s
-                state = await _get_or_create_state(db, thread_id, user_id)
-                state.typing_until = (datetime.now(
-                    timezone.utc) + timedelta(seconds=5)) if typing else None
-                await db.commit()
-                await manager.broadcast_typing(thread_id, user_id, typing)
+                # Kept in memory only; no DMParticipantState write per keystroke
+                await typing_store.update(thread_id, user_id, bool(data.get("typing", False)))
 
             elif msg_type == "message":
                 text = (data.get("text") or "").strip()
@@ -574,10 +666,15 @@ async def dm_ws(websocket: WebSocket, thread_id: int, db: AsyncSession = Depends
                     })
                     continue
 
+                if context.stale:
+                    async with AsyncSessionLocal() as db:
+                        found = await context.load(db)
+                    if not found or not context.is_participant or context.status != "accepted":
+                        await websocket.close(code=4403)
+                        break
+
                 # Prevent sending if the other participant blocked me
-                other_id = thread.user_a_id if user_id == thread.user_b_id else thread.user_b_id
-                other_state = await _get_or_create_state(db, thread_id, other_id)
-                if other_state and getattr(other_state, "blocked", False):
+                if context.blocked_by_other:
                     await websocket.send_json({
                         "type": "error",
                         "detail": "You are blocked by this user",
@@ -585,34 +682,41 @@ async def dm_ws(websocket: WebSocket, thread_id: int, db: AsyncSession = Depends
                     })
                     continue
 
-                # Create message
-                msg = DMMessage(thread_id=thread_id,
-                                sender_id=user_id, text=text)
-                db.add(msg)
-
-                # Bump thread updated_at
-                thread.updated_at = datetime.now(timezone.utc)
-                await db.commit()
-                await db.refresh(msg)
+                # Create message and bump thread updated_at (batched, returns after commit)
+                try:
+                    msg = await dm_message_batcher.submit({
+                        "thread_id": thread_id,
+                        "sender_id": user_id,
+                        "text": text,
+                    })
+                except Exception:
+                    await websocket.send_json({
+                        "type": "error",
+                        "detail": "Failed to send message",
+                        "timestamp": datetime.now(timezone.utc).isoformat()
+                    })
+                    continue
 
                 # Prepare message data
                 message_data = {
-                    "id": msg.id,
-                    "thread_id": msg.thread_id,
-                    "sender_id": msg.sender_id,
-                    "text": msg.text,
-                    "created_at": msg.created_at.isoformat(),
-                    "sender_info": user_info
+                    "id": msg["id"],
+                    "thread_id": msg["thread_id"],
+                    "sender_id": msg["sender_id"],
+                    "text": msg["text"],
+                    "created_at": msg["created_at"].isoformat(),
+                    "sender_info": context.user_info
                 }
 
-                # Broadcast message
+                # Broadcast message; sending implies the user stopped typing
                 await manager.broadcast_message(thread_id, message_data)
+                if typing_store.is_typing(thread_id, user_id):
+                    await typing_store.update(thread_id, user_id, False)
 
             elif msg_type == "mark_read":
-                state = await _get_or_create_state(db, thread_id, user_id)
-                state.last_read_at = datetime.now(timezone.utc)
-                await db.commit()
-                await manager.broadcast_read_receipt(thread_id, user_id, state.last_read_at)
+                async with AsyncSessionLocal() as db:
+                    last_read_at = await mark_thread_read(db, thread_id, user_id)
+                    await db.commit()
+                await manager.broadcast_read_receipt(thread_id, user_id, last_read_at)
 
             elif msg_type == "reaction":
                 message_id = data.get("message_id")
@@ -631,11 +735,7 @@ async def dm_ws(websocket: WebSocket, thread_id: int, db: AsyncSession = Depends
                 await manager.broadcast_reaction(thread_id, message_id, user_id, reaction)
 
             elif msg_type == "typing_stop":
-                # Stop typing indicator
-                state = await _get_or_create_state(db, thread_id, user_id)
-                state.typing_until = None
-                await db.commit()
-                await manager.broadcast_typing(thread_id, user_id, False)
+                await typing_store.update(thread_id, user_id, False)
 
             else:
                 # Ignore unknown message types
@@ -651,14 +751,19 @@ async def dm_ws(websocket: WebSocket, thread_id: int, db: AsyncSession = Depends
         # Log error and close connection
         logger.error(f"WebSocket error: {e}")
     finally:
+        contexts = _thread_contexts.get(thread_id)
+        if contexts is not None:
+            contexts.discard(context)
+            if not contexts:
+                _thread_contexts.pop(thread_id, None)
         manager.disconnect(thread_id, user_id, websocket)
         if not manager.is_user_online(user_id):
-            await update_user_availability_from_connection(db, user_id, False)
+            await _set_availability(user_id, False)
         await manager.broadcast_presence(thread_id, user_id, False)
 
 
 @router.websocket("/ws/user/{user_id}")
-async def user_ws(websocket: WebSocket, user_id: int, db: AsyncSession = Depends(get_db)):
+async def user_ws(websocket: WebSocket, user_id: int):
     """WebSocket connection for user-wide notifications and updates"""
     authenticated_user_id = await _authenticate(websocket)
     if not authenticated_user_id or authenticated_user_id != user_id:
@@ -667,7 +772,7 @@ async def user_ws(websocket: WebSocket, user_id: int, db: AsyncSession = Depends
 
     # Use thread_id 0 for user-wide connections
     await manager.connect(0, user_id, websocket)
-    await update_user_availability_from_connection(db, user_id, True)
+    await _set_availability(user_id, True)
 
     try:
         await websocket.send_json({
@@ -695,4 +800,4 @@ async def user_ws(websocket: WebSocket, user_id: int, db: AsyncSession = Depends
     finally:
         manager.disconnect(0, user_id, websocket)
         if not manager.is_user_online(user_id):
-            await update_user_availability_from_connection(db, user_id, False)
+            await _set_availability(user_id, False)
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, desc
+from sqlalchemy import delete, select, func, desc
 
 from ..database import get_db
 from ..models import User, Follow
@@ -10,6 +10,8 @@ from ..schemas import PaginatedFollowers, PaginatedFollowing, FollowUserResponse
 from ..services.storage import StorageService
 from ..utils import can_view_follower_list, can_view_following_list
 from ..services.block_service import has_user_blocked
+from ..services.follow_graph import follow_graph
+from ..services.user_counters import record_follow
 from ..config import settings
 
 
@@ -80,6 +82,8 @@ async def follow_user(user_id: int, current_user: User = Depends(JWTService.get_
         # Create the follow relationship
         new_follow = Follow(follower_id=current_user.id, followee_id=user_id)
         db.add(new_follow)
+        await db.flush()
+        await record_follow(db, current_user.id, user_id)
 
         # Create activity for the follow within the same transaction (removed - activity router not used)
         # try:
@@ -95,6 +99,7 @@ async def follow_user(user_id: int, current_user: User = Depends(JWTService.get_
 
         # Commit everything together
         await db.commit()
+        await follow_graph.publish_follow(current_user.id, user_id)
         return {"followed": True}
 
     except Exception as e:
@@ -110,12 +115,14 @@ async def follow_user(user_id: int, current_user: User = Depends(JWTService.get_
 
 @router.delete("/{user_id}", response_model=FollowStatusResponse)
 async def unfollow_user(user_id: int, current_user: User = Depends(JWTService.get_current_user), db: AsyncSession = Depends(get_db)):
-    res = await db.execute(select(Follow).where(Follow.follower_id == current_user.id, Follow.followee_id == user_id))
-    row = res.scalars().first()
-    if not row:
+    # Only the request that actually removed the row adjusts the counters
+    res = await db.execute(delete(Follow).where(Follow.follower_id == current_user.id, Follow.followee_id == user_id))
+    if not res.rowcount:
+        await db.rollback()
         return {"followed": False}
-    await db.delete(row)
+    await record_follow(db, current_user.id, user_id, delta=-res.rowcount)
     await db.commit()
+    await follow_graph.publish_unfollow(current_user.id, user_id)
     return {"followed": False}
 
 
@@ -125,23 +132,13 @@ async def list_followers(limit: int = Query(20, ge=1, le=100), offset: int = Que
     followers_subq = select(Follow).where(
         Follow.followee_id == current_user.id).subquery()
 
-    # Subquery of users current_user follows (to detect mutual follow)
-    my_following_subq = select(Follow.followee_id).where(
-        Follow.follower_id == current_user.id).subquery()
+    # Users current_user follows (to detect mutual follow)
+    my_following = await follow_graph.following(db, current_user.id)
 
     # Get all follower relationships first, then filter out blocked users in the query
     base_query = (
-        select(
-            User,
-            followers_subq.c.created_at,
-            func.coalesce(func.max(sa.case(
-                (my_following_subq.c.followee_id.is_not(None), 1),
-                else_=0
-            )), 0)
-        )
+        select(User, followers_subq.c.created_at)
         .join_from(User, followers_subq, User.id == followers_subq.c.follower_id)
-        .outerjoin(my_following_subq, User.id == my_following_subq.c.followee_id)
-        .group_by(User.id, followers_subq.c.created_at)
         .order_by(desc(followers_subq.c.created_at))
     )
 
@@ -151,10 +148,10 @@ async def list_followers(limit: int = Query(20, ge=1, le=100), offset: int = Que
 
     # Filter out blocked users to get accurate count
     filtered_followers = []
-    for (u, created_at, followed) in all_followers:
+    for (u, created_at) in all_followers:
         # Skip users who have blocked the current user
         if not await has_user_blocked(db, u.id, current_user.id):
-            filtered_followers.append((u, created_at, followed))
+            filtered_followers.append((u, created_at, u.id in my_following))
 
     total = len(filtered_followers)
 
@@ -257,23 +254,13 @@ async def list_user_followers(
     followers_subq = select(Follow).where(
         Follow.followee_id == user_id).subquery()
 
-    # Subquery of users current_user follows (to detect mutual follow)
-    my_following_subq = select(Follow.followee_id).where(
-        Follow.follower_id == current_user.id).subquery()
+    # Users current_user follows (to detect mutual follow)
+    my_following = await follow_graph.following(db, current_user.id)
 
     total = (await db.execute(select(func.count()).select_from(followers_subq))).scalar_one()
     res = await db.execute(
-        select(
-            User,
-            followers_subq.c.created_at,
-            func.coalesce(func.max(sa.case(
-                (my_following_subq.c.followee_id.is_not(None), 1),
-                else_=0
-            )), 0)
-        )
+        select(User, followers_subq.c.created_at)
         .join_from(User, followers_subq, User.id == followers_subq.c.follower_id)
-        .outerjoin(my_following_subq, User.id == my_following_subq.c.followee_id)
-        .group_by(User.id, followers_subq.c.created_at)
         .order_by(desc(followers_subq.c.created_at))
         .offset(offset)
         .limit(limit)
@@ -288,9 +275,9 @@ async def list_user_followers(
             is_verified=u.is_verified,
             created_at=u.created_at,
             followed_at=created_at,
-            followed=bool(followed)
+            followed=u.id in my_following
         )
-        for (u, created_at, followed) in res.all()
+        for (u, created_at) in res.all()
     ]
     return PaginatedFollowers(items=items, total=total, limit=limit, offset=offset)
 
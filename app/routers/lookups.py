@@ -1,23 +1,52 @@
 """
 Lookup endpoints for cities, countries, and neighborhoods.
-Uses external APIs (GeoNames, Nominatim) for fast, comprehensive data.
+Served locally from the bundled gazetteer and the places we already have.
+With ``APP_GEONAMES_FALLBACK`` the GeoNames API answers where the gazetteer
+has no data; its results are cached for ``geonames_cache_ttl_seconds``.
 """
-import json
 import logging
 import httpx
-from pathlib import Path
-from typing import List
-from fastapi import APIRouter, Depends, Query, HTTPException
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, distinct
+from typing import Any, Dict, List
+from fastapi import APIRouter, Query, HTTPException, Response
 
-from ..database import get_db
-from ..models import Place
 from ..config import settings
+from ..services.gazetteer import gazetteer
+from ..services.lookup_dictionary import LOOKUPS_VERSION_HEADER, lookup_dictionary
+from ..services.ttl_cache import TTLCache
 
 router = APIRouter(prefix="/lookups", tags=["lookups"])
 logger = logging.getLogger(__name__)
 
+GEONAMES_URL = "http://api.geonames.org"
+
+# (endpoint, sorted params) -> GeoNames rows; failures are not cached
+geonames_cache = TTLCache(ttl_seconds=settings.geonames_cache_ttl_seconds, max_entries=5000)
+
+
+async def _geonames(endpoint: str, params: Dict[str, Any]) -> List[dict]:
+    """Rows from a GeoNames JSON endpoint, or [] when disabled or failing."""
+    if not settings.geonames_fallback:
+        return []
+    key = (endpoint, tuple(sorted(params.items())))
+    cached = geonames_cache.get(key)
+    if cached is not None:
+        return cached
+    try:
+        async with httpx.AsyncClient(timeout=settings.geonames_timeout_seconds) as client:
+            response = await client.get(
+                f"{GEONAMES_URL}/{endpoint}",
+                params={**params, "username": settings.geonames_username},
+            )
+        if response.status_code != 200:
+            logger.error(f"GeoNames API error: {response.status_code}")
+            return []
+        rows = response.json().get("geonames", [])
+    except Exception as e:
+        logger.error(f"GeoNames {endpoint} failed: {e}")
+        return []
+    geonames_cache.set(key, rows)
+    return rows
+
 
 @router.get("/cities", response_model=List[dict])
 async def get_cities_for_filter(
@@ -25,63 +54,52 @@ async def get_cities_for_filter(
     limit: int = Query(50, ge=1, le=200, description="Max cities to return")
 ):
     """
-    Get cities using GeoNames API - fast, free, comprehensive.
+    Get major cities for a country from the bundled gazetteer, or from
+    GeoNames for countries the gazetteer does not cover.
     
     **Authentication Required:** No
     
-    Uses GeoNames to get major cities for the specified country.
     Returns cities sorted by population (largest first).
-    
-    **Free tier**: 30,000 requests/day
     """
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            # GeoNames API - get cities by country
-            # Note: Register for free at http://www.geonames.org/login to get username
-            # For now using 'demo' username (limited, but works for testing)
-            url = "http://api.geonames.org/searchJSON"
-            params = {
-                "country": country,
-                "featureClass": "P",  # Populated places (cities)
-                "featureCode": "PPLA",  # First-order administrative divisions (major cities)
-                "maxRows": limit,
-                "orderby": "population",
-                "username": "demo"  # TODO: Get your own free username from geonames.org
-            }
-            
-            response = await client.get(url, params=params)
-            
-            if response.status_code != 200:
-                logger.error(f"GeoNames API error: {response.status_code}")
-                raise HTTPException(status_code=502, detail="Failed to fetch cities")
-            
-            data = response.json()
-            cities = []
-            
-            for place in data.get('geonames', []):
-                cities.append({
-                    "name": place.get('name'),
-                    "country": place.get('countryCode'),
-                    "region": place.get('adminName1'),  # State/Province
-                    "population": place.get('population', 0),
-                    "latitude": place.get('lat'),
-                    "longitude": place.get('lng')
+        if not gazetteer.covers(country):
+            return [
+                {
+                    "name": place.get("name"),
+                    "country": place.get("countryCode"),
+                    "region": place.get("adminName1"),
+                    "population": place.get("population", 0),
+                    "latitude": place.get("lat"),
+                    "longitude": place.get("lng"),
+                }
+                for place in await _geonames("searchJSON", {
+                    "country": country.upper(),
+                    "featureClass": "P",  # Populated places (cities)
+                    "featureCode": "PPLA",  # First-order administrative divisions (major cities)
+                    "maxRows": limit,
+                    "orderby": "population",
                 })
-            
-            return cities
-            
-    except httpx.TimeoutException:
-        logger.error("GeoNames API timeout")
-        raise HTTPException(status_code=504, detail="City lookup timeout")
+            ]
+        return [
+            {
+                "name": city.name,
+                "country": city.country,
+                "region": city.region,  # State/Province
+                "population": city.population,
+                "latitude": city.latitude,
+                "longitude": city.longitude,
+            }
+            for city in gazetteer.cities(country, limit)
+        ]
     except Exception as e:
-        logger.error(f"Failed to get cities from GeoNames: {e}")
+        logger.error(f"Failed to get cities from gazetteer: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch cities")
 
 
 @router.get("/cities/all", response_model=List[str])
 async def get_all_cities(
+    response: Response,
     country: str | None = Query(None, description="Filter by 2-letter country code"),
-    db: AsyncSession = Depends(get_db)
 ):
     """
     Get all cities from database where we have places.
@@ -92,16 +110,9 @@ async def get_all_cities(
     Optionally filter by country code.
     """
     try:
-        query = select(distinct(Place.city)).where(Place.city.isnot(None))
-        
-        if country:
-            query = query.where(Place.country == country.upper())
-        
-        query = query.order_by(Place.city)
-        
-        result = await db.execute(query)
-        cities = [city for city, in result.all() if city]
-        
+        await lookup_dictionary.ensure_loaded()
+        response.headers[LOOKUPS_VERSION_HEADER] = lookup_dictionary.version
+        cities = lookup_dictionary.cities(country.upper() if country else "")
         return cities
     except Exception as e:
         logger.error(f"Failed to get cities from database: {e}")
@@ -115,63 +126,56 @@ async def get_neighborhoods_for_filter(
     lng: float | None = Query(None, description="City longitude (if known)"),
 ):
     """
-    Get neighborhoods using GeoNames API - fast and free.
+    Get neighborhoods/districts near a city from the bundled gazetteer.
     
     **Authentication Required:** No
     
-    Returns neighborhoods/districts for a given city using GeoNames.
-    Much faster than querying database.
-    
-    **Free tier**: 30,000 requests/day
+    Uses the given coordinates, or the city's own when they are not passed,
+    and returns neighborhoods within 20 km, closest first. When the
+    gazetteer has none, GeoNames is asked instead.
     """
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            # GeoNames API - find nearby populated places (neighborhoods)
-            url = "http://api.geonames.org/searchJSON"
-            
-            params = {
+        if lat is None or lng is None:
+            known = gazetteer.find_city(city)
+            if known is not None:
+                lat, lng = known.latitude, known.longitude
+
+        neighborhoods = []
+        if lat is not None and lng is not None:
+            neighborhoods = [
+                {
+                    "name": neighborhood.name,
+                    "distance": round(distance, 2),  # km from center
+                    "population": neighborhood.population,
+                }
+                for neighborhood, distance in gazetteer.neighborhoods_near(lat, lng)
+                # Skip if it's the same as the city name
+                if neighborhood.name != city
+            ]
+        if neighborhoods:
+            return neighborhoods
+
+        if lat is not None and lng is not None:
+            rows = await _geonames("findNearbyPlaceNameJSON", {
+                "lat": lat, "lng": lng, "radius": 20, "maxRows": 50, "style": "MEDIUM"})
+        else:
+            rows = await _geonames("searchJSON", {
                 "q": city,
                 "featureClass": "P",  # Populated places
                 "featureCode": "PPLX",  # Section of populated place (neighborhoods)
                 "maxRows": 50,
-                "username": "demo"  # TODO: Get your own free username
+            })
+        neighborhoods = [
+            {
+                "name": place.get("name"),
+                "distance": place.get("distance"),  # km from center
+                "population": place.get("population", 0),
             }
-            
-            # If we have lat/lng, use findNearbyPlaceNameJSON for better results
-            if lat and lng:
-                url = "http://api.geonames.org/findNearbyPlaceNameJSON"
-                params = {
-                    "lat": lat,
-                    "lng": lng,
-                    "radius": 20,  # 20km radius
-                    "maxRows": 50,
-                    "style": "MEDIUM",
-                    "username": "demo"
-                }
-            
-            response = await client.get(url, params=params)
-            
-            if response.status_code != 200:
-                logger.error(f"GeoNames API error: {response.status_code}")
-                return []
-            
-            data = response.json()
-            neighborhoods = []
-            
-            for place in data.get('geonames', []):
-                # Skip if it's the same as the city name
-                if place.get('name') != city:
-                    neighborhoods.append({
-                        "name": place.get('name'),
-                        "distance": place.get('distance'),  # km from center
-                        "population": place.get('population', 0)
-                    })
-            
-            # Sort by distance (closest first)
-            neighborhoods.sort(key=lambda x: x.get('distance', 999))
-            
-            return neighborhoods[:50]  # Limit to 50
-            
+            for place in rows
+            if place.get("name") != city
+        ]
+        neighborhoods.sort(key=lambda n: float(n["distance"] or 999))
+        return neighborhoods[:50]
     except Exception as e:
-        logger.error(f"Failed to get neighborhoods from GeoNames: {e}")
+        logger.error(f"Failed to get neighborhoods from gazetteer: {e}")
         return []
@@ -6,10 +6,20 @@ from ..models import Follow
 # from ..routers.activity import create_checkin_activity  # Removed unused activity router
 from ..utils import can_view_checkin, haversine_distance
 from ..utils import category_filter, foursquare_filter_mapper
+from ..utils import encode_cursor, decode_cursor, FastJSONResponse
 from ..services.place_data_service_v2 import enhanced_place_data_service, EnhancedPlaceDataService
 from ..services.storage import StorageService
 from ..services.jwt_service import JWTService
 from ..services.place_chat_service import create_private_reply_from_place_chat
+from ..services.place_chat_buffer import place_chat_buffer
+from ..services.place_chat_room_state import place_chat_room_state
+from ..services.presence_index import presence_index
+from ..services.place_detail_cache import place_detail_cache
+from ..services.place_stats import checkin_totals, recent_checkin_counts
+from ..services.user_counters import adjust_counters
+from ..services.search_service import PLACE_SEARCH_COLUMNS, contains_clause, relevance_order
+from ..services.autocomplete_index import autocomplete_index
+from ..services.lookup_dictionary import LOOKUPS_VERSION_HEADER, lookup_dictionary
 from ..config import settings
 from ..schemas import (
     PlaceCreate,
@@ -55,6 +65,8 @@ from ..models import (
     Review,
     Photo,
     CheckInPhoto,
+    CheckInComment,
+    CheckInLike,
     ExternalSearchSnapshot,
     UserCollection,
     PlaceChatMessage,
@@ -68,7 +80,7 @@ from ..services.collection_sync import (
 from ..database import get_db
 from fastapi import APIRouter, Depends, HTTPException, Query, status, UploadFile, File, Form, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_, desc, asc, text
+from sqlalchemy import select, delete, func, and_, or_, desc, asc, text
 from sqlalchemy.orm import selectinload, joinedload
 from typing import Optional, List, Dict, Any
 from datetime import datetime, timezone, timedelta
@@ -78,6 +90,9 @@ router = APIRouter(prefix="/places", tags=["places"])
 
 logger = logging.getLogger(__name__)
 
+# Matches EnhancedPlaceResponse.recent_reviews
+RECENT_REVIEWS_DAYS = 30
+
 
 def _get_all_place_photos(place) -> list[str]:
     """Helper function to get all photos for a place, combining photo_url and additional_photos."""
@@ -130,20 +145,11 @@ async def _get_dynamic_limit_based_on_checkins(db: AsyncSession, time_window: st
 
         # Use the chat window from config (default 12 hours)
         chat_window_hours = settings.place_chat_window_hours
-        chat_since_time = datetime.now(
-            timezone.utc) - timedelta(hours=chat_window_hours)
 
         # Count unique users who can currently chat (have check-ins within chat window)
         # This represents people who are "present" and can interact
-        chat_users_count_query = select(func.count(func.distinct(CheckIn.user_id))).where(
-            and_(
-                CheckIn.created_at >= chat_since_time,
-                CheckIn.expires_at > datetime.now(
-                    timezone.utc)  # Check-in hasn't expired
-            )
-        )
-        result = await db.execute(chat_users_count_query)
-        chat_users_count = result.scalar() or 0
+        await presence_index.ensure_loaded()
+        chat_users_count = presence_index.total_active_users()
 
         # Calculate dynamic limit: minimum 3, maximum 50, based on people who can chat
         # Scale factor: every 2 people who can chat adds 1 to the limit
@@ -171,30 +177,20 @@ def _time_window_to_hours(time_window: str) -> int:
     return mapping.get(time_window, 24)
 
 
-async def _get_recent_checkins_count(
+async def _get_recent_checkins_counts(
     db: AsyncSession,
-    place_id: int,
+    place_ids: list[int],
     hours: int,
-) -> int:
+) -> dict[int, int]:
     try:
-        now = datetime.now(timezone.utc)
-        since = now - timedelta(hours=hours)
-        stmt = select(func.count(func.distinct(CheckIn.user_id))).where(
-            and_(
-                CheckIn.place_id == place_id,
-                CheckIn.created_at >= since,
-                CheckIn.expires_at > now  # Only count non-expired check-ins
-            )
-        )
-        result = await db.execute(stmt)
-        return int(result.scalar() or 0)
+        return await recent_checkin_counts(db, place_ids, hours)
     except Exception as exc:
         logger.warning(
-            "Failed to compute recent check-in count for place %s: %s",
-            place_id,
+            "Failed to compute recent check-in counts for places %s: %s",
+            place_ids,
             exc,
         )
-        return 0
+        return {}
 
 
 def _convert_to_signed_urls(photo_urls: list[str]) -> list[str]:
@@ -286,33 +282,12 @@ def _collect_place_photos(place: Place) -> list[str]:
     return unique
 
 
-async def _ensure_user_can_chat(
-    db: AsyncSession,
-    place_id: int,
-    user_id: int,
-) -> CheckIn:
-    now = datetime.now(timezone.utc)
-    window_start = now - timedelta(hours=int(settings.place_chat_window_hours))
-
-    query = (
-        select(CheckIn)
-        .where(
-            CheckIn.user_id == user_id,
-            CheckIn.place_id == place_id,
-            CheckIn.created_at >= window_start,
-            CheckIn.expires_at > now,
-        )
-        .order_by(desc(CheckIn.created_at))
-    )
-
-    result = await db.execute(query)
-    checkin = result.scalar_one_or_none()
-    if not checkin:
+async def _ensure_user_can_chat(place_id: int, user_id: int) -> None:
+    if not await presence_index.confirm(place_id, user_id):
         raise HTTPException(
             status_code=403,
             detail="You need a recent check-in at this place to use the chat",
         )
-    return checkin
 
 
 async def _build_place_chat_room(
@@ -321,42 +296,9 @@ async def _build_place_chat_room(
     current_user_id: int,
 ) -> PlaceChatRoom:
     now = datetime.now(timezone.utc)
-    window_hours = int(settings.place_chat_window_hours)
-    window_delta = timedelta(hours=window_hours)
-    window_start = now - window_delta
-
-    active_users_query = select(func.count(func.distinct(CheckIn.user_id))).where(
-        CheckIn.place_id == place.id,
-        CheckIn.created_at >= window_start,
-        CheckIn.expires_at > now,
-    )
-    active_users_count = int((await db.execute(active_users_query)).scalar() or 0)
-
-    latest_checkin_query = select(func.max(CheckIn.created_at)).where(
-        CheckIn.place_id == place.id,
-        CheckIn.created_at >= window_start,
-    )
-    latest_checkin = (await db.execute(latest_checkin_query)).scalar()
-    expires_at = (latest_checkin + window_delta) if latest_checkin else now
-
-    membership_query = select(CheckIn.id).where(
-        CheckIn.user_id == current_user_id,
-        CheckIn.place_id == place.id,
-        CheckIn.created_at >= window_start,
-        CheckIn.expires_at > now,
-    )
-    has_joined = bool((await db.execute(membership_query)).scalar_one_or_none())
-
-    last_message_query = (
-        select(PlaceChatMessage)
-        .where(PlaceChatMessage.place_id == place.id)
-        .order_by(desc(PlaceChatMessage.created_at))
-        .limit(1)
-    )
-    last_message_row = (await db.execute(last_message_query)).scalar_one_or_none()
-
-    last_message_text = last_message_row.text if last_message_row else None
-    last_message_at = last_message_row.created_at if last_message_row else None
+    state = await place_chat_room_state.get_summary(db, place.id, current_user_id, now)
+    active_users_count = state["active_users_count"]
+    expires_at = state["expires_at"]
 
     created_at = place.created_at or now
     if created_at.tzinfo is None:
@@ -372,9 +314,9 @@ async def _build_place_chat_room(
         expires_at=expires_at,
         active_users_count=active_users_count,
         is_active=active_users_count > 0 and expires_at > now,
-        has_joined=has_joined,
-        last_message=last_message_text,
-        last_message_at=last_message_at,
+        has_joined=state["has_joined"],
+        last_message=state["last_message"],
+        last_message_at=state["last_message_at"],
     )
 
 
@@ -402,6 +344,29 @@ def _serialize_place_chat_message_response(
     )
 
 
+async def _load_recent_place_chat_messages(
+    db: AsyncSession,
+    place_id: int,
+    window_start: datetime,
+    limit: int,
+) -> list[dict]:
+    """Newest messages in the chat window, oldest first, ready for the buffer."""
+    rows = await db.execute(
+        select(PlaceChatMessage, User)
+        .join(User, PlaceChatMessage.user_id == User.id)
+        .where(
+            PlaceChatMessage.place_id == place_id,
+            PlaceChatMessage.created_at >= window_start,
+        )
+        .order_by(PlaceChatMessage.created_at.desc(), PlaceChatMessage.id.desc())
+        .limit(limit)
+    )
+    return [
+        _serialize_place_chat_message_response(message, user).model_dump(mode="json")
+        for message, user in reversed(rows.all())
+    ]
+
+
 async def _get_place_or_404(db: AsyncSession, place_id: int) -> Place:
     res = await db.execute(select(Place).where(Place.id == place_id))
     place = res.scalar_one_or_none()
@@ -446,31 +411,37 @@ def _parse_iso_datetime(value: str) -> datetime:
 # ============================================================================
 
 
+@router.get("/lookups/version")
+async def get_lookups_version():
+    """
+    Current version of the country, city and neighborhood lookups.
+
+    **Authentication Required:** No
+
+    Changes whenever a lookup list does; clients can keep their copies until
+    it moves. Lookup responses carry it in the X-Lookups-Version header.
+    """
+    await lookup_dictionary.ensure_loaded()
+    return {"version": lookup_dictionary.version}
+
+
 @router.get("/lookups/countries", response_model=list[str])
 async def get_countries(
+    response: Response,
     q: str = Query("", description="Search query for country names"),
     limit: int = Query(50, ge=1, le=100),
-    db: AsyncSession = Depends(get_db),
 ):
     """
     Get list of countries with optional search filtering.
 
     **Authentication Required:** No
+
+    Prefix matches come first, then other matches containing the query.
     """
     try:
-        # Get unique countries from places
-        query = select(Place.country).distinct().where(
-            Place.country.isnot(None))
-
-        if q:
-            query = query.where(Place.country.ilike(f"%{q}%"))
-
-        query = query.limit(limit)
-
-        result = await db.execute(query)
-        countries = [row[0] for row in result.fetchall()]
-
-        return sorted(countries)
+        await lookup_dictionary.ensure_loaded()
+        response.headers[LOOKUPS_VERSION_HEADER] = lookup_dictionary.version
+        return lookup_dictionary.countries(q, limit)
 
     except Exception as e:
         logging.error(f"Error fetching countries: {e}")
@@ -480,30 +451,22 @@ async def get_countries(
 
 @router.get("/lookups/cities", response_model=list[str])
 async def get_cities(
+    response: Response,
     country: str = Query("", description="Filter by country"),
     q: str = Query("", description="Search query for city names"),
     limit: int = Query(50, ge=1, le=100),
-    db: AsyncSession = Depends(get_db),
 ):
     """
     Get list of cities with optional country filtering and search.
 
     **Authentication Required:** No
+
+    Prefix matches come first, then other matches containing the query.
     """
     try:
-        query = select(Place.city).distinct().where(Place.city.isnot(None))
-        if country:
-            query = query.where(Place.country == country)
-
-        if q:
-            query = query.where(Place.city.ilike(f"%{q}%"))
-
-        query = query.limit(limit)
-
-        result = await db.execute(query)
-        cities = [row[0] for row in result.fetchall()]
-
-        return sorted(cities)
+        await lookup_dictionary.ensure_loaded()
+        response.headers[LOOKUPS_VERSION_HEADER] = lookup_dictionary.version
+        return lookup_dictionary.cities(country, q, limit)
 
     except Exception as e:
         logging.error(f"Error fetching cities: {e}")
@@ -512,32 +475,22 @@ async def get_cities(
 
 @router.get("/lookups/neighborhoods", response_model=list[str])
 async def get_neighborhoods(
+    response: Response,
     city: str = Query("", description="Filter by city"),
     q: str = Query("", description="Search query for neighborhood names"),
     limit: int = Query(50, ge=1, le=100),
-    db: AsyncSession = Depends(get_db),
 ):
     """
     Get list of neighborhoods with optional city filtering and search.
 
     **Authentication Required:** No
+
+    Prefix matches come first, then other matches containing the query.
     """
     try:
-        query = select(Place.neighborhood).distinct().where(
-            Place.neighborhood.isnot(None))
-
-        if city:
-            query = query.where(Place.city == city)
-
-        if q:
-            query = query.where(Place.neighborhood.ilike(f"%{q}%"))
-
-        query = query.limit(limit)
-
-        result = await db.execute(query)
-        neighborhoods = [row[0] for row in result.fetchall()]
-
-        return sorted(neighborhoods)
+        await lookup_dictionary.ensure_loaded()
+        response.headers[LOOKUPS_VERSION_HEADER] = lookup_dictionary.version
+        return lookup_dictionary.neighborhoods(city, q, limit)
 
     except Exception as e:
         logging.error(f"Error fetching neighborhoods: {e}")
@@ -549,6 +502,38 @@ async def get_neighborhoods(
 # ============================================================================
 
 
+@router.get("/search/suggestions", response_model=SearchSuggestions)
+async def get_search_suggestions(
+    q: str = Query(..., min_length=1, max_length=100,
+                   description="Prefix typed so far"),
+    limit: int = Query(5, ge=1, le=20, description="Suggestions per type"),
+    current_user: User = Depends(JWTService.get_current_user),
+) -> SearchSuggestions:
+    """
+    Type-ahead suggestions for places, cities, neighborhoods and categories.
+
+    Served from an in-memory prefix index, most popular first.
+
+    **Authentication Required:** Yes
+    """
+    await autocomplete_index.ensure_loaded()
+    found = autocomplete_index.suggest(q, limit)
+
+    def to_suggestions(kind: str) -> list[SearchSuggestion]:
+        return [
+            SearchSuggestion(type=kind, value=entry.value,
+                             count=entry.weight, place_id=entry.place_id)
+            for entry in found[kind]
+        ]
+
+    return SearchSuggestions(
+        places=to_suggestions("place"),
+        cities=to_suggestions("city"),
+        neighborhoods=to_suggestions("neighborhood"),
+        categories=to_suggestions("category"),
+    )
+
+
 @router.get("/search", response_model=PaginatedPlaces)
 async def search_places(
     q: str = Query("", description="Search query"),
@@ -571,16 +556,9 @@ async def search_places(
         # Build base query
         query = select(Place).where(Place.id.isnot(None))
 
-        # Text search
+        # Text search (trigram-indexed on PostgreSQL)
         if q:
-            query = query.where(
-                or_(
-                    Place.name.ilike(f"%{q}%"),
-                    Place.categories.ilike(f"%{q}%"),
-                    Place.address.ilike(f"%{q}%"),
-                    Place.city.ilike(f"%{q}%")
-                )
-            )
+            query = query.where(contains_clause(PLACE_SEARCH_COLUMNS, q))
 
         # Location-based filtering
         if lat is not None and lng is not None:
@@ -597,7 +575,9 @@ async def search_places(
         total_result = await db.execute(count_query)
         total = total_result.scalar()
 
-        # Apply pagination and ordering
+        # Apply pagination and ordering, best matches first
+        if q:
+            query = query.order_by(*relevance_order(db, PLACE_SEARCH_COLUMNS, q))
         query = query.order_by(desc(Place.created_at)
                                ).offset(offset).limit(limit)
 
@@ -639,7 +619,8 @@ async def search_places(
             )
             items.append(place_resp)
 
-        return PaginatedPlaces(items=items, total=total, limit=limit, offset=offset)
+        return FastJSONResponse(
+            PaginatedPlaces(items=items, total=total, limit=limit, offset=offset))
 
     except Exception as e:
         import traceback
@@ -664,14 +645,9 @@ async def search_places_advanced_flexible(
         query = select(Place).where(Place.id.isnot(None))
 
         # Apply filters
+        search_columns = (Place.name, Place.categories, Place.address)
         if filters.query:
-            query = query.where(
-                or_(
-                    Place.name.ilike(f"%{filters.query}%"),
-                    Place.categories.ilike(f"%{filters.query}%"),
-                    Place.address.ilike(f"%{filters.query}%")
-                )
-            )
+            query = query.where(contains_clause(search_columns, filters.query))
 
         if filters.categories:
             for category in filters.categories:
@@ -754,7 +730,10 @@ async def search_places_advanced_flexible(
             else:
                 query = query.order_by(desc(order_field))
         else:
-            # Default sorting
+            # Default sorting: best text matches first, then newest
+            if filters.query:
+                query = query.order_by(
+                    *relevance_order(db, search_columns, filters.query))
             query = query.order_by(desc(Place.created_at))
 
         # Apply pagination
@@ -797,12 +776,12 @@ async def search_places_advanced_flexible(
             )
             items.append(place_resp)
 
-        return PaginatedPlaces(
+        return FastJSONResponse(PaginatedPlaces(
             items=items,
             total=total,
             limit=filters.limit,
             offset=filters.offset,
-        )
+        ))
 
     except Exception as e:
         logging.error(f"Error in advanced place search: {e}")
@@ -1005,6 +984,9 @@ async def get_trending_places(
     else:
         logger.warning("No places to use - returning empty results")
 
+    recent_counts = await _get_recent_checkins_counts(
+        db, [place.id for place in places_to_use], hours_window)
+
     for place in places_to_use:
         try:
             all_photos: list[str] = []
@@ -1027,11 +1009,7 @@ async def get_trending_places(
                 else:
                     all_photos.extend(additional_photos_list)
 
-            recent_count = await _get_recent_checkins_count(
-                db,
-                place.id,
-                hours_window,
-            )
+            recent_count = recent_counts.get(place.id, 0)
 
             fsq_items.append(
                 PlaceResponse(
@@ -1087,12 +1065,12 @@ async def get_trending_places(
 
     filtered_items.sort(key=lambda item: item.distance_meters or float("inf"))
 
-    return PaginatedPlaces(
+    return FastJSONResponse(PaginatedPlaces(
         items=filtered_items,
         total=len(filtered_items),
         limit=limit,
         offset=offset,
-    )
+    ))
 
 
 @router.get("/nearby", response_model=PaginatedPlaces)
@@ -1228,6 +1206,9 @@ async def nearby_places(
     hours_window = 24
     fsq_items: list[PlaceResponse] = []
 
+    recent_counts = await _get_recent_checkins_counts(
+        db, [place.id for place in places_to_use], hours_window)
+
     for place in places_to_use:
         try:
             all_photos: list[str] = []
@@ -1251,11 +1232,7 @@ async def nearby_places(
             else:
                 all_photos.extend(additional_photos_list)
 
-            recent_count = await _get_recent_checkins_count(
-                db,
-                place.id,
-                hours_window,
-            )
+            recent_count = recent_counts.get(place.id, 0)
 
             fsq_items.append(
                 PlaceResponse(
@@ -1311,18 +1288,117 @@ async def nearby_places(
 
     filtered_items.sort(key=lambda item: item.distance_meters or float("inf"))
 
-    return PaginatedPlaces(
+    return FastJSONResponse(PaginatedPlaces(
         items=filtered_items,
         total=len(filtered_items),
         limit=limit,
         offset=offset,
-    )
+    ))
 
 # ============================================================================
 # PLACE DETAILS ENDPOINTS (Used by frontend)
 # ============================================================================
 
 
+async def _load_place_details(db: AsyncSession, place: Place) -> EnhancedPlaceResponse:
+    """Build the viewer-independent place detail with batched queries: recent
+    check-ins, their photos in one IN query, and one aggregate for totals."""
+    recent_checkins = (await db.execute(
+        select(CheckIn.id, CheckIn.photo_url)
+        .where(CheckIn.place_id == place.id)
+        .order_by(desc(CheckIn.created_at))
+        .limit(10)
+    )).all()
+
+    photos_by_checkin: dict[int, list[str]] = {}
+    if recent_checkins:
+        photo_rows = await db.execute(
+            select(CheckInPhoto.check_in_id, CheckInPhoto.url)
+            .where(CheckInPhoto.check_in_id.in_([c.id for c in recent_checkins]))
+            .order_by(CheckInPhoto.check_in_id, CheckInPhoto.id)
+        )
+        for checkin_id, url in photo_rows.all():
+            if url:
+                photos_by_checkin.setdefault(checkin_id, []).append(url)
+
+    now = datetime.now(timezone.utc)
+    total_checkins = (await checkin_totals(db, [place.id]))[place.id]
+    totals = (await db.execute(select(
+        select(func.count(Review.id))
+        .where(Review.place_id == place.id)
+        .scalar_subquery().label("reviews_count"),
+        select(func.count(Review.id))
+        .where(
+            Review.place_id == place.id,
+            Review.created_at >= now - timedelta(days=RECENT_REVIEWS_DAYS),
+        )
+        .scalar_subquery().label("recent_reviews"),
+    ))).one()
+
+    aggregated_photo_urls: list[str] = []
+    place_photo_candidates = _collect_place_photos(place)
+
+    for checkin in recent_checkins:
+        signed_photo_urls = _convert_to_signed_urls(
+            photos_by_checkin.get(checkin.id, []))
+
+        if not signed_photo_urls and checkin.photo_url:
+            single_signed = _convert_single_to_signed_url(checkin.photo_url)
+            if single_signed:
+                signed_photo_urls = [single_signed]
+
+        if not signed_photo_urls and place_photo_candidates:
+            signed_photo_urls = place_photo_candidates[:1]
+
+        aggregated_photo_urls.extend(signed_photo_urls)
+
+    place_stats = PlaceStats(
+        place_id=place.id,
+        average_rating=place.rating,
+        reviews_count=int(totals.reviews_count or 0),
+        active_checkins=0,
+    )
+
+    if place_photo_candidates:
+        aggregated_photo_urls[0:0] = place_photo_candidates
+
+    seen_urls: set[str] = set()
+    unique_photos: list[str] = []
+    for url in aggregated_photo_urls:
+        if url and url not in seen_urls:
+            seen_urls.add(url)
+            unique_photos.append(url)
+
+    primary_photo = unique_photos[0] if unique_photos else None
+    if not primary_photo and place_photo_candidates:
+        primary_photo = place_photo_candidates[0]
+
+    return EnhancedPlaceResponse(
+        id=place.id,
+        name=place.name,
+        address=place.address,
+        country=place.country,
+        city=place.city,
+        neighborhood=place.neighborhood,
+        latitude=place.latitude,
+        longitude=place.longitude,
+        categories=place.categories,
+        rating=place.rating,
+        description=place.description,
+        price_tier=place.price_tier,
+        photo_url=primary_photo,
+        photos=unique_photos,
+        created_at=place.created_at,
+        stats=place_stats,
+        current_checkins=0,
+        total_checkins=total_checkins,
+        recent_reviews=int(totals.recent_reviews or 0),
+        photos_count=len(unique_photos),
+        is_checked_in=False,
+        is_saved=False,
+    )
+
+
 @router.get("/{place_id}", response_model=EnhancedPlaceResponse)
 async def get_place_details(
     place_id: int,
@@ -1339,13 +1415,17 @@ async def get_place_details(
         if place_id <= 0:
             raise HTTPException(status_code=400, detail="Invalid place ID")
 
-        # Get place with related data
-        query = select(Place).where(Place.id == place_id)
-        result = await db.execute(query)
-        place = result.scalar_one_or_none()
+        # Viewer-independent part, shared between requests for a short TTL
+        details = place_detail_cache.get(place_id)
+        if details is None:
+            result = await db.execute(select(Place).where(Place.id == place_id))
+            place = result.scalar_one_or_none()
 
-        if not place:
-            raise HTTPException(status_code=404, detail="Place not found")
+            if not place:
+                raise HTTPException(status_code=404, detail="Place not found")
+
+            details = await _load_place_details(db, place)
+            place_detail_cache.set(place_id, details)
 
         saved_result = await db.execute(
             select(SavedPlace.id).where(
@@ -1357,115 +1437,15 @@ async def get_place_details(
         )
         is_saved = saved_result.scalar_one_or_none() is not None
 
-        recent_checkins_query = (
-            select(CheckIn)
-            .where(CheckIn.place_id == place_id)
-            .order_by(desc(CheckIn.created_at))
-            .limit(10)
-        )
-        recent_checkins_result = await db.execute(recent_checkins_query)
-        recent_checkins = recent_checkins_result.scalars().all()
-
-        checkin_responses: list[CheckInResponse] = []
-        aggregated_photo_urls: list[str] = []
-        place_photo_candidates = _collect_place_photos(place)
-        now = datetime.now(timezone.utc)
-        time_limit = timedelta(hours=settings.photo_aggregation_hours)
-
-        for checkin in recent_checkins:
-            checkin_created_at = (
-                checkin.created_at.replace(tzinfo=timezone.utc)
-                if checkin.created_at.tzinfo is None
-                else checkin.created_at
-            )
-            allowed_to_chat = (now - checkin_created_at) < time_limit
-
-            photo_query = select(CheckInPhoto).where(
-                CheckInPhoto.check_in_id == checkin.id
-            )
-            photo_result = await db.execute(photo_query)
-            photos = photo_result.scalars().all()
-            raw_photo_urls = [photo.url for photo in photos if photo.url]
-            signed_photo_urls = _convert_to_signed_urls(raw_photo_urls)
-
-            if not signed_photo_urls and checkin.photo_url:
-                single_signed = _convert_single_to_signed_url(
-                    checkin.photo_url)
-                if single_signed:
-                    signed_photo_urls = [single_signed]
-
-            if not signed_photo_urls and place_photo_candidates:
-                signed_photo_urls = place_photo_candidates[:1]
+        await presence_index.ensure_loaded()
+        active_checkins = presence_index.active_user_count(place_id)
 
-            aggregated_photo_urls.extend(signed_photo_urls)
-
-            checkin_responses.append(
-                CheckInResponse(
-                    id=checkin.id,
-                    user_id=checkin.user_id,
-                    place_id=checkin.place_id,
-                    note=checkin.note,
-                    visibility=checkin.visibility,
-                    created_at=checkin.created_at,
-                    expires_at=checkin.expires_at,
-                    latitude=checkin.latitude,
-                    longitude=checkin.longitude,
-                    photo_url=(
-                        signed_photo_urls[0]
-                        if signed_photo_urls
-                        else _convert_single_to_signed_url(checkin.photo_url)
-                    ),
-                    photo_urls=signed_photo_urls,
-                    allowed_to_chat=allowed_to_chat,
-                )
-            )
-
-        place_stats = PlaceStats(
-            place_id=place.id,
-            average_rating=place.rating,
-            reviews_count=0,  # TODO: Calculate actual reviews count
-            active_checkins=len(recent_checkins),
-        )
-
-        if place_photo_candidates:
-            aggregated_photo_urls[0:0] = place_photo_candidates
-
-        seen_urls: set[str] = set()
-        unique_photos: list[str] = []
-        for url in aggregated_photo_urls:
-            if url and url not in seen_urls:
-                seen_urls.add(url)
-                unique_photos.append(url)
-
-        primary_photo = unique_photos[0] if unique_photos else None
-        if not primary_photo and place_photo_candidates:
-            primary_photo = place_photo_candidates[0]
-
-        return EnhancedPlaceResponse(
-            id=place.id,
-            name=place.name,
-            address=place.address,
-            country=place.country,
-            city=place.city,
-            neighborhood=place.neighborhood,
-            latitude=place.latitude,
-            longitude=place.longitude,
-            categories=place.categories,
-            rating=place.rating,
-            description=place.description,
-            price_tier=place.price_tier,
-            photo_url=primary_photo,
-            photos=unique_photos,
-            created_at=place.created_at,
-            stats=place_stats,
-            current_checkins=len(recent_checkins),
-            # TODO: Calculate actual total check-ins
-            total_checkins=len(recent_checkins),
-            recent_reviews=0,  # TODO: Calculate recent reviews
-            photos_count=len(unique_photos),
-            is_checked_in=False,  # TODO: Check if current user is checked in
-            is_saved=is_saved,
-        )
+        return details.model_copy(update={
+            "stats": details.stats.model_copy(update={"active_checkins": active_checkins}),
+            "current_checkins": active_checkins,
+            "is_checked_in": presence_index.is_active(place_id, current_user.id),
+            "is_saved": is_saved,
+        })
 
     except HTTPException:
         raise
@@ -1628,48 +1608,52 @@ async def get_whos_here(
     place_id: int,
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    before: Optional[str] = Query(
+        None, description="Cursor; return people who checked in before this position"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(JWTService.get_current_user),
 ):
     """
     Get list of users who are currently at this place.
 
+    Each person appears once, with their latest active check-in, newest first.
+    Page with `before` set to the previous response's `next_cursor`.
+
     **Authentication Required:** Yes
     """
     try:
-        from ..config import settings
-
-        # Get recent check-ins for this place (within chat window from config)
-        chat_window_hours = settings.place_chat_window_hours
-        time_limit = datetime.now(timezone.utc) - \
-            timedelta(hours=chat_window_hours)
-
-        query = select(CheckIn).join(User).where(
-            and_(
-                CheckIn.place_id == place_id,
-                CheckIn.created_at >= time_limit,
-                CheckIn.expires_at > datetime.now(timezone.utc)
+        # Latest active check-in per user, newest first, from the presence index
+        await presence_index.ensure_loaded()
+        present = presence_index.present_users(place_id)
+        total = len(present)
+        if before:
+            position = decode_cursor(before)
+            present = [key for key in present if key < position]
+        else:
+            present = present[offset:]
+        page = present[:limit]
+        has_more = len(present) > limit
+
+        rows = []
+        if page:
+            page_ids = [checkin_id for _, checkin_id in page]
+            result = await db.execute(
+                select(CheckIn, User)
+                .join(User, CheckIn.user_id == User.id)
+                .where(CheckIn.id.in_(page_ids))
             )
-        ).order_by(desc(CheckIn.created_at))
-
-        # Get total count
-        count_query = select(func.count()).select_from(query.subquery())
-        total_result = await db.execute(count_query)
-        total = total_result.scalar()
+            by_id = {checkin.id: (checkin, user) for checkin, user in result.all()}
+            rows = [by_id[cid] for cid in page_ids if cid in by_id]
 
-        # Apply pagination
-        query = query.offset(offset).limit(limit)
-        result = await db.execute(query)
-        checkins = result.scalars().all()
-
-        if not checkins:
+        if not rows:
             return PaginatedWhosHere(
                 items=[],
-                total=total or 0,
+                total=total,
                 limit=limit,
                 offset=offset,
             )
 
+        checkins = [checkin for checkin, _ in rows]
         checkin_ids = [checkin.id for checkin in checkins]
         place_ids = {checkin.place_id for checkin in checkins}
 
@@ -1691,14 +1675,7 @@ async def get_whos_here(
                 place_photo_map[place.id] = _collect_place_photos(place)
 
         items = []
-        for checkin in checkins:
-            user_query = select(User).where(User.id == checkin.user_id)
-            user_result = await db.execute(user_query)
-            user = user_result.scalar_one_or_none()
-
-            if not user:
-                continue
-
+        for checkin, user in rows:
             signed_photos = _convert_to_signed_urls(
                 photos_by_checkin.get(checkin.id, [])
             )
@@ -1727,13 +1704,18 @@ async def get_whos_here(
                 )
             )
 
+        last_created_at, last_id = page[-1]
         return PaginatedWhosHere(
             items=items,
-            total=total or len(items),
+            total=total,
             limit=limit,
             offset=offset,
+            next_cursor=encode_cursor(last_created_at, last_id) if has_more else None,
+            has_more=has_more,
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Error getting who's here: {e}")
         raise HTTPException(status_code=500, detail="Failed to get who's here")
@@ -1760,7 +1742,7 @@ async def join_place_chat(
     current_user: User = Depends(JWTService.get_current_user),
 ):
     place = await _get_place_or_404(db, place_id)
-    await _ensure_user_can_chat(db, place_id, current_user.id)
+    await _ensure_user_can_chat(place_id, current_user.id)
     return await _build_place_chat_room(db, place, current_user.id)
 
 
@@ -1786,7 +1768,7 @@ async def list_place_chat_messages(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(JWTService.get_current_user),
 ):
-    await _ensure_user_can_chat(db, place_id, current_user.id)
+    await _ensure_user_can_chat(place_id, current_user.id)
     filters = [PlaceChatMessage.place_id == place_id]
 
     window_start = datetime.now(timezone.utc) - timedelta(
@@ -1799,6 +1781,20 @@ async def list_place_chat_messages(
         since_dt = _parse_iso_datetime(since)
         filters.append(PlaceChatMessage.created_at > since_dt)
 
+    # Serve from the in-memory buffer unless the page reaches past it
+    async def load_recent(room_id: int, count: int):
+        return await _load_recent_place_chat_messages(db, room_id, window_start, count)
+
+    await place_chat_buffer.ensure_loaded(place_id, load_recent)
+    buffered = place_chat_buffer.recent(place_id, window_start, since_dt)
+    if buffered is not None:
+        return PaginatedPlaceChatMessages(
+            items=buffered[offset:offset + limit],
+            total=len(buffered),
+            limit=limit,
+            offset=offset,
+        )
+
     total_query = select(func.count()).select_from(
         select(PlaceChatMessage.id).where(*filters).subquery()
     )
@@ -1840,7 +1836,7 @@ async def create_place_chat_message(
             status_code=400, detail="Message text cannot be empty")
 
     place = await _get_place_or_404(db, place_id)
-    await _ensure_user_can_chat(db, place_id, current_user.id)
+    await _ensure_user_can_chat(place_id, current_user.id)
 
     message = PlaceChatMessage(
         place_id=place.id,
@@ -1853,10 +1849,12 @@ async def create_place_chat_message(
 
     response_model = _serialize_place_chat_message_response(
         message, current_user)
+    message_dict = response_model.model_dump(mode="json")
+    await place_chat_buffer.publish(message_dict)
 
     payload_dict = {
         "type": "message",
-        "message": response_model.model_dump(mode="json"),
+        "message": message_dict,
     }
 
     # Notify other participants in the room
@@ -1912,8 +1910,10 @@ async def create_check_in(
         )
 
         db.add(check_in)
+        await adjust_counters(db, current_user.id, check_ins=1)
         await db.commit()
         await db.refresh(check_in)
+        await presence_index.publish_checkin(check_in)
 
         return CheckInResponse(
             id=check_in.id,
@@ -1982,6 +1982,7 @@ async def create_check_in_full(
 
         db.add(check_in)
         await db.flush()  # Get the ID before committing
+        await adjust_counters(db, current_user.id, check_ins=1)
 
         photo_urls: list[str] = []
         if photos:
@@ -2005,6 +2006,7 @@ async def create_check_in_full(
 
         await db.commit()
         await db.refresh(check_in)
+        await presence_index.publish_checkin(check_in)
 
         signed_photo_urls = _convert_to_signed_urls(photo_urls)
 
@@ -2082,9 +2084,18 @@ async def delete_check_in(
             # Delete photo record
             await db.delete(photo)
 
-        # Delete the check-in
-        await db.delete(checkin)
+        # Delete the check-in; only the request that actually removed the row
+        # adjusts the counters (a bulk delete skips the ORM cascade, so clear
+        # comments and likes explicitly)
+        place_id = checkin.place_id
+        await db.execute(delete(CheckInComment).where(CheckInComment.check_in_id == check_in_id))
+        await db.execute(delete(CheckInLike).where(CheckInLike.check_in_id == check_in_id))
+        res = await db.execute(delete(CheckIn).where(CheckIn.id == check_in_id))
+        if not res.rowcount:
+            raise HTTPException(status_code=404, detail="Check-in not found")
+        await adjust_counters(db, current_user.id, check_ins=-res.rowcount)
         await db.commit()
+        await presence_index.publish_removal(check_in_id, place_id)
 
     except HTTPException:
         await db.rollback()
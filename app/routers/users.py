@@ -12,24 +12,26 @@ from fastapi import (
     status,
 )
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_, desc, asc
+from sqlalchemy import select, func, and_, desc, asc
 
 from ..database import get_db
 from ..services.jwt_service import JWTService
 from ..services.storage import StorageService
+from ..services.collection_covers import fetch_cover_photos
 from ..services.collection_sync import ensure_default_collection
+from ..services.follow_graph import follow_graph
+from ..services.search_service import USER_SEARCH_COLUMNS, contains_clause, relevance_order
 from ..utils import (
-    can_view_checkin,
-    can_view_collection,
     can_view_profile,
-    should_appear_in_search
+    can_view_stats,
+    PrivacyEngine,
+    visible_to_viewer_clause,
 )
 from ..models import (
     User,
     CheckIn,
     CheckInPhoto,
     Photo,
-    Follow,
     UserInterest,
     SavedPlace,
     CheckInLike,
@@ -175,14 +177,11 @@ async def search_users(
         # Build base query excluding the requester
         query = select(User).where(User.id != current_user.id)
 
-        # Apply text filters
+        # Apply text filters, best matches first (trigram-indexed on PostgreSQL)
         if filters.q:
-            query = query.where(
-                or_(
-                    User.username.ilike(f"%{filters.q}%"),
-                    User.name.ilike(f"%{filters.q}%"),
-                )
-            )
+            query = query.where(contains_clause(USER_SEARCH_COLUMNS, filters.q))
+            query = query.order_by(
+                *relevance_order(db, USER_SEARCH_COLUMNS, filters.q), User.id)
 
         # Pagination
         query = query.offset(filters.offset).limit(filters.limit)
@@ -190,12 +189,16 @@ async def search_users(
         result = await db.execute(query)
         users = result.scalars().all()
 
+        # One follow lookup covers the visibility checks for every result
+        privacy = await PrivacyEngine.load(
+            db, current_user.id, [user.id for user in users])
+
         responses: list[PublicUserSearchResponse] = []
         for user in users:
-            if not await should_appear_in_search(db, user, current_user.id):
+            if not privacy.can_view(user.id, user.search_visibility):
                 continue
 
-            if await can_view_profile(db, user, current_user.id):
+            if privacy.can_view(user.id, user.profile_visibility):
                 responses.append(
                     PublicUserSearchResponse(
                         id=user.id,
@@ -205,7 +208,7 @@ async def search_users(
                         avatar_url=_convert_single_to_signed_url(
                             user.avatar_url),
                         created_at=user.created_at,
-                        followed=False,  # TODO: compute follow state
+                        followed=user.id in privacy.followed_owner_ids,
                     )
                 )
 
@@ -253,14 +256,10 @@ async def get_user_profile(
                     status_code=403, detail="Cannot view this profile")
 
         # Check if current user follows this user
-        follow_query = select(Follow).where(
-            and_(
-                Follow.follower_id == current_user.id,
-                Follow.followee_id == user_id
-            )
-        )
-        follow_result = await db.execute(follow_query)
-        is_following = follow_result.scalar_one_or_none() is not None
+        is_following = user_id in await follow_graph.following(db, current_user.id)
+
+        # Counters are materialized on the user row
+        show_stats = await can_view_stats(db, user, current_user.id)
 
         # Create response
         user_response = PublicUserResponse(
@@ -272,9 +271,9 @@ async def get_user_profile(
             availability_status=user.availability_status,
             availability_mode=user.availability_mode,
             created_at=user.created_at,
-            followers_count=0,  # TODO: Calculate actual count
-            following_count=0,  # TODO: Calculate actual count
-            check_ins_count=0,  # TODO: Calculate actual count
+            followers_count=user.followers_count if show_stats else 0,
+            following_count=user.following_count if show_stats else 0,
+            check_ins_count=user.check_ins_count if show_stats else 0,
             is_followed=is_following,
             is_blocked=False,  # TODO: Implement blocking logic
         )
@@ -327,19 +326,6 @@ async def update_my_profile(
         await db.commit()
         await db.refresh(current_user)
 
-        followers_count = await db.scalar(
-            select(func.count(Follow.id)).where(
-                Follow.followee_id == current_user.id)
-        ) or 0
-        following_count = await db.scalar(
-            select(func.count(Follow.id)).where(
-                Follow.follower_id == current_user.id)
-        ) or 0
-        checkins_count = await db.scalar(
-            select(func.count(CheckIn.id)).where(
-                CheckIn.user_id == current_user.id)
-        ) or 0
-
         return PublicUserResponse(
             id=current_user.id,
             username=current_user.username,
@@ -347,9 +333,9 @@ async def update_my_profile(
             bio=current_user.bio,
             avatar_url=_convert_single_to_signed_url(current_user.avatar_url),
             is_verified=current_user.is_verified,
-            followers_count=followers_count,
-            following_count=following_count,
-            check_ins_count=checkins_count,
+            followers_count=current_user.followers_count,
+            following_count=current_user.following_count,
+            check_ins_count=current_user.check_ins_count,
             is_following=False,
             created_at=current_user.created_at,
         )
@@ -398,19 +384,6 @@ async def upload_avatar(
         await db.commit()
         await db.refresh(current_user)
 
-        followers_count = await db.scalar(
-            select(func.count(Follow.id)).where(
-                Follow.followee_id == current_user.id)
-        ) or 0
-        following_count = await db.scalar(
-            select(func.count(Follow.id)).where(
-                Follow.follower_id == current_user.id)
-        ) or 0
-        checkins_count = await db.scalar(
-            select(func.count(CheckIn.id)).where(
-                CheckIn.user_id == current_user.id)
-        ) or 0
-
         signed_avatar = _convert_single_to_signed_url(current_user.avatar_url)
 
         return PublicUserResponse(
@@ -422,9 +395,9 @@ async def upload_avatar(
             availability_status=current_user.availability_status,
             availability_mode=current_user.availability_mode,
             created_at=current_user.created_at,
-            followers_count=followers_count,
-            following_count=following_count,
-            check_ins_count=checkins_count,
+            followers_count=current_user.followers_count,
+            following_count=current_user.following_count,
+            check_ins_count=current_user.check_ins_count,
             is_followed=None,
             is_blocked=None,
         )
@@ -542,21 +515,23 @@ async def get_user_checkins(
             raise HTTPException(
                 status_code=403, detail="Cannot view this user's check-ins")
 
-        # Fetch all check-ins to enforce visibility rules before pagination
-        all_checkins_result = await db.execute(
-            select(CheckIn)
-            .where(CheckIn.user_id == user_id)
-            .order_by(desc(CheckIn.created_at))
+        # Visibility is filtered in SQL so pagination happens in the database
+        visible = and_(
+            CheckIn.user_id == user_id,
+            visible_to_viewer_clause(
+                CheckIn.user_id, CheckIn.visibility, current_user.id),
         )
-        all_checkins = all_checkins_result.scalars().all()
+        total = (await db.execute(
+            select(func.count(CheckIn.id)).where(visible)
+        )).scalar_one()
 
-        visible_checkins: list[CheckIn] = []
-        for ci in all_checkins:
-            if await can_view_checkin(db, ci.user_id, current_user.id, ci.visibility):
-                visible_checkins.append(ci)
-
-        total = len(visible_checkins)
-        paginated_checkins = visible_checkins[offset: offset + limit]
+        paginated_checkins = (await db.execute(
+            select(CheckIn)
+            .where(visible)
+            .order_by(desc(CheckIn.created_at), desc(CheckIn.id))
+            .offset(offset)
+            .limit(limit)
+        )).scalars().all()
 
         if not paginated_checkins:
             return PaginatedCheckIns(items=[], total=total, limit=limit, offset=offset)
@@ -686,11 +661,12 @@ async def list_user_collections(
         # If viewing own collections, show all
         where_conditions = [UserCollection.user_id == user_id]
         if user_id != current_user.id:
-            # Only show public collections to other users
+            # Only collections the viewer may see, filtered before pagination
             where_conditions.append(
-                or_(
-                    UserCollection.visibility == "public",
-                    UserCollection.is_public == True
+                visible_to_viewer_clause(
+                    UserCollection.user_id,
+                    UserCollection.visibility,
+                    current_user.id,
                 )
             )
 
@@ -713,39 +689,13 @@ async def list_user_collections(
         result = await db.execute(collections_stmt)
         rows = result.all()
 
+        # Only the owner's own check-in photos make up the covers
+        covers = await fetch_cover_photos(
+            db, [collection.id for collection, _ in rows], owner_id=user_id)
+
         collection_list: list[dict] = []
         for collection, place_count in rows:
-            # Double-check visibility for each collection (extra safety)
-            visibility_value = collection.visibility or (
-                "public" if collection.is_public else "private"
-            )
-
-            # Skip private collections if viewing another user's profile
-            if (user_id != current_user.id and
-                    not await can_view_collection(db, collection.user_id, current_user.id, visibility_value)):
-                continue
-
-            photos_query = (
-                select(CheckInPhoto.url)
-                .join(CheckIn, CheckInPhoto.check_in_id == CheckIn.id)
-                .join(
-                    UserCollectionPlace,
-                    UserCollectionPlace.place_id == CheckIn.place_id,
-                )
-                .where(
-                    and_(
-                        UserCollectionPlace.collection_id == collection.id,
-                        CheckIn.user_id == user_id,
-                        CheckInPhoto.url.isnot(None),
-                    )
-                )
-                .order_by(desc(CheckInPhoto.created_at))
-                .limit(3)
-            )
-
-            photos_result = await db.execute(photos_query)
-            photo_urls = [row[0] for row in photos_result.fetchall()]
-            photo_urls = _convert_to_signed_urls(photo_urls)
+            photo_urls = _convert_to_signed_urls(covers[collection.id])
 
             visibility_value = collection.visibility or (
                 "public" if collection.is_public else "private"
@@ -262,12 +262,14 @@ class AdvancedSearchFilters(BaseModel):
 
 
 class SearchSuggestion(BaseModel):
-    type: str  # "city", "neighborhood", "category"
+    type: str  # "place", "city", "neighborhood", "category"
     value: str
     count: int
+    place_id: Optional[int] = None  # set for "place" suggestions
 
 
 class SearchSuggestions(BaseModel):
+    places: list[SearchSuggestion] = []
     cities: list[SearchSuggestion]
     neighborhoods: list[SearchSuggestion]
     categories: list[SearchSuggestion]
@@ -302,6 +304,9 @@ class PaginatedWhosHere(BaseModel):
     total: int
     limit: int
     offset: int
+    # Keyset pagination: pass next_cursor as `before` for the next page
+    next_cursor: Optional[str] = None
+    has_more: bool = False
 
 
 class PlaceChatRoom(BaseModel):
@@ -560,14 +565,20 @@ class DMThreadResponse(BaseModel):
     last_message_time: Optional[datetime] = None
     # Last message sender avatar (for quick context)
     sender_photo_url: Optional[str] = None
+    # Messages from the other participant since last_read_at
+    unread_count: int = 0
     model_config = ConfigDict(from_attributes=True)
 
 
 class PaginatedDMThreads(BaseModel):
     items: list[DMThreadResponse]
-    total: int
+    # Exact total is only computed when requested (include_total=true)
+    total: Optional[int] = None
     limit: int
     offset: int
+    # Pass next_cursor as `before` to load the next page
+    next_cursor: Optional[str] = None
+    has_more: bool = False
 
 
 class DMRequestCreate(BaseModel):
@@ -684,9 +695,15 @@ class DMMessageResponse(BaseModel):
 
 class PaginatedDMMessages(BaseModel):
     items: list[DMMessageResponse]
-    total: int
+    # Exact total is only computed when requested (include_total=true)
+    total: Optional[int] = None
     limit: int
     offset: int
+    # Keyset pagination: pass next_cursor as `before` for older messages,
+    # prev_cursor as `after` for newer ones
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+    has_more: bool = False
 
 
 class DMThreadMuteUpdate(BaseModel):
@@ -12,6 +12,7 @@ from sqlalchemy import select, func, and_
 from ..models import Place
 from ..config import settings
 from ..services.place_data_service_v2 import enhanced_place_data_service
+from ..services.reverse_geocoder import fill_place_location
 
 logger = logging.getLogger(__name__)
 
@@ -426,6 +427,7 @@ class AutoSeederService:
                 'osm_tags': place_data.get('osm_tags', {})
             }
         )
+        fill_place_location(place)
 
         db.add(place)
         return place
@@ -0,0 +1,338 @@
+"""
+In-memory prefix index for search type-ahead.
+
+Place names, categories, cities and neighborhoods are kept as sorted arrays
+of normalized keys, so a keystroke is a bisect to the prefix range, with the
+best-weighted entries returned. Short prefixes ("c", "ca", "caf") match huge
+ranges, so each also keeps its entries ordered by weight and answers with the
+first few; a longer prefix whose range exceeds the scan budget walks the
+weight-ordered list of its short prefix instead of the alphabetical range,
+so popular entries are never cut off by ``max_scan``. Values
+are indexed at the start of every word ("Best Coffee" is found by "coff",
+"Al Olaya" by "ola"); a place weighs its check-in count and a category, city
+or neighborhood weighs the number of places that carry it.
+
+The index is built from the database on first use and rebuilt every
+``autocomplete_refresh_minutes``. Between rebuilds it follows place writes
+(``places.changed``) and new check-ins (``presence.checkin``) from the event
+bus, so new places and values show up without a rebuild.
+"""
+import asyncio
+import heapq
+import logging
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import desc, func, select
+
+from ..config import settings
+from ..database import AsyncSessionLocal
+from ..models import CheckIn, Place
+from .event_bus import event_bus
+from .place_events import PLACES_CHANGED_TOPIC
+from .presence_index import PRESENCE_TOPIC
+
+logger = logging.getLogger(__name__)
+
+KINDS = ("place", "city", "neighborhood", "category")
+# Prefixes up to this length keep their entries in weight order
+SHORT_PREFIX_LEN = 3
+
+
+def normalize(value: str) -> str:
+    return " ".join(value.casefold().split())
+
+
+def split_categories(categories: Optional[str]) -> List[str]:
+    return [c.strip() for c in (categories or "").split(",") if c.strip()]
+
+
+class _Entry:
+    __slots__ = ("value", "weight", "place_id", "keys")
+
+    def __init__(self, value: str, weight: int, place_id: Optional[int]) -> None:
+        self.value = value
+        self.weight = weight
+        self.place_id = place_id
+        self.keys: Tuple[str, ...] = ()
+
+
+def _rank(entry_id: Any, entry: _Entry) -> Tuple[int, int, Any]:
+    """Sort key putting the best-weighted, then shortest, entries first."""
+    return (-entry.weight, len(entry.value), entry_id)
+
+
+def _short_prefixes(keys: Iterable[str]) -> Set[str]:
+    return {k[:n] for k in keys for n in range(1, min(len(k), SHORT_PREFIX_LEN) + 1)}
+
+
+class PrefixIndex:
+    """Sorted (key, entry id) pairs with entries weighted for ranking, plus
+    a weight-ordered entry list per short prefix."""
+
+    def __init__(self) -> None:
+        self._keys: List[Tuple[str, Any]] = []
+        self._entries: Dict[Any, _Entry] = {}
+        self._top: Dict[str, List[Tuple[int, int, Any]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, entry_id: Any) -> Optional[_Entry]:
+        return self._entries.get(entry_id)
+
+    def add(self, entry_id: Any, value: str, weight: int = 0,
+            place_id: Optional[int] = None, word_starts: bool = False) -> None:
+        self.remove(entry_id)
+        entry = _Entry(value, weight, place_id)
+        key = normalize(value)
+        if not key:
+            return
+        if word_starts:
+            words = key.split(" ")
+            entry.keys = tuple(" ".join(words[i:]) for i in range(len(words)))
+        else:
+            entry.keys = (key,)
+        for k in entry.keys:
+            insort(self._keys, (k, entry_id))
+        self._entries[entry_id] = entry
+        self._link(entry_id, entry)
+
+    def bulk_load(self, items: Iterable[Tuple[Any, str, int, Optional[int]]],
+                  word_starts: bool = False) -> None:
+        """Replace the contents; sorts once instead of inserting one by one."""
+        self._keys = []
+        self._entries = {}
+        self._top = {}
+        for entry_id, value, weight, place_id in items:
+            key = normalize(value)
+            if not key:
+                continue
+            entry = _Entry(value, weight, place_id)
+            if word_starts:
+                words = key.split(" ")
+                entry.keys = tuple(" ".join(words[i:]) for i in range(len(words)))
+            else:
+                entry.keys = (key,)
+            self._entries[entry_id] = entry
+            self._keys.extend((k, entry_id) for k in entry.keys)
+            rank = _rank(entry_id, entry)
+            for short in _short_prefixes(entry.keys):
+                self._top.setdefault(short, []).append(rank)
+        self._keys.sort()
+        for ranked in self._top.values():
+            ranked.sort()
+
+    def _link(self, entry_id: Any, entry: _Entry) -> None:
+        rank = _rank(entry_id, entry)
+        for short in _short_prefixes(entry.keys):
+            insort(self._top.setdefault(short, []), rank)
+
+    def _unlink(self, entry_id: Any, entry: _Entry) -> None:
+        rank = _rank(entry_id, entry)
+        for short in _short_prefixes(entry.keys):
+            ranked = self._top.get(short)
+            if not ranked:
+                continue
+            i = bisect_left(ranked, rank)
+            if i < len(ranked) and ranked[i] == rank:
+                del ranked[i]
+            if not ranked:
+                del self._top[short]
+
+    def set_weight(self, entry_id: Any, weight: int) -> None:
+        entry = self._entries.get(entry_id)
+        if entry is None or entry.weight == weight:
+            return
+        self._unlink(entry_id, entry)
+        entry.weight = weight
+        self._link(entry_id, entry)
+
+    def remove(self, entry_id: Any) -> None:
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return
+        self._unlink(entry_id, entry)
+        for k in entry.keys:
+            i = bisect_left(self._keys, (k,))
+            while i < len(self._keys) and self._keys[i][0] == k:
+                if self._keys[i][1] == entry_id:
+                    del self._keys[i]
+                    break
+                i += 1
+
+    def search(self, prefix: str, limit: int, max_scan: int) -> List[_Entry]:
+        """Best-weighted entries with a key starting with ``prefix``.
+
+        At most ``max_scan`` candidates are examined. Short prefixes are
+        exact; a longer prefix with more than ``max_scan`` keys returns the
+        best matches among the ``max_scan`` heaviest entries of its short
+        prefix.
+        """
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        if len(prefix) <= SHORT_PREFIX_LEN:
+            return [self._entries[entry_id]
+                    for _, _, entry_id in self._top.get(prefix, ())[:limit]]
+
+        start = bisect_left(self._keys, (prefix,))
+        end = bisect_left(self._keys, (prefix + "\uffff",), start)
+        if end - start > max_scan:
+            matches: List[_Entry] = []
+            ranked = self._top.get(prefix[:SHORT_PREFIX_LEN], ())
+            for _, _, entry_id in ranked[:max_scan]:
+                entry = self._entries[entry_id]
+                if any(k.startswith(prefix) for k in entry.keys):
+                    matches.append(entry)
+                    if len(matches) == limit:
+                        break
+            return matches
+
+        seen: Set[Any] = set()
+        matches = []
+        for _, entry_id in self._keys[start:end]:
+            if entry_id in seen:
+                continue
+            seen.add(entry_id)
+            matches.append(self._entries[entry_id])
+        return heapq.nlargest(limit, matches, key=lambda e: (e.weight, -len(e.value)))
+
+
+class AutocompleteIndex:
+    def __init__(self) -> None:
+        self._load_lock = asyncio.Lock()
+        self.clear()
+
+    def clear(self) -> None:
+        self.indexes: Dict[str, PrefixIndex] = {kind: PrefixIndex() for kind in KINDS}
+        self._loaded_at: Optional[datetime] = None
+
+    def _stale(self) -> bool:
+        if self._loaded_at is None:
+            return True
+        age = datetime.now(timezone.utc) - self._loaded_at
+        return age > timedelta(minutes=settings.autocomplete_refresh_minutes)
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+    async def _load(self) -> None:
+        async with AsyncSessionLocal() as db:
+            checkins = (
+                select(CheckIn.place_id, func.count(CheckIn.id).label("n"))
+                .group_by(CheckIn.place_id)
+                .subquery()
+            )
+            weight = func.coalesce(checkins.c.n, 0)
+            # Only the most checked-in places are suggested by name
+            place_rows = (await db.execute(
+                select(Place.id, Place.name, weight)
+                .outerjoin(checkins, checkins.c.place_id == Place.id)
+                .order_by(desc(weight), desc(Place.id))
+                .limit(settings.autocomplete_max_places)
+            )).all()
+            # value -> number of places, merged by normalized value
+            facets: Dict[str, Dict[str, Tuple[str, int]]] = {}
+            for kind, column in (("city", Place.city),
+                                 ("neighborhood", Place.neighborhood),
+                                 ("category", Place.categories)):
+                rows = (await db.execute(
+                    select(column, func.count(Place.id))
+                    .where(column.isnot(None))
+                    .group_by(column)
+                )).all()
+                counts: Dict[str, Tuple[str, int]] = {}
+                for raw, n in rows:
+                    values = split_categories(raw) if kind == "category" else [raw]
+                    for value in values:
+                        key = normalize(value)
+                        display, total = counts.get(key, (value, 0))
+                        counts[key] = (display, total + int(n))
+                facets[kind] = counts
+
+        indexes = {kind: PrefixIndex() for kind in KINDS}
+        indexes["place"].bulk_load(
+            ((place_id, name, int(n), place_id) for place_id, name, n in place_rows),
+            word_starts=True)
+        for kind, counts in facets.items():
+            indexes[kind].bulk_load(
+                ((key, display, n, None) for key, (display, n) in counts.items()),
+                word_starts=True)
+        self.indexes = indexes
+        self._loaded_at = datetime.now(timezone.utc)
+        logger.info(f"Autocomplete index loaded with {len(place_rows)} places")
+
+    async def ensure_loaded(self) -> None:
+        """Build on first use and rebuild once the refresh interval passes."""
+        if not self._stale():
+            return
+        async with self._load_lock:
+            if self._stale():
+                await self._load()
+
+    # ------------------------------------------------------------------
+    # Incremental updates
+    # ------------------------------------------------------------------
+    def _add_value(self, kind: str, value: Optional[str]) -> None:
+        if not value or not normalize(value):
+            return
+        index = self.indexes[kind]
+        entry_id = normalize(value)
+        if index.get(entry_id) is None:
+            index.add(entry_id, value, weight=1, word_starts=True)
+
+    def upsert_place(self, place_id: int, name: str, city: Optional[str] = None,
+                     neighborhood: Optional[str] = None, categories: Optional[str] = None) -> None:
+        """Index a new or renamed place and any city, neighborhood or
+        category it introduces."""
+        places = self.indexes["place"]
+        existing = places.get(place_id)
+        weight = existing.weight if existing else 0
+        if existing is None or existing.value != name:
+            places.add(place_id, name, weight=weight, place_id=place_id, word_starts=True)
+        self._add_value("city", city)
+        self._add_value("neighborhood", neighborhood)
+        for category in split_categories(categories):
+            self._add_value("category", category)
+
+    def record_checkin(self, place_id: int) -> None:
+        places = self.indexes["place"]
+        entry = places.get(place_id)
+        if entry is not None:
+            places.set_weight(place_id, entry.weight + 1)
+
+    async def _on_places_changed(self, payload: Dict[str, Any]) -> None:
+        if self._loaded_at is None:
+            return
+        place_ids = [int(pid) for pid in payload.get("place_ids", [])]
+        if not place_ids:
+            return
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(
+                select(Place.id, Place.name, Place.city, Place.neighborhood, Place.categories)
+                .where(Place.id.in_(place_ids))
+            )).all()
+        for row in rows:
+            self.upsert_place(row.id, row.name, row.city, row.neighborhood, row.categories)
+        for missing in set(place_ids) - {row.id for row in rows}:
+            self.indexes["place"].remove(missing)
+
+    def _on_presence(self, payload: Dict[str, Any]) -> None:
+        if payload.get("op") == "add":
+            self.record_checkin(int(payload["place_id"]))
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def suggest(self, prefix: str, limit: int = 5) -> Dict[str, List[_Entry]]:
+        max_scan = settings.autocomplete_max_scan
+        return {kind: index.search(prefix, limit, max_scan)
+                for kind, index in self.indexes.items()}
+
+
+autocomplete_index = AutocompleteIndex()
+
+event_bus.subscribe(PLACES_CHANGED_TOPIC, autocomplete_index._on_places_changed)
+event_bus.subscribe(PRESENCE_TOPIC, autocomplete_index._on_presence)
@@ -0,0 +1,99 @@
+"""
+Cover photos for collection lists.
+
+A collection's cover is the latest few check-in photos taken at its places.
+Collection lists used to run one "top 3 photos" query per collection; the
+covers for a whole page now come from a single query ranking photos with
+``ROW_NUMBER() OVER (PARTITION BY collection_id ...)``.
+
+Results are cached per collection for ``collection_cover_cache_ttl_seconds``
+as stored photo paths (URLs are signed per response). ORM writes to a
+collection's places are announced after commit as ``collections.changed``
+(see ``place_events.publish_on_commit``) so every node drops those covers;
+the TTL bounds staleness from new photos.
+"""
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import and_, desc, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..models import CheckIn, CheckInPhoto, UserCollectionPlace
+from .event_bus import event_bus
+from .place_events import publish_on_commit
+from .ttl_cache import TTLCache
+
+COLLECTIONS_CHANGED_TOPIC = "collections.changed"
+COVER_PHOTO_COUNT = 3
+
+# (collection id, owner id or None) -> photo paths, newest first
+collection_cover_cache = TTLCache(
+    ttl_seconds=settings.collection_cover_cache_ttl_seconds,
+    max_entries=settings.collection_cover_cache_max_entries,
+)
+
+
+async def fetch_cover_photos(
+    db: AsyncSession,
+    collection_ids: Iterable[int],
+    owner_id: Optional[int] = None,
+) -> Dict[int, List[str]]:
+    """Latest check-in photo paths per collection, in one query for all
+    uncached collections. With ``owner_id`` only that user's check-ins count."""
+    covers: Dict[int, List[str]] = {}
+    missing: List[int] = []
+    for collection_id in collection_ids:
+        cached = collection_cover_cache.get((collection_id, owner_id))
+        if cached is None:
+            missing.append(collection_id)
+        else:
+            covers[collection_id] = cached
+    if not missing:
+        return covers
+
+    conditions = [
+        UserCollectionPlace.collection_id.in_(missing),
+        CheckInPhoto.url.isnot(None),
+    ]
+    if owner_id is not None:
+        conditions.append(CheckIn.user_id == owner_id)
+    ranked = (
+        select(
+            UserCollectionPlace.collection_id,
+            CheckInPhoto.url,
+            func.row_number().over(
+                partition_by=UserCollectionPlace.collection_id,
+                order_by=(desc(CheckInPhoto.created_at), desc(CheckInPhoto.id)),
+            ).label("rank"),
+        )
+        .join(CheckIn, CheckInPhoto.check_in_id == CheckIn.id)
+        .join(UserCollectionPlace, UserCollectionPlace.place_id == CheckIn.place_id)
+        .where(and_(*conditions))
+        .subquery()
+    )
+    rows = await db.execute(
+        select(ranked.c.collection_id, ranked.c.url)
+        .where(ranked.c.rank <= COVER_PHOTO_COUNT)
+        .order_by(ranked.c.collection_id, ranked.c.rank)
+    )
+
+    fetched: Dict[int, List[str]] = {collection_id: [] for collection_id in missing}
+    for collection_id, url in rows.all():
+        fetched[collection_id].append(url)
+    for collection_id, urls in fetched.items():
+        collection_cover_cache.set((collection_id, owner_id), urls)
+    covers.update(fetched)
+    return covers
+
+
+def invalidate_collection_covers(collection_ids: Iterable[int]) -> None:
+    ids = set(collection_ids)
+    collection_cover_cache.invalidate_where(lambda key: key[0] in ids)
+
+
+def _on_collections_changed(payload: Dict[str, Any]) -> None:
+    invalidate_collection_covers(int(cid) for cid in payload.get("collection_ids", []))
+
+
+event_bus.subscribe(COLLECTIONS_CHANGED_TOPIC, _on_collections_changed)
+publish_on_commit(UserCollectionPlace, COLLECTIONS_CHANGED_TOPIC, "collection_ids", "collection_id")
@@ -0,0 +1,137 @@
+"""
+Materialized DM unread counters.
+
+``DMParticipantState.unread_count`` is incremented for the recipient in the
+same transaction that inserts a message and reset when the participant marks
+the thread read, so badge counts never need to scan ``dm_messages``.
+Participant state rows missing for either side of a thread (threads opened
+from place chat or by a block) are created before the counters are bumped.
+``repair_unread_counts`` recomputes the counters from ``last_read_at``.
+"""
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Iterable, Optional, Tuple
+
+from sqlalchemy import bindparam, func, insert, literal, or_, select, union_all, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import DMMessage, DMParticipantState, DMThread
+
+
+async def ensure_participant_states(db: AsyncSession, thread_ids: Iterable[int]) -> None:
+    """Create the missing participant state rows for both sides of each thread.
+
+    Does not commit.
+    """
+    thread_ids = set(thread_ids)
+    if not thread_ids:
+        return
+    sides = union_all(*[
+        select(DMThread.id.label("thread_id"), column.label("user_id"))
+        .where(DMThread.id.in_(thread_ids))
+        for column in (DMThread.user_a_id, DMThread.user_b_id)
+    ]).subquery()
+    existing = (
+        select(DMParticipantState.id)
+        .where(
+            DMParticipantState.thread_id == sides.c.thread_id,
+            DMParticipantState.user_id == sides.c.user_id,
+        )
+        .exists()
+    )
+    await db.execute(
+        insert(DMParticipantState).from_select(
+            ["thread_id", "user_id", "unread_count"],
+            select(sides.c.thread_id, sides.c.user_id, literal(0)).where(~existing),
+        )
+    )
+
+
+async def increment_unread(
+    db: AsyncSession,
+    messages: Iterable[Tuple[int, int]],
+) -> None:
+    """Bump the recipient's counter for each (thread_id, sender_id) inserted.
+
+    Does not commit; call inside the transaction that inserts the messages.
+    """
+    counts = Counter(messages)
+    if not counts:
+        return
+    await ensure_participant_states(db, {thread_id for thread_id, _ in counts})
+    # Core table statement so the parameter list runs as an executemany
+    states = DMParticipantState.__table__
+    stmt = (
+        update(states)
+        .where(
+            states.c.thread_id == bindparam("t_id"),
+            states.c.user_id != bindparam("s_id"),
+        )
+        .values(unread_count=states.c.unread_count + bindparam("n"))
+    )
+    await db.execute(stmt, [
+        {"t_id": thread_id, "s_id": sender_id, "n": n}
+        for (thread_id, sender_id), n in counts.items()
+    ])
+
+
+async def mark_thread_read(
+    db: AsyncSession,
+    thread_id: int,
+    user_id: int,
+    read_at: Optional[datetime] = None,
+) -> datetime:
+    """Set last_read_at and reset the unread counter. Does not commit."""
+    read_at = read_at or datetime.now(timezone.utc)
+    result = await db.execute(
+        update(DMParticipantState)
+        .where(
+            DMParticipantState.thread_id == thread_id,
+            DMParticipantState.user_id == user_id,
+        )
+        .values(last_read_at=read_at, unread_count=0)
+        .execution_options(synchronize_session=False)
+    )
+    if not result.rowcount:
+        db.add(DMParticipantState(
+            thread_id=thread_id, user_id=user_id, last_read_at=read_at, unread_count=0))
+    return read_at
+
+
+async def get_total_unread(db: AsyncSession, user_id: int) -> int:
+    """Total unread DMs for a user, summed from the materialized counters."""
+    result = await db.execute(
+        select(func.coalesce(func.sum(DMParticipantState.unread_count), 0)).where(
+            DMParticipantState.user_id == user_id,
+            DMParticipantState.blocked == False,
+            DMParticipantState.archived == False,
+        )
+    )
+    return int(result.scalar() or 0)
+
+
+async def repair_unread_counts(db: AsyncSession, user_id: Optional[int] = None) -> int:
+    """Recompute unread_count from last_read_at. Returns the rows changed."""
+    actual = (
+        select(func.count(DMMessage.id))
+        .where(
+            DMMessage.thread_id == DMParticipantState.thread_id,
+            DMMessage.sender_id != DMParticipantState.user_id,
+            DMMessage.deleted_at.is_(None),
+            or_(DMParticipantState.last_read_at.is_(None),
+                DMMessage.created_at > DMParticipantState.last_read_at),
+        )
+        .correlate(DMParticipantState)
+        .scalar_subquery()
+    )
+    stmt = (
+        update(DMParticipantState)
+        .where(DMParticipantState.unread_count != actual)
+        .values(unread_count=actual)
+        .execution_options(synchronize_session=False)
+    )
+    if user_id is not None:
+        stmt = stmt.where(DMParticipantState.user_id == user_id)
+    result = await db.execute(stmt)
+    await db.commit()
+    return result.rowcount or 0
@@ -0,0 +1,123 @@
+"""
+Lightweight cross-node event bus.
+
+Handlers always run in-process. When ``APP_EVENT_BUS_BACKEND=postgres`` the
+events are also fanned out to the other API nodes through Postgres
+LISTEN/NOTIFY, so ephemeral state (typing indicators, caches) stays in sync
+without adding another piece of infrastructure.
+"""
+import asyncio
+import inspect
+import json
+import logging
+import os
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Union
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+EventHandler = Callable[[Dict[str, Any]], Union[Awaitable[None], None]]
+
+
+class EventBus:
+    """Topic based pub/sub with an optional Postgres transport."""
+
+    CHANNEL = "circles_events"
+
+    def __init__(self) -> None:
+        # Used to ignore our own notifications echoed back by Postgres
+        self.node_id = uuid.uuid4().hex
+        self._handlers: Dict[str, List[EventHandler]] = {}
+        self._conn = None
+        self._lock = asyncio.Lock()
+
+    def subscribe(self, topic: str, handler: EventHandler) -> None:
+        """Register a handler for a topic. Handlers receive the payload dict."""
+        handlers = self._handlers.setdefault(topic, [])
+        if handler not in handlers:
+            handlers.append(handler)
+
+    async def publish(self, topic: str, payload: Dict[str, Any]) -> None:
+        """Deliver an event locally and, when enabled, to every other node."""
+        await self._dispatch(topic, payload)
+
+        if self._conn is None:
+            return
+        message = json.dumps(
+            {"origin": self.node_id, "topic": topic, "payload": payload},
+            default=str,
+        )
+        try:
+            async with self._lock:
+                await self._conn.execute("SELECT pg_notify($1, $2)", self.CHANNEL, message)
+        except Exception as e:
+            logger.warning(f"Failed to publish {topic} to other nodes: {e}")
+
+    async def _dispatch(self, topic: str, payload: Dict[str, Any]) -> None:
+        for handler in list(self._handlers.get(topic, [])):
+            try:
+                result = handler(payload)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error(f"Event handler for {topic} failed: {e}")
+
+    def _on_notify(self, conn, pid, channel, raw: str) -> None:
+        try:
+            message = json.loads(raw)
+        except (TypeError, ValueError):
+            return
+        if message.get("origin") == self.node_id:
+            return
+        asyncio.get_running_loop().create_task(
+            self._dispatch(message.get("topic", ""), message.get("payload") or {}))
+
+    async def start(self) -> None:
+        """Connect the Postgres transport if it is configured.
+
+        Raises RuntimeError when several workers would share the local
+        backend, since their caches would never be invalidated by each other.
+        """
+        if settings.event_bus_backend != "postgres":
+            workers = int(os.environ.get("WEB_CONCURRENCY") or 1)
+            if workers > 1:
+                raise RuntimeError(
+                    f"APP_EVENT_BUS_BACKEND=postgres is required with {workers} workers")
+            return
+        if self._conn is not None:
+            return
+        if not settings.database_url.startswith("postgresql"):
+            logger.warning(
+                "Event bus backend 'postgres' requires a PostgreSQL database; using local delivery only")
+            return
+        try:
+            import asyncpg
+
+            dsn = settings.database_url.replace(
+                "postgresql+asyncpg://", "postgresql://")
+            self._conn = await asyncpg.connect(dsn)
+            await self._conn.add_listener(self.CHANNEL, self._on_notify)
+            logger.info(f"Event bus listening on '{self.CHANNEL}' (node {self.node_id})")
+        except Exception as e:
+            logger.error(f"Failed to start Postgres event bus: {e}")
+            self._conn = None
+
+    async def stop(self) -> None:
+        if self._conn is None:
+            return
+        try:
+            await self._conn.remove_listener(self.CHANNEL, self._on_notify)
+            await self._conn.close()
+        except Exception as e:
+            logger.warning(f"Error closing event bus connection: {e}")
+        finally:
+            self._conn = None
+
+    @property
+    def is_distributed(self) -> bool:
+        return self._conn is not None
+
+
+event_bus = EventBus()
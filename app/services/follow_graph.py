@@ -0,0 +1,157 @@
+"""
+In-memory cache of the follow graph.
+
+Follow checks happen on most user-facing reads (visibility, profile
+``is_followed``, follower lists, search). Instead of one ``follows`` query per
+check, the set of followee ids of each hot user is loaded once and kept in
+memory, so batch checks and mutual lookups are set operations. Follow and
+unfollow publish an event that updates the cached sets on every node; the
+TTL bounds staleness if an event is ever missed. A set whose load raced
+with an event for the same user is returned but not cached.
+
+Privacy decisions only trust cached sets when the event bus reaches every
+node (the Postgres backend); otherwise ``followed_among`` reads the edges
+from the database, so an unfollow or block hides followers-only content
+immediately everywhere.
+"""
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..models import Follow
+from .event_bus import event_bus
+
+FOLLOW_TOPIC = "follow.changed"
+
+
+class FollowGraphCache:
+    def __init__(self, ttl_seconds: float = 600, max_users: int = 10000) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_users = max_users
+        self._following: "OrderedDict[int, Tuple[datetime, FrozenSet[int]]]" = OrderedDict()
+        # Bumped on every change; users being loaded -> (loads in flight,
+        # version of their last change)
+        self._version = 0
+        self._loading: Dict[int, Tuple[int, int]] = {}
+
+    def cached_following(self, user_id: int) -> Optional[FrozenSet[int]]:
+        """Followee ids of ``user_id`` if cached and fresh, else None."""
+        item = self._following.get(user_id)
+        if item is None:
+            return None
+        expires_at, followee_ids = item
+        if expires_at <= datetime.now(timezone.utc):
+            del self._following[user_id]
+            return None
+        self._following.move_to_end(user_id)
+        return followee_ids
+
+    def _store(self, user_id: int, followee_ids: FrozenSet[int],
+               expires_at: Optional[datetime] = None) -> None:
+        if expires_at is None:
+            expires_at = datetime.now(timezone.utc) + timedelta(seconds=self.ttl_seconds)
+        self._following[user_id] = (expires_at, followee_ids)
+        self._following.move_to_end(user_id)
+        while len(self._following) > self.max_users:
+            self._following.popitem(last=False)
+
+    async def following(self, db: AsyncSession, user_id: int) -> FrozenSet[int]:
+        """Followee ids of ``user_id``, loaded with one query when not cached."""
+        followee_ids = self.cached_following(user_id)
+        if followee_ids is not None:
+            return followee_ids
+        started = self._version
+        loads, changed = self._loading.get(user_id, (0, 0))
+        self._loading[user_id] = (loads + 1, changed)
+        try:
+            result = await db.execute(
+                select(Follow.followee_id).where(Follow.follower_id == user_id)
+            )
+            followee_ids = frozenset(result.scalars().all())
+        finally:
+            loads, changed = self._loading.pop(user_id)
+            if loads > 1:
+                self._loading[user_id] = (loads - 1, changed)
+        # An event applied while the query ran may be missing from the result
+        if changed <= started:
+            self._store(user_id, followee_ids)
+        return followee_ids
+
+    async def followed_among(self, db: AsyncSession, viewer_id: int,
+                             owner_ids: Iterable[int]) -> Set[int]:
+        """The subset of ``owner_ids`` that ``viewer_id`` follows, for
+        privacy decisions. Cached sets are used only when the event bus is
+        distributed; otherwise the edges are queried."""
+        owner_ids = set(owner_ids)
+        if not owner_ids:
+            return set()
+        if event_bus.is_distributed:
+            followee_ids = self.cached_following(viewer_id)
+            if followee_ids is not None:
+                return set(followee_ids & owner_ids)
+        result = await db.execute(
+            select(Follow.followee_id).where(
+                Follow.follower_id == viewer_id,
+                Follow.followee_id.in_(owner_ids),
+            )
+        )
+        return set(result.scalars().all())
+
+    async def is_following(self, db: AsyncSession, viewer_id: int,
+                           owner_ids: Iterable[int]) -> Set[int]:
+        """The subset of ``owner_ids`` that ``viewer_id`` follows."""
+        followee_ids = await self.following(db, viewer_id)
+        return followee_ids.intersection(owner_ids)
+
+    async def mutuals(self, db: AsyncSession, user_id: int, other_user_id: int) -> Set[int]:
+        """Users followed by both ``user_id`` and ``other_user_id``."""
+        return set(await self.following(db, user_id) & await self.following(db, other_user_id))
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+    def _changed(self, user_id: int) -> None:
+        self._version += 1
+        if user_id in self._loading:
+            self._loading[user_id] = (self._loading[user_id][0], self._version)
+
+    def apply(self, payload: Dict[str, Any]) -> None:
+        follower_id = int(payload["follower_id"])
+        self._changed(follower_id)
+        item = self._following.get(follower_id)
+        if item is None:
+            return
+        expires_at, followee_ids = item
+        followee_id = int(payload["followee_id"])
+        if payload["op"] == "follow":
+            followee_ids = followee_ids | {followee_id}
+        else:
+            followee_ids = followee_ids - {followee_id}
+        self._store(follower_id, followee_ids, expires_at)
+
+    async def publish_follow(self, follower_id: int, followee_id: int) -> None:
+        await event_bus.publish(FOLLOW_TOPIC, {
+            "op": "follow", "follower_id": follower_id, "followee_id": followee_id})
+
+    async def publish_unfollow(self, follower_id: int, followee_id: int) -> None:
+        await event_bus.publish(FOLLOW_TOPIC, {
+            "op": "unfollow", "follower_id": follower_id, "followee_id": followee_id})
+
+    def invalidate(self, user_id: int) -> None:
+        self._changed(user_id)
+        self._following.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._following.clear()
+
+
+follow_graph = FollowGraphCache(
+    ttl_seconds=settings.follow_graph_cache_ttl_seconds,
+    max_users=settings.follow_graph_cache_max_users,
+)
+
+event_bus.subscribe(FOLLOW_TOPIC, follow_graph.apply)
@@ -0,0 +1,134 @@
+"""
+Offline gazetteer of cities and neighborhoods.
+
+The city and neighborhood pickers used to call the GeoNames web API (with the
+shared ``demo`` account and a 10 s timeout) on every request. They are now
+answered from a local dataset that ``scripts/build_gazetteer.py`` builds from
+GeoNames dumps. The Docker image builds it at image build time and points
+``APP_GAZETTEER_PATH`` at it; outside Docker, run the script to write the
+default ``app/data/gazetteer.json``. Without a build the gazetteer is empty
+and every lookup comes back blank (the test suite loads a small seed from
+``tests/data``).
+
+The file is preindexed so loading is a single pass: cities are sorted by
+country and then by population (largest first), and neighborhoods are sorted
+by latitude so a radius search bisects to the latitude band and only checks
+distances inside it. The file is loaded at startup; ``covers`` tells the
+lookups router which countries to send to GeoNames when that fallback is on.
+"""
+import json
+import logging
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+from ..config import settings
+from ..utils import haversine_distance
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = Path(__file__).resolve().parent.parent / "data" / "gazetteer.json"
+FORMAT_VERSION = 1
+NEIGHBORHOOD_RADIUS_KM = 20.0
+KM_PER_DEGREE_LAT = 111.0
+
+
+class City(NamedTuple):
+    name: str
+    country: str
+    region: Optional[str]
+    population: int
+    latitude: float
+    longitude: float
+
+
+class Neighborhood(NamedTuple):
+    name: str
+    country: str
+    population: int
+    latitude: float
+    longitude: float
+
+
+class Gazetteer:
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self._path = path
+        self._loaded = False
+        self.source = ""
+        self._cities: Dict[str, List[City]] = {}
+        self._city_by_name: Dict[str, City] = {}
+        self._neighborhoods: List[Neighborhood] = []
+        self._neighborhood_lats: List[float] = []
+
+    @property
+    def path(self) -> Path:
+        if self._path is not None:
+            return self._path
+        return Path(settings.gazetteer_path) if settings.gazetteer_path else DEFAULT_PATH
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            logger.warning(f"Gazetteer {self.path} not found; run scripts/build_gazetteer.py, "
+                           f"city and neighborhood lookups will be empty")
+            self._loaded = True
+            return
+        with open(self.path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("format") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported gazetteer format: {data.get('format')}")
+        regions: List[str] = data["regions"]
+        cities: Dict[str, List[City]] = {}
+        by_name: Dict[str, City] = {}
+        for name, country, region, population, lat, lng in data["cities"]:
+            city = City(name, country, regions[region] if region is not None else None,
+                        population, lat, lng)
+            cities.setdefault(country, []).append(city)
+            # Rows are largest first, so a shared name resolves to the biggest city
+            by_name.setdefault(name.casefold(), city)
+        neighborhoods = [Neighborhood(*row) for row in data["neighborhoods"]]
+
+        self.source = data.get("source", "")
+        self._cities = cities
+        self._city_by_name = by_name
+        self._neighborhoods = neighborhoods
+        self._neighborhood_lats = [n.latitude for n in neighborhoods]
+        self._loaded = True
+        logger.info(f"Gazetteer loaded: {len(by_name)} cities, "
+                    f"{len(neighborhoods)} neighborhoods ({self.source})")
+
+    def ensure_loaded(self) -> None:
+        if not self._loaded:
+            self._load()
+
+    def covers(self, country: str) -> bool:
+        """Whether the gazetteer has cities for the country."""
+        self.ensure_loaded()
+        return country.upper() in self._cities
+
+    def cities(self, country: str, limit: int = 50) -> List[City]:
+        """Cities in a country, most populous first."""
+        self.ensure_loaded()
+        return self._cities.get(country.upper(), [])[:limit]
+
+    def find_city(self, name: str) -> Optional[City]:
+        self.ensure_loaded()
+        return self._city_by_name.get(name.strip().casefold())
+
+    def neighborhoods_near(self, lat: float, lng: float,
+                           radius_km: float = NEIGHBORHOOD_RADIUS_KM,
+                           limit: int = 50) -> List[tuple]:
+        """(neighborhood, distance_km) pairs within ``radius_km``, closest first."""
+        self.ensure_loaded()
+        band = radius_km / KM_PER_DEGREE_LAT
+        start = bisect_left(self._neighborhood_lats, lat - band)
+        end = bisect_right(self._neighborhood_lats, lat + band)
+        matches = []
+        for neighborhood in self._neighborhoods[start:end]:
+            distance = haversine_distance(lat, lng, neighborhood.latitude, neighborhood.longitude)
+            if distance <= radius_km:
+                matches.append((neighborhood, distance))
+        matches.sort(key=lambda match: match[1])
+        return matches[:limit]
+
+
+gazetteer = Gazetteer()
@@ -0,0 +1,172 @@
+"""
+In-memory dictionary of the distinct countries, cities and neighborhoods
+that places use.
+
+The lookup endpoints used to run ``SELECT DISTINCT ... ILIKE`` over the whole
+``places`` table on every call although the values rarely change. The
+dictionary loads the distinct (country, city, neighborhood) combinations
+once, reloads them every ``lookup_refresh_minutes``, and adds new values
+from places named in ``places.changed`` events in between. Filtered queries are answered in
+memory, prefix matches first and then other substring matches.
+
+``version`` changes whenever the contents do. Lookup responses carry it in
+the ``X-Lookups-Version`` header, so clients can cache lookups and only
+refetch when the version they hold is out of date.
+"""
+import asyncio
+import hashlib
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import select
+
+from ..config import settings
+from ..database import AsyncSessionLocal
+from ..models import Place
+from .event_bus import event_bus
+from .place_events import PLACES_CHANGED_TOPIC
+
+logger = logging.getLogger(__name__)
+
+ALL = ""  # key for values not narrowed by a parent
+LOOKUPS_VERSION_HEADER = "X-Lookups-Version"
+
+
+def match_values(values: Iterable[str], q: str, limit: Optional[int] = None) -> List[str]:
+    """Values containing ``q`` (case-insensitive): prefix matches first,
+    then other substring matches, each alphabetical."""
+    if not q:
+        return sorted(values)[:limit]
+    needle = q.casefold()
+    prefix, substring = [], []
+    for value in values:
+        folded = value.casefold()
+        if folded.startswith(needle):
+            prefix.append(value)
+        elif needle in folded:
+            substring.append(value)
+    prefix.sort()
+    if limit is not None and len(prefix) >= limit:
+        return prefix[:limit]
+    substring.sort()
+    return (prefix + substring)[:limit]
+
+
+class LookupDictionary:
+    def __init__(self) -> None:
+        self._load_lock = asyncio.Lock()
+        self.clear()
+
+    def clear(self) -> None:
+        self._countries: Set[str] = set()
+        # parent value (or ALL) -> child values
+        self._cities: Dict[str, Set[str]] = {ALL: set()}
+        self._neighborhoods: Dict[str, Set[str]] = {ALL: set()}
+        self._pending: Set[int] = set()  # changed place ids not yet applied
+        self._loaded_at: Optional[datetime] = None
+        self.version = ""
+
+    def _stale(self) -> bool:
+        if self._loaded_at is None:
+            return True
+        age = datetime.now(timezone.utc) - self._loaded_at
+        return age > timedelta(minutes=settings.lookup_refresh_minutes)
+
+    def _compute_version(self) -> str:
+        digest = hashlib.sha1()
+        for key, values in (("countries", {ALL: self._countries}),
+                            ("cities", self._cities),
+                            ("neighborhoods", self._neighborhoods)):
+            digest.update(key.encode())
+            for parent in sorted(values):
+                digest.update(f"\0{parent}\1".encode())
+                digest.update("\2".join(sorted(values[parent])).encode())
+        return digest.hexdigest()[:16]
+
+    def add(self, country: Optional[str], city: Optional[str],
+            neighborhood: Optional[str]) -> bool:
+        """Record one place's values. Returns True if anything was new."""
+        new = False
+
+        def put(values: Set[str], value: str) -> None:
+            nonlocal new
+            if value not in values:
+                values.add(value)
+                new = True
+
+        if country:
+            put(self._countries, country)
+        if city:
+            put(self._cities[ALL], city)
+            if country:
+                put(self._cities.setdefault(country, set()), city)
+        if neighborhood:
+            put(self._neighborhoods[ALL], neighborhood)
+            if city:
+                put(self._neighborhoods.setdefault(city, set()), neighborhood)
+        return new
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+    async def _load(self) -> None:
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(
+                select(Place.country, Place.city, Place.neighborhood).distinct()
+            )).all()
+        self.clear()
+        for country, city, neighborhood in rows:
+            self.add(country, city, neighborhood)
+        self.version = self._compute_version()
+        self._loaded_at = datetime.now(timezone.utc)
+        logger.info(f"Lookup dictionary loaded from {len(rows)} combinations")
+
+    async def _apply_pending(self) -> None:
+        place_ids, self._pending = self._pending, set()
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(
+                select(Place.country, Place.city, Place.neighborhood)
+                .where(Place.id.in_(place_ids))
+            )).all()
+        changed = False
+        for country, city, neighborhood in rows:
+            changed = self.add(country, city, neighborhood) or changed
+        if changed:
+            self.version = self._compute_version()
+
+    async def ensure_loaded(self) -> None:
+        """Load on first use, reload once the refresh interval passes, and
+        fold in places changed since the last call."""
+        if not self._stale() and not self._pending:
+            return
+        async with self._load_lock:
+            if self._stale():
+                await self._load()
+            elif self._pending:
+                await self._apply_pending()
+
+    def _on_places_changed(self, payload: Dict[str, Any]) -> None:
+        # Only queue the ids: the next read applies them before answering,
+        # so nothing served after the event (and cached downstream) is stale.
+        if self._loaded_at is not None:
+            self._pending.update(int(pid) for pid in payload.get("place_ids", []))
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def countries(self, q: str = "", limit: Optional[int] = None) -> List[str]:
+        return match_values(self._countries, q, limit)
+
+    def cities(self, country: str = "", q: str = "",
+               limit: Optional[int] = None) -> List[str]:
+        return match_values(self._cities.get(country or ALL, ()), q, limit)
+
+    def neighborhoods(self, city: str = "", q: str = "",
+                      limit: Optional[int] = None) -> List[str]:
+        return match_values(self._neighborhoods.get(city or ALL, ()), q, limit)
+
+
+lookup_dictionary = LookupDictionary()
+
+event_bus.subscribe(PLACES_CHANGED_TOPIC, lookup_dictionary._on_places_changed)
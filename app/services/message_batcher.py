@@ -0,0 +1,156 @@
+"""
+Write-behind batching for chat messages sent over WebSockets.
+
+Messages that arrive within ``max_latency_ms`` of each other are written with
+a single multi-row ``INSERT ... RETURNING`` in one transaction instead of one
+add/commit/refresh round-trip each. ``submit`` resolves only after the batch
+has committed, so callers can broadcast as soon as it returns. If a batch
+fails its rows are retried one at a time, so a bad row only fails its own
+caller.
+"""
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..database import AsyncSessionLocal
+from ..models import DMMessage, DMThread, PlaceChatMessage
+from .dm_unread_service import increment_unread
+
+logger = logging.getLogger(__name__)
+
+AfterInsertHook = Callable[[AsyncSession, List[Dict[str, Any]]], Awaitable[None]]
+
+
+class MessageBatcher:
+    def __init__(
+        self,
+        model,
+        returning: Sequence[str] = ("id", "created_at"),
+        after_insert: Optional[AfterInsertHook] = None,
+        max_batch_size: int = 100,
+        max_latency_ms: float = 5.0,
+    ) -> None:
+        self.model = model
+        self.returning = tuple(returning)
+        self.after_insert = after_insert
+        self.max_batch_size = max_batch_size
+        self.max_latency_ms = max_latency_ms
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _ensure_worker(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            if self._loop is not loop:
+                self._queue = asyncio.Queue()
+            self._loop = loop
+            self._worker = loop.create_task(self._run())
+        return self._queue
+
+    async def submit(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue a row for insertion and wait until it is committed.
+
+        Returns ``values`` merged with the ``returning`` columns.
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._ensure_worker().put((values, future))
+        return await future
+
+    async def _run(self) -> None:
+        queue = self._queue
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            batch = [item]
+            stopping = False
+            deadline = loop.time() + self.max_latency_ms / 1000
+            while len(batch) < self.max_batch_size:
+                if queue.empty():
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    item = queue.get_nowait()
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+            if stopping:
+                return
+
+    async def _insert(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        columns = [getattr(self.model, name) for name in self.returning]
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                insert(self.model).returning(*columns, sort_by_parameter_order=True),
+                rows,
+            )
+            returned = [dict(row._mapping) for row in result]
+            if self.after_insert is not None:
+                await self.after_insert(db, rows)
+            await db.commit()
+        return returned
+
+    async def _flush(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        try:
+            returned = await self._insert([values for values, _ in batch])
+        except Exception as e:
+            if len(batch) > 1:
+                # Retry row by row so only the offending message fails
+                for item in batch:
+                    await self._flush([item])
+                return
+            logger.error(f"Failed to persist {self.model.__tablename__} row: {e}")
+            _, future = batch[0]
+            if not future.done():
+                future.set_exception(e)
+            return
+
+        for (values, future), extra in zip(batch, returned):
+            if not future.done():
+                future.set_result({**values, **extra})
+
+    async def stop(self) -> None:
+        """Flush anything still queued and stop the worker."""
+        if self._worker is None or self._worker.done():
+            return
+        await self._queue.put(None)
+        await self._worker
+        self._worker = None
+
+
+async def _after_dm_insert(db: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+    thread_ids = {row["thread_id"] for row in rows}
+    await db.execute(
+        update(DMThread)
+        .where(DMThread.id.in_(thread_ids))
+        .values(updated_at=datetime.now(timezone.utc))
+    )
+    await increment_unread(db, [(row["thread_id"], row["sender_id"]) for row in rows])
+
+
+dm_message_batcher = MessageBatcher(
+    DMMessage,
+    after_insert=_after_dm_insert,
+    max_batch_size=settings.message_batch_max_size,
+    max_latency_ms=settings.message_batch_max_latency_ms,
+)
+
+place_chat_batcher = MessageBatcher(
+    PlaceChatMessage,
+    max_batch_size=settings.message_batch_max_size,
+    max_latency_ms=settings.message_batch_max_latency_ms,
+)
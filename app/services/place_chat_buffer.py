@@ -0,0 +1,132 @@
+"""
+In-memory ring buffer of recent place chat messages.
+
+Each active room keeps its newest messages already serialized (author name
+and signed avatar included), so joiners are served without touching the
+database. Writers publish new messages on the event bus and every node
+appends them to its own buffer. A room is loaded from the database on first
+use, and reads fall back to the database when they page back past what the
+buffer holds.
+"""
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from typing import Any, Callable, Awaitable, Deque, Dict, List, Optional, Tuple
+
+from ..config import settings
+from .event_bus import event_bus
+
+MESSAGE_TOPIC = "place_chat.message"
+
+BufferedMessage = Tuple[datetime, Dict[str, Any]]
+RoomLoader = Callable[[int, int], Awaitable[List[Dict[str, Any]]]]
+
+
+def _message_time(message: Dict[str, Any]) -> datetime:
+    created_at = message["created_at"]
+    if isinstance(created_at, str):
+        created_at = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return created_at
+
+
+class _Room:
+    def __init__(self, capacity: int) -> None:
+        self.messages: Deque[BufferedMessage] = deque(maxlen=capacity)
+        self.ids: set = set()
+        # True while the buffer holds every message of the chat window
+        self.complete = False
+        self.loaded = False
+
+    def append(self, message: Dict[str, Any]) -> None:
+        if message["id"] in self.ids:
+            return
+        if len(self.messages) == self.messages.maxlen:
+            _, evicted = self.messages.popleft()
+            self.ids.discard(evicted["id"])
+            self.complete = False
+        created_at = _message_time(message)
+        # Usually already newest; keep order if a late message arrives
+        if self.messages and created_at < self.messages[-1][0]:
+            items = sorted([*self.messages, (created_at, message)], key=lambda m: m[0])
+            self.messages.clear()
+            self.messages.extend(items)
+        else:
+            self.messages.append((created_at, message))
+        self.ids.add(message["id"])
+
+
+class PlaceChatBuffer:
+    def __init__(self, capacity: int = 200, max_rooms: int = 1000) -> None:
+        self.capacity = capacity
+        self.max_rooms = max_rooms
+        self._rooms: "OrderedDict[int, _Room]" = OrderedDict()
+
+    def _room(self, place_id: int) -> _Room:
+        room = self._rooms.get(place_id)
+        if room is None:
+            room = _Room(self.capacity)
+            self._rooms[place_id] = room
+            if len(self._rooms) > self.max_rooms:
+                self._rooms.popitem(last=False)
+        self._rooms.move_to_end(place_id)
+        return room
+
+    def append(self, place_id: int, message: Dict[str, Any]) -> None:
+        """Add a message to a room that is already buffered on this node."""
+        room = self._rooms.get(place_id)
+        if room is not None:
+            room.append(message)
+
+    async def publish(self, message: Dict[str, Any]) -> None:
+        """Announce a committed message so every node's buffer picks it up."""
+        await event_bus.publish(MESSAGE_TOPIC, message)
+
+    async def ensure_loaded(self, place_id: int, loader: RoomLoader) -> _Room:
+        """Load the newest messages for a room from the database if needed."""
+        room = self._room(place_id)
+        if room.loaded:
+            return room
+        # Messages appended while loading are kept and merged with the result
+        rows = await loader(place_id, self.capacity)
+        for message in rows:
+            room.append(message)
+        room.complete = len(rows) < self.capacity and len(room.messages) < self.capacity
+        room.loaded = True
+        return room
+
+    def recent(
+        self,
+        place_id: int,
+        window_start: datetime,
+        since: Optional[datetime] = None,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Buffered messages in the window (oldest first), or None if the
+        buffer cannot answer and the caller must read the database."""
+        room = self._rooms.get(place_id)
+        if room is None or not room.loaded:
+            return None
+        lower = max(window_start, since) if since else window_start
+        if not room.complete:
+            oldest = room.messages[0][0] if room.messages else None
+            if oldest is None or lower < oldest:
+                return None
+        self._rooms.move_to_end(place_id)
+        return [message for created_at, message in room.messages
+                if created_at >= window_start and (since is None or created_at > since)]
+
+    def clear(self) -> None:
+        self._rooms.clear()
+
+
+place_chat_buffer = PlaceChatBuffer(
+    capacity=settings.place_chat_buffer_size,
+    max_rooms=settings.place_chat_buffer_max_rooms,
+)
+
+
+def _on_message(message: Dict[str, Any]) -> None:
+    place_chat_buffer.append(int(message["place_id"]), message)
+
+
+event_bus.subscribe(MESSAGE_TOPIC, _on_message)
@@ -0,0 +1,222 @@
+"""
+Retention for place chat messages.
+
+Place chat is only readable for ``place_chat_window_hours``, so old rows are
+expired on a schedule instead of accumulating forever.
+
+On PostgreSQL ``place_chat_messages`` is range-partitioned by day on
+``created_at`` (see the alembic migration). The job creates upcoming daily
+partitions and removes whole expired partitions, either dropping them or
+copying them to ``place_chat_messages_archive`` first. Rows that landed in
+the DEFAULT partition for a day are moved into that day's partition when it
+is created, and expired rows left in the DEFAULT partition are removed row by
+row. Each partition's DDL runs in its own savepoint so one failure does not
+abort the pass. On other databases, or if the table was never partitioned,
+expired rows are moved or deleted in bulk instead.
+"""
+import asyncio
+import logging
+import re
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import delete, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..database import AsyncSessionLocal
+from ..models import PlaceChatMessage, PlaceChatMessageArchive
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "place_chat_messages"
+DEFAULT_PARTITION = "place_chat_messages_default"
+COLUMNS = "id, place_id, user_id, text, created_at"
+PARTITION_PATTERN = re.compile(r"^place_chat_messages_p(\d{8})$")
+# Arbitrary constant so only one node runs the job at a time
+ADVISORY_LOCK_KEY = 727_001
+
+
+class PlaceChatRetentionService:
+    def __init__(self) -> None:
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def partition_name(day: date) -> str:
+        return f"{PARENT_TABLE}_p{day:%Y%m%d}"
+
+    @staticmethod
+    def partition_day(name: str) -> Optional[date]:
+        match = PARTITION_PATTERN.match(name)
+        if not match:
+            return None
+        return datetime.strptime(match.group(1), "%Y%m%d").date()
+
+    @staticmethod
+    def retention_cutoff(now: Optional[datetime] = None) -> datetime:
+        """Messages created before this instant are expired."""
+        now = now or datetime.now(timezone.utc)
+        hours = max(settings.place_chat_retention_hours,
+                    settings.place_chat_window_hours)
+        return now - timedelta(hours=hours)
+
+    @staticmethod
+    def _is_postgres(db: AsyncSession) -> bool:
+        return db.get_bind().dialect.name == "postgresql"
+
+    async def is_partitioned(self, db: AsyncSession) -> bool:
+        if not self._is_postgres(db):
+            return False
+        result = await db.execute(text("""
+            SELECT EXISTS (
+                SELECT 1 FROM pg_partitioned_table pt
+                JOIN pg_class c ON c.oid = pt.partrelid
+                WHERE c.relname = :parent
+            )
+        """), {"parent": PARENT_TABLE})
+        return bool(result.scalar())
+
+    async def ensure_partitions(self, db: AsyncSession, now: Optional[datetime] = None) -> List[str]:
+        """Create daily partitions from today through the configured days ahead.
+
+        A partition is built as a plain table, filled with any of its rows
+        from the DEFAULT partition, then attached; creating it directly with
+        ``PARTITION OF`` fails while the DEFAULT partition holds such rows.
+        """
+        today = (now or datetime.now(timezone.utc)).date()
+        created = []
+        for offset in range(settings.place_chat_partition_days_ahead + 1):
+            day = today + timedelta(days=offset)
+            name = self.partition_name(day)
+            start = datetime.combine(day, time.min, tzinfo=timezone.utc).isoformat()
+            end = datetime.combine(
+                day + timedelta(days=1), time.min, tzinfo=timezone.utc).isoformat()
+            exists = await db.execute(text("SELECT to_regclass(:name)"), {"name": name})
+            if exists.scalar() is not None:
+                continue
+            try:
+                async with db.begin_nested():
+                    await db.execute(text(
+                        f"CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+                    await db.execute(text(f"""
+                        WITH moved AS (
+                            DELETE FROM {DEFAULT_PARTITION}
+                            WHERE created_at >= '{start}' AND created_at < '{end}'
+                            RETURNING {COLUMNS}
+                        )
+                        INSERT INTO {name} ({COLUMNS}) SELECT {COLUMNS} FROM moved
+                    """))
+                    await db.execute(text(
+                        f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} "
+                        f"FOR VALUES FROM ('{start}') TO ('{end}')"
+                    ))
+            except Exception as e:
+                logger.error(f"Failed to create partition {name}: {e}")
+                continue
+            created.append(name)
+        return created
+
+    async def expire_partitions(self, db: AsyncSession, now: Optional[datetime] = None) -> List[str]:
+        """Detach and drop (or archive) partitions entirely older than the cutoff."""
+        cutoff = self.retention_cutoff(now)
+        result = await db.execute(text("""
+            SELECT c.relname FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            JOIN pg_class p ON p.oid = i.inhparent
+            WHERE p.relname = :parent
+        """), {"parent": PARENT_TABLE})
+        expired = []
+        for (name,) in result.all():
+            day = self.partition_day(name)
+            if day is None:
+                continue
+            partition_end = datetime.combine(
+                day + timedelta(days=1), time.min, tzinfo=timezone.utc)
+            if partition_end > cutoff:
+                continue
+            try:
+                async with db.begin_nested():
+                    await db.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+                    if settings.place_chat_retention_mode == "archive":
+                        await db.execute(text(f"""
+                            INSERT INTO place_chat_messages_archive ({COLUMNS})
+                            SELECT {COLUMNS} FROM {name}
+                            ON CONFLICT (id) DO NOTHING
+                        """))
+                    await db.execute(text(f"DROP TABLE {name}"))
+            except Exception as e:
+                logger.error(f"Failed to expire partition {name}: {e}")
+                continue
+            expired.append(name)
+        return expired
+
+    async def expire_rows(self, db: AsyncSession, now: Optional[datetime] = None) -> int:
+        """Row-level expiry for unpartitioned tables, and for rows left in the
+        DEFAULT partition of a partitioned one. Returns rows removed."""
+        cutoff = self.retention_cutoff(now)
+        expired = PlaceChatMessage.created_at < cutoff
+        if settings.place_chat_retention_mode == "archive":
+            await db.execute(insert(PlaceChatMessageArchive).from_select(
+                ["id", "place_id", "user_id", "text", "created_at"],
+                select(
+                    PlaceChatMessage.id,
+                    PlaceChatMessage.place_id,
+                    PlaceChatMessage.user_id,
+                    PlaceChatMessage.text,
+                    PlaceChatMessage.created_at,
+                ).where(expired),
+            ))
+        result = await db.execute(
+            delete(PlaceChatMessage).where(expired).execution_options(synchronize_session=False))
+        return result.rowcount or 0
+
+    async def run_once(self, now: Optional[datetime] = None) -> Dict[str, object]:
+        """Run one retention pass in its own transaction."""
+        async with AsyncSessionLocal() as db:
+            if self._is_postgres(db):
+                locked = await db.execute(
+                    text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": ADVISORY_LOCK_KEY})
+                if not locked.scalar():
+                    return {"skipped": True}
+
+            if await self.is_partitioned(db):
+                summary = {
+                    "created_partitions": await self.ensure_partitions(db, now),
+                    "expired_partitions": await self.expire_partitions(db, now),
+                    # Only the DEFAULT partition (and the day spanning the
+                    # cutoff) can still hold expired rows; pruning skips the rest
+                    "expired_rows": await self.expire_rows(db, now),
+                }
+            else:
+                summary = {"expired_rows": await self.expire_rows(db, now)}
+            await db.commit()
+        return summary
+
+    async def run_scheduler(self) -> None:
+        interval = max(1, settings.place_chat_retention_interval_minutes) * 60
+        while True:
+            try:
+                summary = await self.run_once()
+                logger.info(f"Place chat retention pass: {summary}")
+            except Exception as e:
+                logger.error(f"Place chat retention failed: {e}")
+            await asyncio.sleep(interval)
+
+    def start(self) -> None:
+        if not settings.place_chat_retention_enabled:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run_scheduler())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+place_chat_retention = PlaceChatRetentionService()
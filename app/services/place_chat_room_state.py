@@ -0,0 +1,155 @@
+"""
+Cached per-place chat room state.
+
+Room summaries need the active check-ins at a place and the last chat
+message. Both are kept in memory per room and updated incrementally from
+event bus notifications (check-in created or deleted on the presence topic,
+message written), so GET room and join answer without querying the
+database. A room is loaded from the database the first time it is asked
+for; expired check-ins are dropped lazily on read.
+"""
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import desc, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..models import CheckIn, PlaceChatMessage
+from .event_bus import event_bus
+from .place_chat_buffer import MESSAGE_TOPIC
+from .presence_index import PRESENCE_TOPIC
+
+
+def _as_utc(value: Any) -> Optional[datetime]:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+
+class _RoomState:
+    def __init__(self) -> None:
+        # check-in id -> (user id, created_at, expires_at)
+        self.checkins: Dict[int, Tuple[int, datetime, datetime]] = {}
+        self.last_message: Optional[str] = None
+        self.last_message_at: Optional[datetime] = None
+        self.loaded = False
+
+    def add_checkin(self, checkin_id: int, user_id: int,
+                    created_at: datetime, expires_at: datetime) -> None:
+        self.checkins[checkin_id] = (user_id, created_at, expires_at)
+
+    def set_last_message(self, text: str, created_at: datetime) -> None:
+        if self.last_message_at is None or created_at >= self.last_message_at:
+            self.last_message = text
+            self.last_message_at = created_at
+
+
+class PlaceChatRoomStateCache:
+    def __init__(self, max_rooms: int = 1000) -> None:
+        self.max_rooms = max_rooms
+        self._rooms: "OrderedDict[int, _RoomState]" = OrderedDict()
+
+    def _room(self, place_id: int) -> _RoomState:
+        room = self._rooms.get(place_id)
+        if room is None:
+            room = _RoomState()
+            self._rooms[place_id] = room
+            if len(self._rooms) > self.max_rooms:
+                self._rooms.popitem(last=False)
+        self._rooms.move_to_end(place_id)
+        return room
+
+    async def _load(self, db: AsyncSession, place_id: int, room: _RoomState) -> None:
+        window_start = datetime.now(timezone.utc) - timedelta(
+            hours=int(settings.place_chat_window_hours))
+        rows = await db.execute(
+            select(CheckIn.id, CheckIn.user_id, CheckIn.created_at, CheckIn.expires_at)
+            .where(CheckIn.place_id == place_id, CheckIn.created_at >= window_start)
+        )
+        for checkin_id, user_id, created_at, expires_at in rows.all():
+            room.add_checkin(checkin_id, user_id, _as_utc(created_at), _as_utc(expires_at))
+
+        last = (await db.execute(
+            select(PlaceChatMessage.text, PlaceChatMessage.created_at)
+            .where(PlaceChatMessage.place_id == place_id)
+            .order_by(desc(PlaceChatMessage.created_at))
+            .limit(1)
+        )).first()
+        if last:
+            room.set_last_message(last.text, _as_utc(last.created_at))
+        room.loaded = True
+
+    async def get_summary(
+        self,
+        db: AsyncSession,
+        place_id: int,
+        user_id: int,
+        now: Optional[datetime] = None,
+    ) -> Dict[str, Any]:
+        """Room summary for ``user_id``; only cold rooms touch the database."""
+        room = self._room(place_id)
+        if not room.loaded:
+            # Updates arriving while loading land in the same state object
+            await self._load(db, place_id, room)
+
+        now = now or datetime.now(timezone.utc)
+        window = timedelta(hours=int(settings.place_chat_window_hours))
+        window_start = now - window
+        for checkin_id in [cid for cid, (_, created_at, _) in room.checkins.items()
+                           if created_at < window_start]:
+            del room.checkins[checkin_id]
+
+        active_users = {uid for uid, _, expires_at in room.checkins.values()
+                        if expires_at > now}
+        latest_checkin = max((created_at for _, created_at, _ in room.checkins.values()),
+                             default=None)
+        return {
+            "active_users_count": len(active_users),
+            "expires_at": (latest_checkin + window) if latest_checkin else now,
+            "has_joined": user_id in active_users,
+            "last_message": room.last_message,
+            "last_message_at": room.last_message_at,
+        }
+
+    def apply(self, payload: Dict[str, Any]) -> None:
+        place_id = int(payload["place_id"])
+        if payload["op"] == "invalidate":
+            self._rooms.pop(place_id, None)
+            return
+        room = self._rooms.get(place_id)
+        if room is None:
+            return
+        if payload["op"] == "checkin":
+            room.add_checkin(int(payload["checkin_id"]), int(payload["user_id"]),
+                             _as_utc(payload["created_at"]), _as_utc(payload["expires_at"]))
+
+    def record_message(self, message: Dict[str, Any]) -> None:
+        room = self._rooms.get(int(message["place_id"]))
+        if room is not None:
+            room.set_last_message(message["text"], _as_utc(message["created_at"]))
+
+    def clear(self) -> None:
+        self._rooms.clear()
+
+
+place_chat_room_state = PlaceChatRoomStateCache(
+    max_rooms=settings.place_chat_buffer_max_rooms,
+)
+
+
+def _on_presence_change(payload: Dict[str, Any]) -> None:
+    # A deleted check-in invalidates the room, which reloads on next read
+    if payload["op"] == "remove":
+        place_chat_room_state.apply({"op": "invalidate", "place_id": payload["place_id"]})
+    else:
+        place_chat_room_state.apply({**payload, "op": "checkin"})
+
+
+event_bus.subscribe(PRESENCE_TOPIC, _on_presence_change)
+event_bus.subscribe(MESSAGE_TOPIC, place_chat_room_state.record_message)
@@ -1,13 +1,13 @@
-from datetime import datetime, timedelta, timezone
 from typing import Optional, Tuple
 
 from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 
-from ..config import settings
-from ..models import User, CheckIn, Place, DMThread, DMMessage
+from ..models import User, Place, DMThread, DMMessage
 from ..services.block_service import has_block_between
+from ..services.dm_unread_service import increment_unread
+from ..services.presence_index import presence_index
 
 
 async def create_private_reply_from_place_chat(
@@ -32,15 +32,7 @@ async def create_private_reply_from_place_chat(
     if not target_user:
         raise HTTPException(status_code=404, detail="Target user not found")
 
-    window_cutoff = datetime.now(timezone.utc) - \
-        timedelta(hours=int(settings.place_chat_window_hours))
-
-    participation_query = select(CheckIn).where(
-        CheckIn.user_id == target_user_id,
-        CheckIn.place_id == place_id,
-        CheckIn.created_at >= window_cutoff,
-    )
-    if not (await db.execute(participation_query)).scalar_one_or_none():
+    if not await presence_index.confirm(place_id, target_user_id, active_only=False):
         raise HTTPException(
             status_code=403,
             detail="User is no longer active in this place chat",
@@ -98,6 +90,8 @@ async def create_private_reply_from_place_chat(
     )
     db.add(dm_message)
     thread.updated_at = func.now()
+    await db.flush()
+    await increment_unread(db, [(thread.id, sender_id)])
 
     await db.commit()
     await db.refresh(dm_message)
@@ -16,6 +16,7 @@ import logging
 from ..models import Place
 from ..config import settings
 from ..utils import haversine_distance
+from .reverse_geocoder import fill_place_location, reverse_geocoder
 
 logger = logging.getLogger(__name__)
 
@@ -1116,11 +1117,26 @@ class EnhancedPlaceDataService:
         results.sort(key=lambda item: item.get("distance_m", math.inf))
         return results[:limit]
 
+    def _local_reverse_geocode(self, lat: float, lon: float) -> Dict[str, Optional[str]]:
+        try:
+            return reverse_geocoder.lookup(lat, lon)
+        except Exception as e:
+            logger.warning(f"Local reverse geocode failed: {e}")
+            return {"country": None, "city": None, "neighborhood": None}
+
     async def reverse_geocode_city(self, lat: float, lon: float) -> Optional[str]:
-        """Resolve a city name from coordinates using Nominatim.
+        """Resolve a city name from coordinates.
 
+        Answered from the bundled boundaries; Nominatim is only asked when no
+        local boundary covers the point and the fallback is enabled.
         Returns a plain city/locality string or None on failure.
         """
+        city = self._local_reverse_geocode(lat, lon)["city"]
+        if city or not settings.reverse_geocode_nominatim_fallback:
+            return city
+        return await self._nominatim_reverse_city(lat, lon)
+
+    async def _nominatim_reverse_city(self, lat: float, lon: float) -> Optional[str]:
         try:
             async with httpx.AsyncClient(timeout=httpx.Timeout(settings.http_timeout_seconds)) as client:
                 url = "https://nominatim.openstreetmap.org/reverse"
@@ -1147,8 +1163,18 @@ class EnhancedPlaceDataService:
     async def reverse_geocode_details(self, lat: float, lon: float) -> Dict[str, Optional[str]]:
         """Resolve country, city, and neighborhood/suburb from coordinates.
 
+        Answered from the bundled boundaries; Nominatim only fills in the
+        levels no local boundary covers (usually the neighborhood, which the
+        seed boundaries do not include) when the fallback is enabled.
         Returns keys: country, city, neighborhood (values may be None).
         """
+        result = self._local_reverse_geocode(lat, lon)
+        if (result["city"] and result["neighborhood"]) or not settings.reverse_geocode_nominatim_fallback:
+            return result
+        remote = await self._nominatim_reverse_details(lat, lon)
+        return {key: result.get(key) or remote.get(key) for key in result}
+
+    async def _nominatim_reverse_details(self, lat: float, lon: float) -> Dict[str, Optional[str]]:
         result: Dict[str, Optional[str]] = {
             "country": None, "city": None, "neighborhood": None}
         try:
@@ -1304,6 +1330,7 @@ class EnhancedPlaceDataService:
                 'osm_tags': place_data.get('osm_tags', {})
             }
         )
+        fill_place_location(place)
 
         db.add(place)
         await db.flush()
@@ -0,0 +1,35 @@
+"""
+Short-lived cache of the shared part of place detail responses.
+
+Everything in a place detail that does not depend on the viewer (place
+fields, recent check-ins with photos, totals) is cached per place for
+``place_detail_cache_ttl_seconds``. Check-in create and delete events from
+the presence index and ORM writes to the place itself invalidate it on every
+node; the TTL bounds staleness from anything else.
+"""
+from typing import Any, Dict
+
+from ..config import settings
+from .event_bus import event_bus
+from .place_events import PLACES_CHANGED_TOPIC
+from .presence_index import PRESENCE_TOPIC
+from .ttl_cache import TTLCache
+
+place_detail_cache = TTLCache(
+    ttl_seconds=settings.place_detail_cache_ttl_seconds,
+    max_entries=settings.place_detail_cache_max_entries,
+)
+
+
+def _on_presence_change(payload: Dict[str, Any]) -> None:
+    if payload.get("place_id") is not None:
+        place_detail_cache.invalidate(int(payload["place_id"]))
+
+
+def _on_places_changed(payload: Dict[str, Any]) -> None:
+    for place_id in payload.get("place_ids", []):
+        place_detail_cache.invalidate(int(place_id))
+
+
+event_bus.subscribe(PRESENCE_TOPIC, _on_presence_change)
+event_bus.subscribe(PLACES_CHANGED_TOPIC, _on_places_changed)
@@ -0,0 +1,62 @@
+"""
+Change notifications for places.
+
+ORM writes to ``Place`` rows are collected per session on flush and, once
+the transaction commits, announced on the event bus as ``places.changed``
+with the affected place ids. Caches of place data subscribe to this topic
+instead of every write path calling them directly.
+
+``publish_on_commit`` sets up the same flush/commit hooks for any model, so
+other caches (collection covers) announce their changes the same way.
+"""
+import asyncio
+import logging
+from typing import Any, Dict, Set
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from ..models import Place
+from .event_bus import event_bus
+
+logger = logging.getLogger(__name__)
+
+PLACES_CHANGED_TOPIC = "places.changed"
+
+_pending: Set[asyncio.Task] = set()
+
+
+def publish_on_commit(model: Any, topic: str, key: str, attr: str) -> None:
+    """Publish ``{key: sorted ids}`` on ``topic`` after each commit that
+    wrote ``model`` rows, where the ids are the rows' ``attr`` values."""
+    session_key = f"changed:{topic}"
+
+    def _after_flush(session: Session, flush_context: Any) -> None:
+        changed = session.info.setdefault(session_key, set())
+        for obj in (*session.new, *session.dirty, *session.deleted):
+            if isinstance(obj, model) and getattr(obj, attr) is not None:
+                changed.add(getattr(obj, attr))
+
+    def _after_commit(session: Session) -> None:
+        changed = session.info.pop(session_key, None)
+        if not changed:
+            return
+        payload: Dict[str, Any] = {key: sorted(changed)}
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        # Commit hooks are synchronous; subscribers run on the next loop turn
+        task = loop.create_task(event_bus.publish(topic, payload))
+        _pending.add(task)
+        task.add_done_callback(_pending.discard)
+
+    def _after_soft_rollback(session: Session, previous_transaction: Any) -> None:
+        session.info.pop(session_key, None)
+
+    event.listen(Session, "after_flush", _after_flush)
+    event.listen(Session, "after_commit", _after_commit)
+    event.listen(Session, "after_soft_rollback", _after_soft_rollback)
+
+
+publish_on_commit(Place, PLACES_CHANGED_TOPIC, "place_ids", "id")
@@ -0,0 +1,174 @@
+"""
+Per-place check-in stats shared by collection items, place details and
+trending.
+
+Lists of places used to run a count and a "latest photos" query per place.
+These helpers take a page of place ids and load whatever is not cached with
+one set-based query per stat:
+
+- ``checkin_totals``: all-time check-in count,
+- ``recent_photos``: latest check-in photo paths (ROW_NUMBER per place),
+- ``recent_checkin_counts``: distinct users with an active check-in made
+  within the last N hours.
+
+Stats are cached per place for ``place_stats_cache_ttl_seconds``. Check-in
+create and delete events from the presence index and writes to the place
+drop a place's entry on every node, like ``place_detail_cache``. A load
+that an invalidation overtakes is returned but not cached, the same guard
+``FollowGraphCache.following`` uses.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+from sqlalchemy import and_, desc, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..models import CheckIn, CheckInPhoto
+from .event_bus import event_bus
+from .place_events import PLACES_CHANGED_TOPIC
+from .presence_index import PRESENCE_TOPIC
+from .ttl_cache import TTLCache
+
+RECENT_PHOTO_COUNT = 3
+
+# place id -> {stat name: value}; a missing name means not loaded yet
+place_stats_cache = TTLCache(
+    ttl_seconds=settings.place_stats_cache_ttl_seconds,
+    max_entries=settings.place_stats_cache_max_entries,
+)
+# Invalidation counter, and per place being loaded (loads in flight, version
+# of the last invalidation that arrived while they ran)
+_version = 0
+_loading: Dict[int, Tuple[int, int]] = {}
+
+
+async def _cached_stat(
+    place_ids: Iterable[int],
+    name: Any,
+    load: Callable[[List[int]], Any],
+) -> Dict[int, Any]:
+    """Values of one stat per place, loading the uncached ones in one call."""
+    values: Dict[int, Any] = {}
+    missing: List[int] = []
+    for place_id in dict.fromkeys(place_ids):
+        entry = place_stats_cache.get(place_id)
+        if entry is not None and name in entry:
+            values[place_id] = entry[name]
+        else:
+            missing.append(place_id)
+    if missing:
+        started = _version
+        for place_id in missing:
+            loads, changed = _loading.get(place_id, (0, 0))
+            _loading[place_id] = (loads + 1, changed)
+        stale = set()
+        try:
+            loaded = await load(missing)
+        finally:
+            for place_id in missing:
+                loads, changed = _loading.pop(place_id)
+                if loads > 1:
+                    _loading[place_id] = (loads - 1, changed)
+                if changed > started:
+                    stale.add(place_id)
+        for place_id in missing:
+            values[place_id] = loaded[place_id]
+            # An invalidation applied while the query ran may be missing from it
+            if place_id in stale:
+                continue
+            entry = place_stats_cache.get(place_id)
+            if entry is None:
+                entry = {}
+                place_stats_cache.set(place_id, entry)
+            entry[name] = loaded[place_id]
+    return values
+
+
+async def checkin_totals(db: AsyncSession, place_ids: Iterable[int]) -> Dict[int, int]:
+    async def load(missing: List[int]) -> Dict[int, int]:
+        rows = await db.execute(
+            select(CheckIn.place_id, func.count(CheckIn.id))
+            .where(CheckIn.place_id.in_(missing))
+            .group_by(CheckIn.place_id)
+        )
+        counts = dict.fromkeys(missing, 0)
+        counts.update({place_id: int(n) for place_id, n in rows.all()})
+        return counts
+
+    return await _cached_stat(place_ids, "checkin_total", load)
+
+
+async def recent_photos(db: AsyncSession, place_ids: Iterable[int]) -> Dict[int, List[str]]:
+    """Latest check-in photo paths per place, newest first (unsigned)."""
+    async def load(missing: List[int]) -> Dict[int, List[str]]:
+        ranked = (
+            select(
+                CheckIn.place_id,
+                CheckInPhoto.url,
+                func.row_number().over(
+                    partition_by=CheckIn.place_id,
+                    order_by=(desc(CheckInPhoto.created_at), desc(CheckInPhoto.id)),
+                ).label("rank"),
+            )
+            .join(CheckIn, CheckInPhoto.check_in_id == CheckIn.id)
+            .where(and_(CheckIn.place_id.in_(missing), CheckInPhoto.url.isnot(None)))
+            .subquery()
+        )
+        rows = await db.execute(
+            select(ranked.c.place_id, ranked.c.url)
+            .where(ranked.c.rank <= RECENT_PHOTO_COUNT)
+            .order_by(ranked.c.place_id, ranked.c.rank)
+        )
+        photos: Dict[int, List[str]] = {place_id: [] for place_id in missing}
+        for place_id, url in rows.all():
+            photos[place_id].append(url)
+        return photos
+
+    return await _cached_stat(place_ids, "recent_photos", load)
+
+
+async def recent_checkin_counts(
+    db: AsyncSession, place_ids: Iterable[int], hours: int
+) -> Dict[int, int]:
+    """Distinct users with a still-active check-in made in the last ``hours``."""
+    async def load(missing: List[int]) -> Dict[int, int]:
+        now = datetime.now(timezone.utc)
+        rows = await db.execute(
+            select(CheckIn.place_id, func.count(func.distinct(CheckIn.user_id)))
+            .where(
+                and_(
+                    CheckIn.place_id.in_(missing),
+                    CheckIn.created_at >= now - timedelta(hours=hours),
+                    CheckIn.expires_at > now,
+                )
+            )
+            .group_by(CheckIn.place_id)
+        )
+        counts = dict.fromkeys(missing, 0)
+        counts.update({place_id: int(n) for place_id, n in rows.all()})
+        return counts
+
+    return await _cached_stat(place_ids, ("recent_checkins", hours), load)
+
+
+def _invalidate(place_id: int) -> None:
+    global _version
+    _version += 1
+    if place_id in _loading:
+        _loading[place_id] = (_loading[place_id][0], _version)
+    place_stats_cache.invalidate(place_id)
+
+
+def _on_presence_change(payload: Dict[str, Any]) -> None:
+    if payload.get("place_id") is not None:
+        _invalidate(int(payload["place_id"]))
+
+
+def _on_places_changed(payload: Dict[str, Any]) -> None:
+    for place_id in payload.get("place_ids", []):
+        _invalidate(int(place_id))
+
+
+event_bus.subscribe(PRESENCE_TOPIC, _on_presence_change)
+event_bus.subscribe(PLACES_CHANGED_TOPIC, _on_places_changed)
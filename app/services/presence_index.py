@@ -0,0 +1,258 @@
+"""
+In-process index of check-ins inside the place chat window.
+
+Who's-here, chat gating, room summaries and the dynamic place limit all ask
+the same question: which users have a recent, unexpired check-in at a place.
+The index keeps those check-ins in memory keyed place -> users and
+user -> places, so the answers need no query. It is built from the database
+on first use (or at startup) and kept current by check-in create and delete
+events on the event bus, which also reach other nodes when the Postgres
+event bus backend is enabled.
+
+A check-in is *active* until ``expires_at``, and stays in the index (for
+window-only checks and the room's latest check-in time) until it falls out
+of ``place_chat_window_hours``. Both transitions are applied lazily from a
+time-ordered heap whenever the index is read.
+"""
+import asyncio
+import heapq
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy import select
+
+from ..config import settings
+from ..database import AsyncSessionLocal
+from ..models import CheckIn
+from .event_bus import event_bus
+
+logger = logging.getLogger(__name__)
+
+PRESENCE_TOPIC = "presence.checkin"
+
+_DEACTIVATE = 0
+_EVICT = 1
+
+
+def _as_utc(value: Any) -> datetime:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+
+class _Entry(NamedTuple):
+    user_id: int
+    place_id: int
+    created_at: datetime
+    expires_at: datetime
+
+
+class PresenceIndex:
+    def __init__(self) -> None:
+        self._load_lock = asyncio.Lock()
+        self.clear()
+
+    def clear(self) -> None:
+        self._entries: Dict[int, _Entry] = {}
+        self._active: Set[int] = set()
+        self._by_place: Dict[int, Set[int]] = {}
+        self._by_user: Dict[int, Set[int]] = {}
+        # place -> user -> active check-in count, and user -> active count
+        self._active_by_place: Dict[int, Dict[int, int]] = {}
+        self._active_users: Dict[int, int] = {}
+        self._heap: List[Tuple[datetime, int, int]] = []
+        self._loaded = False
+
+    @staticmethod
+    def _window() -> timedelta:
+        return timedelta(hours=int(settings.place_chat_window_hours))
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+    async def _load(self) -> None:
+        window_start = datetime.now(timezone.utc) - self._window()
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(
+                select(CheckIn.id, CheckIn.user_id, CheckIn.place_id,
+                       CheckIn.created_at, CheckIn.expires_at)
+                .where(CheckIn.created_at >= window_start)
+            )).all()
+        # Events received while loading are kept; add() is idempotent
+        for checkin_id, user_id, place_id, created_at, expires_at in rows:
+            self.add(checkin_id, user_id, place_id, created_at, expires_at)
+        self._loaded = True
+        logger.info(f"Presence index loaded with {len(rows)} check-ins")
+
+    async def load(self) -> None:
+        """Build the index from check-ins inside the chat window."""
+        async with self._load_lock:
+            await self._load()
+
+    async def ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if not self._loaded:
+                await self._load()
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+    def add(self, checkin_id: int, user_id: int, place_id: int,
+            created_at: Any, expires_at: Any, now: Optional[datetime] = None) -> None:
+        if checkin_id in self._entries:
+            return
+        now = now or datetime.now(timezone.utc)
+        created_at, expires_at = _as_utc(created_at), _as_utc(expires_at)
+        evict_at = created_at + self._window()
+        if evict_at <= now:
+            return
+        entry = _Entry(user_id, place_id, created_at, expires_at)
+        self._entries[checkin_id] = entry
+        self._by_place.setdefault(place_id, set()).add(checkin_id)
+        self._by_user.setdefault(user_id, set()).add(checkin_id)
+        heapq.heappush(self._heap, (evict_at, _EVICT, checkin_id))
+        if expires_at > now:
+            self._activate(checkin_id, entry)
+            heapq.heappush(self._heap, (min(expires_at, evict_at), _DEACTIVATE, checkin_id))
+
+    def remove(self, checkin_id: int) -> None:
+        entry = self._entries.pop(checkin_id, None)
+        if entry is None:
+            return
+        self._deactivate(checkin_id, entry)
+        for index, key in ((self._by_place, entry.place_id), (self._by_user, entry.user_id)):
+            ids = index.get(key)
+            if ids is not None:
+                ids.discard(checkin_id)
+                if not ids:
+                    del index[key]
+
+    def _activate(self, checkin_id: int, entry: _Entry) -> None:
+        self._active.add(checkin_id)
+        users = self._active_by_place.setdefault(entry.place_id, {})
+        users[entry.user_id] = users.get(entry.user_id, 0) + 1
+        self._active_users[entry.user_id] = self._active_users.get(entry.user_id, 0) + 1
+
+    def _deactivate(self, checkin_id: int, entry: _Entry) -> None:
+        if checkin_id not in self._active:
+            return
+        self._active.discard(checkin_id)
+        users = self._active_by_place[entry.place_id]
+        users[entry.user_id] -= 1
+        if not users[entry.user_id]:
+            del users[entry.user_id]
+            if not users:
+                del self._active_by_place[entry.place_id]
+        self._active_users[entry.user_id] -= 1
+        if not self._active_users[entry.user_id]:
+            del self._active_users[entry.user_id]
+
+    def _advance(self, now: Optional[datetime] = None) -> None:
+        """Apply every expiry and window eviction due by ``now``."""
+        now = now or datetime.now(timezone.utc)
+        while self._heap and self._heap[0][0] <= now:
+            _, kind, checkin_id = heapq.heappop(self._heap)
+            entry = self._entries.get(checkin_id)
+            if entry is None:
+                continue
+            if kind == _EVICT:
+                self.remove(checkin_id)
+            else:
+                self._deactivate(checkin_id, entry)
+
+    async def publish_checkin(self, checkin: CheckIn) -> None:
+        await event_bus.publish(PRESENCE_TOPIC, {
+            "op": "add",
+            "checkin_id": checkin.id,
+            "user_id": checkin.user_id,
+            "place_id": checkin.place_id,
+            "created_at": _as_utc(checkin.created_at).isoformat(),
+            "expires_at": _as_utc(checkin.expires_at).isoformat(),
+        })
+
+    async def publish_removal(self, checkin_id: int, place_id: int) -> None:
+        await event_bus.publish(PRESENCE_TOPIC, {
+            "op": "remove", "checkin_id": checkin_id, "place_id": place_id})
+
+    def apply(self, payload: Dict[str, Any]) -> None:
+        if payload["op"] == "remove":
+            self.remove(int(payload["checkin_id"]))
+        else:
+            self.add(int(payload["checkin_id"]), int(payload["user_id"]),
+                     int(payload["place_id"]), payload["created_at"], payload["expires_at"])
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def is_active(self, place_id: int, user_id: int, now: Optional[datetime] = None) -> bool:
+        """User has an unexpired check-in at the place inside the chat window."""
+        self._advance(now)
+        return user_id in self._active_by_place.get(place_id, ())
+
+    def in_window(self, place_id: int, user_id: int, now: Optional[datetime] = None) -> bool:
+        """User checked in at the place inside the chat window, expired or not."""
+        self._advance(now)
+        ids = self._by_user.get(user_id, ())
+        return any(self._entries[cid].place_id == place_id for cid in ids)
+
+    def active_user_count(self, place_id: int, now: Optional[datetime] = None) -> int:
+        self._advance(now)
+        return len(self._active_by_place.get(place_id, ()))
+
+    def total_active_users(self, now: Optional[datetime] = None) -> int:
+        """Distinct users with an active check-in anywhere."""
+        self._advance(now)
+        return len(self._active_users)
+
+    def present_users(self, place_id: int, now: Optional[datetime] = None) -> List[Tuple[datetime, int]]:
+        """(created_at, check-in id) of each active user's latest check-in at
+        the place, newest first."""
+        self._advance(now)
+        latest: Dict[int, Tuple[datetime, int]] = {}
+        for cid in self._by_place.get(place_id, ()):
+            if cid not in self._active:
+                continue
+            entry = self._entries[cid]
+            key = (entry.created_at, cid)
+            if entry.user_id not in latest or key > latest[entry.user_id]:
+                latest[entry.user_id] = key
+        return sorted(latest.values(), reverse=True)
+
+    async def confirm(self, place_id: int, user_id: int, active_only: bool = True) -> bool:
+        """``is_active`` (or ``in_window`` when ``active_only`` is False) for
+        access checks. A miss is confirmed against the database before
+        denying, since a check-in event may not have reached this node yet;
+        check-ins found there are added to the index."""
+        await self.ensure_loaded()
+        hit = self.is_active if active_only else self.in_window
+        if hit(place_id, user_id):
+            return True
+        now = datetime.now(timezone.utc)
+        query = select(CheckIn.id, CheckIn.created_at, CheckIn.expires_at).where(
+            CheckIn.place_id == place_id,
+            CheckIn.user_id == user_id,
+            CheckIn.created_at >= now - self._window(),
+        )
+        if active_only:
+            query = query.where(CheckIn.expires_at > now)
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(query)).all()
+        for checkin_id, created_at, expires_at in rows:
+            self.add(checkin_id, user_id, place_id, created_at, expires_at, now)
+        return bool(rows)
+
+    def latest_checkin_at(self, place_id: int, now: Optional[datetime] = None) -> Optional[datetime]:
+        """Most recent check-in at the place inside the chat window."""
+        self._advance(now)
+        return max((self._entries[cid].created_at for cid in self._by_place.get(place_id, ())),
+                   default=None)
+
+
+presence_index = PresenceIndex()
+
+event_bus.subscribe(PRESENCE_TOPIC, presence_index.apply)
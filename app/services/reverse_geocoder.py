@@ -0,0 +1,171 @@
+"""
+Offline reverse geocoding over bundled administrative boundaries.
+
+New places used to be reverse-geocoded through Nominatim just to fill
+country, city and neighborhood. ``app/data/boundaries.json`` now holds
+simplified boundary polygons for those three levels (rebuilt from GeoJSON by
+``scripts/build_boundaries.py``), loaded once at startup into a grid index:
+each cell of ``GRID_CELL_DEGREES`` lists the boundaries whose bounding box
+overlaps it, so a lookup checks a handful of candidates with a bounding-box
+test and a ray-casting point-in-polygon test, with no I/O.
+
+Where boundaries nest or overlap at one level the smallest one wins. A
+boundary may carry its country code, which is used when no country polygon
+covers the point. ``APP_BOUNDARIES_PATH`` points at a fuller build.
+
+The bundled file is only a seed: approximate rectangular extents for the
+popular Gulf cities and no neighborhoods. Where neighbouring rectangles
+overlap a point can resolve to the wrong city, so production should point
+``APP_BOUNDARIES_PATH`` at a build from real boundary data; until then new
+places get no neighborhood unless ``APP_REVERSE_GEOCODE_NOMINATIM_FALLBACK``
+lets Nominatim fill it (and anything outside the seed).
+"""
+import json
+import logging
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = Path(__file__).resolve().parent.parent / "data" / "boundaries.json"
+FORMAT_VERSION = 1
+LEVELS = ("country", "city", "neighborhood")
+GRID_CELL_DEGREES = 0.5
+
+Ring = Sequence[Tuple[float, float]]  # (lng, lat) pairs, GeoJSON order
+Polygon = Sequence[Ring]  # outer ring, then holes
+
+
+class Boundary(NamedTuple):
+    level: str
+    name: str
+    country: Optional[str]
+    bbox: Tuple[float, float, float, float]  # min lng, min lat, max lng, max lat
+    area: float
+    polygons: List[Polygon]
+
+
+def point_in_ring(lng: float, lat: float, ring: Ring) -> bool:
+    inside = False
+    j = len(ring) - 1
+    for i in range(len(ring)):
+        xi, yi = ring[i]
+        xj, yj = ring[j]
+        if (yi > lat) != (yj > lat) and lng < (xj - xi) * (lat - yi) / (yj - yi) + xi:
+            inside = not inside
+        j = i
+    return inside
+
+
+def point_in_polygon(lng: float, lat: float, polygon: Polygon) -> bool:
+    if not point_in_ring(lng, lat, polygon[0]):
+        return False
+    return not any(point_in_ring(lng, lat, hole) for hole in polygon[1:])
+
+
+def ring_area(ring: Ring) -> float:
+    """Planar area in square degrees; only used to rank nested boundaries."""
+    total = 0.0
+    for (x1, y1), (x2, y2) in zip(ring, list(ring[1:]) + [ring[0]]):
+        total += x1 * y2 - x2 * y1
+    return abs(total) / 2
+
+
+class ReverseGeocoder:
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self._path = path
+        self._loaded = False
+        self._boundaries: List[Boundary] = []
+        self._grid: Dict[Tuple[int, int], List[int]] = {}
+
+    @property
+    def path(self) -> Path:
+        if self._path is not None:
+            return self._path
+        return Path(settings.boundaries_path) if settings.boundaries_path else DEFAULT_PATH
+
+    @staticmethod
+    def _cell(lng: float, lat: float) -> Tuple[int, int]:
+        return int(lng // GRID_CELL_DEGREES), int(lat // GRID_CELL_DEGREES)
+
+    def _load(self) -> None:
+        with open(self.path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("format") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported boundaries format: {data.get('format')}")
+
+        boundaries: List[Boundary] = []
+        grid: Dict[Tuple[int, int], List[int]] = {}
+        for feature in data["features"]:
+            polygons = [[[tuple(point) for point in ring] for ring in polygon]
+                        for polygon in feature["polygons"]]
+            outer = [point for polygon in polygons for point in polygon[0]]
+            bbox = (min(p[0] for p in outer), min(p[1] for p in outer),
+                    max(p[0] for p in outer), max(p[1] for p in outer))
+            area = sum(ring_area(polygon[0]) for polygon in polygons)
+            index = len(boundaries)
+            boundaries.append(Boundary(feature["level"], feature["name"],
+                                       feature.get("country"), bbox, area, polygons))
+            min_x, min_y = self._cell(bbox[0], bbox[1])
+            max_x, max_y = self._cell(bbox[2], bbox[3])
+            for x in range(min_x, max_x + 1):
+                for y in range(min_y, max_y + 1):
+                    grid.setdefault((x, y), []).append(index)
+
+        self._boundaries = boundaries
+        self._grid = grid
+        self._loaded = True
+        logger.info(f"Reverse geocoder loaded {len(boundaries)} boundaries "
+                    f"in {len(grid)} grid cells ({data.get('source', '')})")
+
+    def ensure_loaded(self) -> None:
+        if not self._loaded:
+            self._load()
+
+    def lookup(self, lat: float, lng: float) -> Dict[str, Optional[str]]:
+        """Country, city and neighborhood containing the point (values may be None)."""
+        self.ensure_loaded()
+        best: Dict[str, Boundary] = {}
+        for index in self._grid.get(self._cell(lng, lat), ()):
+            boundary = self._boundaries[index]
+            min_lng, min_lat, max_lng, max_lat = boundary.bbox
+            if not (min_lng <= lng <= max_lng and min_lat <= lat <= max_lat):
+                continue
+            current = best.get(boundary.level)
+            if current is not None and current.area <= boundary.area:
+                continue
+            if any(point_in_polygon(lng, lat, polygon) for polygon in boundary.polygons):
+                best[boundary.level] = boundary
+
+        result: Dict[str, Optional[str]] = {
+            level: best[level].name if level in best else None for level in LEVELS}
+        if result["country"] is None:
+            result["country"] = next(
+                (best[level].country for level in ("city", "neighborhood")
+                 if level in best and best[level].country), None)
+        return result
+
+
+def fill_place_location(place, geocoder: Optional[ReverseGeocoder] = None) -> bool:
+    """Fill a place's missing country, city and neighborhood from its
+    coordinates. Returns True if any field was set."""
+    if place.latitude is None or place.longitude is None:
+        return False
+    if place.country and place.city and place.neighborhood:
+        return False
+    try:
+        geo = (geocoder or reverse_geocoder).lookup(place.latitude, place.longitude)
+    except Exception as e:
+        logger.warning(f"Local reverse geocode failed: {e}")
+        return False
+    changed = False
+    for field in LEVELS:
+        if not getattr(place, field, None) and geo.get(field):
+            setattr(place, field, geo[field])
+            changed = True
+    return changed
+
+
+reverse_geocoder = ReverseGeocoder()
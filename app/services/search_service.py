@@ -0,0 +1,67 @@
+"""
+Text search over places and users.
+
+Searches match ``ILIKE '%q%'`` on a fixed set of columns per entity. On
+PostgreSQL those columns carry ``pg_trgm`` GIN indexes (see the alembic
+migration), which serve substring and prefix ILIKE from the index instead of
+a full scan, and results are ranked by trigram similarity. Other databases
+(SQLite in tests) run the same filter unindexed and rank by match type only.
+
+Ranking puts exact matches first, then prefix matches, then matches at the
+start of a later word, then other substring matches, so type-ahead style
+queries surface the obvious result at the top.
+"""
+from typing import List, Sequence
+
+from sqlalchemy import case, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import Place, User
+
+PLACE_SEARCH_COLUMNS = (Place.name, Place.categories, Place.address, Place.city)
+USER_SEARCH_COLUMNS = (User.username, User.name)
+
+_LIKE_ESCAPE = "\\"
+
+
+def escape_like(value: str) -> str:
+    """Escape LIKE wildcards so user input matches literally."""
+    return (
+        value.replace(_LIKE_ESCAPE, _LIKE_ESCAPE * 2)
+        .replace("%", _LIKE_ESCAPE + "%")
+        .replace("_", _LIKE_ESCAPE + "_")
+    )
+
+
+def contains_clause(columns: Sequence, q: str):
+    """Rows where any column contains ``q`` (case-insensitive)."""
+    pattern = f"%{escape_like(q)}%"
+    return or_(*(column.ilike(pattern, escape=_LIKE_ESCAPE) for column in columns))
+
+
+def match_rank(columns: Sequence, q: str):
+    """3 exact, 2 prefix, 1 word prefix, 0 substring; best over ``columns``."""
+    escaped = escape_like(q)
+    levels = (
+        (3, lambda c: func.lower(c) == q.lower()),
+        (2, lambda c: c.ilike(f"{escaped}%", escape=_LIKE_ESCAPE)),
+        (1, lambda c: c.ilike(f"% {escaped}%", escape=_LIKE_ESCAPE)),
+    )
+    return case(
+        *((condition(column), level) for level, condition in levels for column in columns),
+        else_=0,
+    )
+
+
+def _is_postgres(db: AsyncSession) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def relevance_order(db: AsyncSession, columns: Sequence, q: str) -> List:
+    """ORDER BY expressions ranking rows by how well they match ``q``."""
+    order = [match_rank(columns, q).desc()]
+    if _is_postgres(db):
+        order.append(func.greatest(*(
+            func.similarity(func.coalesce(column, ""), q) for column in columns
+        )).desc())
+    return order
@@ -0,0 +1,46 @@
+"""
+Small in-memory TTL cache.
+
+Entries are stored as key -> (expires_at, value), like the caches in
+place_data_service_v2, with a bound on the number of keys. Values should be
+treated as read-only by callers since they are shared between requests.
+"""
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    def __init__(self, ttl_seconds: float, max_entries: int = 10000) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._items: "OrderedDict[Hashable, Tuple[datetime, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        item = self._items.get(key)
+        if not item:
+            return None
+        expires_at, value = item
+        if expires_at <= datetime.now(timezone.utc):
+            self._items.pop(key, None)
+            return None
+        self._items.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=ttl)
+        self._items[key] = (expires_at, value)
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_entries:
+            self._items.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._items.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> None:
+        for key in [key for key in self._items if predicate(key)]:
+            del self._items[key]
+
+    def clear(self) -> None:
+        self._items.clear()
@@ -0,0 +1,103 @@
+"""
+Ephemeral typing-indicator state.
+
+Typing frames arrive several times per second per active user, so they are
+kept in memory with a short TTL instead of being written to
+``DMParticipantState``. Updates are shared with other nodes through the event
+bus and broadcasts are rate limited per (thread, user).
+"""
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+
+from ..config import settings
+from .event_bus import event_bus
+
+TYPING_TOPIC = "dm.typing"
+
+
+class TypingStateStore:
+    def __init__(self, ttl_seconds: float = 5.0, rebroadcast_seconds: float = 2.0) -> None:
+        self.ttl_seconds = ttl_seconds
+        # While a user keeps typing, repeat the indicator at most this often
+        self.rebroadcast_seconds = rebroadcast_seconds
+        # (thread_id, user_id) -> typing expiry
+        self._until: Dict[Tuple[int, int], datetime] = {}
+        # (thread_id, user_id) -> (last broadcast state, monotonic timestamp)
+        self._last_broadcast: Dict[Tuple[int, int], Tuple[bool, float]] = {}
+
+    def apply(self, thread_id: int, user_id: int, typing: bool, until: Optional[datetime] = None) -> None:
+        """Record the typing state without any broadcast bookkeeping."""
+        key = (thread_id, user_id)
+        if typing:
+            self._until[key] = until or (
+                datetime.now(timezone.utc) + timedelta(seconds=self.ttl_seconds))
+        else:
+            self._until.pop(key, None)
+
+    def should_broadcast(self, thread_id: int, user_id: int, typing: bool) -> bool:
+        """Return True when this change is worth sending to the other participants."""
+        key = (thread_id, user_id)
+        now = time.monotonic()
+        last = self._last_broadcast.get(key)
+        if last is not None:
+            last_state, last_at = last
+            if last_state == typing and (not typing or now - last_at < self.rebroadcast_seconds):
+                return False
+        elif not typing:
+            # Nothing was announced, so there is nothing to stop
+            return False
+        self._last_broadcast[key] = (typing, now)
+        return True
+
+    def get_typing_until(self, thread_id: int, user_id: int) -> Optional[datetime]:
+        """Return the typing expiry for a participant, or None if not typing."""
+        key = (thread_id, user_id)
+        until = self._until.get(key)
+        if until is None:
+            return None
+        if until <= datetime.now(timezone.utc):
+            self._until.pop(key, None)
+            self._last_broadcast.pop(key, None)
+            return None
+        return until
+
+    def is_typing(self, thread_id: int, user_id: int) -> bool:
+        return self.get_typing_until(thread_id, user_id) is not None
+
+    def clear(self, thread_id: int, user_id: int) -> None:
+        key = (thread_id, user_id)
+        self._until.pop(key, None)
+        self._last_broadcast.pop(key, None)
+
+    def prune(self) -> int:
+        """Drop expired entries. Returns the number removed."""
+        now = datetime.now(timezone.utc)
+        expired = [key for key, until in self._until.items() if until <= now]
+        for key in expired:
+            self._until.pop(key, None)
+            self._last_broadcast.pop(key, None)
+        return len(expired)
+
+    async def update(self, thread_id: int, user_id: int, typing: bool) -> bool:
+        """Record a typing frame and publish it if it passes the rate limit.
+
+        Returns True when an event was published.
+        """
+        self.apply(thread_id, user_id, typing)
+        if not self.should_broadcast(thread_id, user_id, typing):
+            return False
+        until = self._until.get((thread_id, user_id))
+        await event_bus.publish(TYPING_TOPIC, {
+            "thread_id": thread_id,
+            "user_id": user_id,
+            "typing": typing,
+            "until": until.isoformat() if until else None,
+        })
+        return True
+
+
+typing_store = TypingStateStore(
+    ttl_seconds=settings.typing_ttl_seconds,
+    rebroadcast_seconds=settings.typing_rebroadcast_seconds,
+)
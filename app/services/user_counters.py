@@ -0,0 +1,142 @@
+"""
+Materialized profile counters.
+
+``User.followers_count``, ``following_count`` and ``check_ins_count`` are
+adjusted in the same transaction that adds or removes a follow or check-in,
+so profiles read them from the user row instead of counting ``follows`` and
+``check_ins``. ``repair_user_counters`` recomputes them from the source
+tables, and ``user_counter_reconciler`` runs it on a schedule to fix any
+drift from writes that bypass the helpers.
+"""
+import asyncio
+import logging
+from typing import Optional
+
+from sqlalchemy import func, or_, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..database import AsyncSessionLocal
+from ..models import CheckIn, Follow, User
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary constant so only one node reconciles at a time
+ADVISORY_LOCK_KEY = 727_002
+
+
+async def adjust_counters(
+    db: AsyncSession,
+    user_id: int,
+    followers: int = 0,
+    following: int = 0,
+    check_ins: int = 0,
+) -> None:
+    """Add the deltas to a user's counters. Does not commit."""
+    values = {}
+    if followers:
+        values["followers_count"] = User.followers_count + followers
+    if following:
+        values["following_count"] = User.following_count + following
+    if check_ins:
+        values["check_ins_count"] = User.check_ins_count + check_ins
+    if not values:
+        return
+    await db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def record_follow(db: AsyncSession, follower_id: int, followee_id: int, delta: int = 1) -> None:
+    """Count a follow (delta=1) or unfollow (delta=-1). Does not commit."""
+    await adjust_counters(db, follower_id, following=delta)
+    await adjust_counters(db, followee_id, followers=delta)
+
+
+async def repair_user_counters(db: AsyncSession, user_id: Optional[int] = None) -> int:
+    """Recompute the counters from follows and check-ins. Returns the rows changed."""
+    followers = (
+        select(func.count(Follow.id))
+        .where(Follow.followee_id == User.id)
+        .correlate(User)
+        .scalar_subquery()
+    )
+    following = (
+        select(func.count(Follow.id))
+        .where(Follow.follower_id == User.id)
+        .correlate(User)
+        .scalar_subquery()
+    )
+    check_ins = (
+        select(func.count(CheckIn.id))
+        .where(CheckIn.user_id == User.id)
+        .correlate(User)
+        .scalar_subquery()
+    )
+    stmt = (
+        update(User)
+        .where(or_(
+            User.followers_count != followers,
+            User.following_count != following,
+            User.check_ins_count != check_ins,
+        ))
+        .values(
+            followers_count=followers,
+            following_count=following,
+            check_ins_count=check_ins,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if user_id is not None:
+        stmt = stmt.where(User.id == user_id)
+    result = await db.execute(stmt)
+    await db.commit()
+    return result.rowcount or 0
+
+
+class UserCounterReconciler:
+    def __init__(self) -> None:
+        self._task: Optional[asyncio.Task] = None
+
+    async def run_once(self) -> Optional[int]:
+        """Repair every user's counters. Returns None if another node holds the lock."""
+        async with AsyncSessionLocal() as db:
+            if db.get_bind().dialect.name == "postgresql":
+                locked = await db.execute(
+                    text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": ADVISORY_LOCK_KEY})
+                if not locked.scalar():
+                    return None
+            return await repair_user_counters(db)
+
+    async def run_scheduler(self) -> None:
+        interval = max(1, settings.user_counters_reconcile_interval_minutes) * 60
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                repaired = await self.run_once()
+                if repaired:
+                    logger.warning(f"Repaired profile counters on {repaired} users")
+            except Exception as e:
+                logger.error(f"Profile counter reconciliation failed: {e}")
+
+    def start(self) -> None:
+        if not settings.user_counters_reconcile_enabled:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run_scheduler())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+user_counter_reconciler = UserCounterReconciler()
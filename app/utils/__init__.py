@@ -8,5 +8,10 @@ from .common import (
     can_view_following_list,
     can_view_collection,
     can_view_profile,
-    should_appear_in_search
+    can_view_stats,
+    should_appear_in_search,
+    PrivacyEngine,
+    visible_to_viewer_clause,
 )
+from .cursors import encode_cursor, decode_cursor
+from .responses import FastJSONResponse
@@ -1,8 +1,11 @@
 from sqlalchemy.orm import Session
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import and_, or_, select
+from sqlalchemy import and_, exists, or_, select
 from math import radians, cos, sin, asin, sqrt
+from typing import Iterable, Optional, Set
 from app.models import User, Follow
+from app.services.event_bus import event_bus
+from app.services.follow_graph import follow_graph
 
 
 """Friends helpers removed; using follows instead."""
@@ -37,23 +40,96 @@ async def _check_visibility_access(db: AsyncSession, owner_user_id: int, viewer_
     Returns:
         True if the viewer can see the content, False otherwise
     """
-    if visibility == "public":
-        return True
-    elif visibility == "private":
-        return owner_user_id == viewer_user_id
-    elif visibility == "followers":
-        # viewer must follow owner
-        if owner_user_id == viewer_user_id:
-            return True
+    if visibility == "followers" and owner_user_id != viewer_user_id:
+        # viewer must follow owner; a point query unless the graph is cached
+        # and kept current on every node
+        followee_ids = (follow_graph.cached_following(viewer_user_id)
+                        if event_bus.is_distributed else None)
+        if followee_ids is not None:
+            return owner_user_id in followee_ids
         result = await db.execute(
             select(Follow).where(Follow.follower_id == viewer_user_id,
                                  Follow.followee_id == owner_user_id)
         )
         return result.scalar_one_or_none() is not None
+    return _visibility_allows(owner_user_id, viewer_user_id, visibility, False)
+
+
+def _visibility_allows(owner_user_id: int, viewer_user_id: int, visibility: Optional[str], follows_owner: bool) -> bool:
+    """Visibility decision once it is known whether the viewer follows the owner."""
+    if visibility == "public":
+        return True
+    elif visibility == "private":
+        return owner_user_id == viewer_user_id
+    elif visibility == "followers":
+        return owner_user_id == viewer_user_id or follows_owner
     else:
         return False  # Unknown visibility level
 
 
+class PrivacyEngine:
+    """
+    Evaluates visibility for many items owned by different users.
+
+    The viewer's follow edges to the owners come from one query, or from the
+    follow graph cache when it is kept current on every node, so checking N
+    items costs at most a single round trip instead of one per
+    followers-only item.
+
+    Usage:
+        engine = await PrivacyEngine.load(db, viewer_id, {c.user_id for c in checkins})
+        visible = [c for c in checkins if engine.can_view(c.user_id, c.visibility)]
+    """
+
+    def __init__(self, viewer_user_id: int, followed_owner_ids: Set[int]):
+        self.viewer_user_id = viewer_user_id
+        self.followed_owner_ids = followed_owner_ids
+
+    @classmethod
+    async def load(cls, db: AsyncSession, viewer_user_id: int, owner_user_ids: Iterable[int]) -> "PrivacyEngine":
+        owner_ids = {oid for oid in owner_user_ids if oid != viewer_user_id}
+        followed: Set[int] = set()
+        if owner_ids:
+            followed = await follow_graph.followed_among(db, viewer_user_id, owner_ids)
+        return cls(viewer_user_id, followed)
+
+    def can_view(self, owner_user_id: int, visibility: Optional[str]) -> bool:
+        return _visibility_allows(
+            owner_user_id,
+            self.viewer_user_id,
+            visibility,
+            owner_user_id in self.followed_owner_ids,
+        )
+
+
+def visible_to_viewer_clause(owner_column, visibility_column, viewer_user_id: int):
+    """
+    SQL condition matching rows the viewer may see, so visibility filtering
+    and pagination can both happen in the database.
+
+    Mirrors ``_check_visibility_access``: public rows are visible to everyone,
+    private and followers rows to their owner, and followers rows to users
+    following the owner.
+
+    Args:
+        owner_column: Column holding the owner's user id (e.g. CheckIn.user_id)
+        visibility_column: Column holding the visibility level
+        viewer_user_id: ID of the user trying to view the rows
+    """
+    follows_owner = exists().where(
+        Follow.follower_id == viewer_user_id,
+        Follow.followee_id == owner_column,
+    )
+    return or_(
+        visibility_column == "public",
+        and_(
+            visibility_column.in_(("private", "followers")),
+            owner_column == viewer_user_id,
+        ),
+        and_(visibility_column == "followers", follows_owner),
+    )
+
+
 async def can_view_profile(db: AsyncSession, profile_user: User, viewer_user_id: int) -> bool:
     """
     Check if a user can view another user's profile.
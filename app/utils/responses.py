@@ -0,0 +1,18 @@
+"""Fast JSON response class built on pydantic-core."""
+from typing import Any
+
+import pydantic_core
+from fastapi.responses import JSONResponse
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encoded by pydantic-core instead of the stdlib json module.
+
+    Accepts everything JSONResponse does, plus Pydantic models, datetimes and
+    UUIDs, which are encoded natively without a jsonable_encoder pass. Output
+    is compact UTF-8 like JSONResponse; datetimes use Pydantic's ISO format
+    and NaN/infinity become null, as in Pydantic's JSON mode.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return pydantic_core.to_json(content, inf_nan_mode="null")
@@ -262,6 +262,7 @@ resource "aws_ecs_task_definition" "app" {
       environment = [
         { name = "APP_DEBUG", value = "true" },
         { name = "APP_USE_POSTGIS", value = "true" },
+        { name = "APP_EVENT_BUS_BACKEND", value = "postgres" },
         { name = "APP_STORAGE_BACKEND", value = "s3" },
         { name = "S3_BUCKET", value = aws_s3_bucket.media.bucket },
         { name = "S3_REGION", value = var.aws_region },
@@ -1,33 +1,52 @@
+import argparse
 import asyncio
-from sqlalchemy import select, update
+from sqlalchemy import or_, select
 from app.database import AsyncSessionLocal
 from app.models import Place
+from app.services.reverse_geocoder import fill_place_location
 
 
-async def backfill_riyadh_city() -> int:
+async def backfill_locations(batch_size: int = 1000) -> int:
+    """Fill missing country/city/neighborhood from the bundled boundaries.
+
+    Lookups are local, so this walks every place with coordinates and a gap
+    in one pass, committing per batch.
+    """
+    updated = 0
+    last_id = 0
     async with AsyncSessionLocal() as session:
-        # Update rows with null/empty city within Riyadh bounding box
-        stmt = (
-            update(Place)
-            .where(
-                (Place.city.is_(None) | (Place.city == ""))
-                & (Place.latitude.isnot(None))
-                & (Place.longitude.isnot(None))
-                & (Place.latitude.between(24.3, 25.2))
-                & (Place.longitude.between(46.2, 47.3))
-            )
-            .values(city="Riyadh")
-            .execution_options(synchronize_session=False)
-        )
-        result = await session.execute(stmt)
-        await session.commit()
-        return result.rowcount or 0
+        while True:
+            places = (await session.execute(
+                select(Place)
+                .where(
+                    Place.id > last_id,
+                    Place.latitude.isnot(None),
+                    Place.longitude.isnot(None),
+                    or_(
+                        Place.city.is_(None), Place.city == "",
+                        Place.country.is_(None), Place.country == "",
+                        Place.neighborhood.is_(None), Place.neighborhood == "",
+                    ),
+                )
+                .order_by(Place.id)
+                .limit(batch_size)
+            )).scalars().all()
+            if not places:
+                break
+            updated += sum(1 for place in places if fill_place_location(place))
+            last_id = places[-1].id
+            await session.commit()
+    return updated
 
 
-async def main():
-    updated = await backfill_riyadh_city()
-    print(f"Backfilled city='Riyadh' for {updated} places")
+async def main(batch_size: int):
+    updated = await backfill_locations(batch_size)
+    print(f"Backfilled country/city/neighborhood for {updated} places")
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(
+        description="Fill missing place locations from bundled boundaries")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size))
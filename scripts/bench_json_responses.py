@@ -0,0 +1,129 @@
+"""
+Benchmark JSON encoding of our largest responses.
+
+Compares the stdlib JSONResponse path with FastJSONResponse for a page of
+100 places (PaginatedPlaces) and 200 DM messages (PaginatedDMMessages):
+
+* encode: the encoding step alone (jsonable_encoder + json.dumps versus
+  pydantic-core on the model)
+* endpoint: a full request through a FastAPI app with response_model set,
+  using the default response class, FastJSONResponse as the app default,
+  and an endpoint that returns FastJSONResponse(model) directly
+
+Usage: python -m scripts.bench_json_responses [--iterations 200]
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import httpx
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.schemas import DMMessageResponse, PaginatedDMMessages, PaginatedPlaces, PlaceResponse
+from app.utils import FastJSONResponse
+
+
+def build_places(count: int = 100) -> PaginatedPlaces:
+    now = datetime.now(timezone.utc)
+    items = [
+        PlaceResponse(
+            id=i,
+            name=f"Place {i}",
+            address=f"{i} King Fahd Road",
+            city="Riyadh",
+            neighborhood="Al Olaya",
+            latitude=24.7136 + i / 1000,
+            longitude=46.6753 + i / 1000,
+            categories="cafe,coffee",
+            rating=4.2,
+            created_at=now,
+            photo_url=f"https://cdn.example.com/places/{i}/primary.jpg",
+            recent_checkins_count=i % 7,
+            distance_meters=12.5 * i,
+            primary_category="Cafe",
+            category_icons=[{"prefix": "https://ss3.4sqi.net/img/", "suffix": ".png"}],
+            photo_urls=[f"https://cdn.example.com/places/{i}/{n}.jpg" for n in range(5)],
+            additional_photos=[f"https://cdn.example.com/places/{i}/{n}.jpg" for n in range(1, 5)],
+        )
+        for i in range(count)
+    ]
+    return PaginatedPlaces(items=items, total=count, limit=count, offset=0)
+
+
+def build_messages(count: int = 200) -> PaginatedDMMessages:
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    items = [
+        DMMessageResponse(
+            id=i,
+            thread_id=1,
+            sender_id=1 + i % 2,
+            text=f"Message number {i} with a little bit of text",
+            created_at=start + timedelta(seconds=i),
+            seen=i % 3 == 0,
+            photo_urls=[],
+        )
+        for i in range(count)
+    ]
+    return PaginatedDMMessages(items=items, total=None, limit=count, offset=0,
+                               has_more=True, next_cursor="abc")
+
+
+def bench(fn, iterations: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def build_app(model, response_class=None, direct: bool = False) -> FastAPI:
+    app = FastAPI(default_response_class=response_class or JSONResponse)
+    model_type = type(model)
+
+    if direct:
+        @app.get("/payload", response_model=model_type)
+        async def payload_direct():
+            return FastJSONResponse(model)
+    else:
+        @app.get("/payload", response_model=model_type)
+        async def payload():
+            return model
+
+    return app
+
+
+async def bench_endpoint(app: FastAPI, iterations: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.get("/payload")
+        start = time.perf_counter()
+        for _ in range(iterations):
+            await client.get("/payload")
+        return (time.perf_counter() - start) / iterations * 1000
+
+
+async def main(iterations: int) -> None:
+    for label, model in (("PaginatedPlaces x100", build_places()),
+                         ("PaginatedDMMessages x200", build_messages())):
+        print(f"\n{label} ({len(FastJSONResponse(model).body)} bytes)")
+
+        before = bench(lambda: JSONResponse(jsonable_encoder(model)), iterations)
+        after = bench(lambda: FastJSONResponse(model), iterations)
+        print(f"  encode   stdlib {before:7.3f} ms   pydantic-core {after:7.3f} ms"
+              f"   ({before / after:.1f}x)")
+
+        default = await bench_endpoint(build_app(model), iterations)
+        fast = await bench_endpoint(build_app(model, FastJSONResponse), iterations)
+        direct = await bench_endpoint(build_app(model, FastJSONResponse, direct=True), iterations)
+        print(f"  endpoint JSONResponse {default:7.3f} ms   FastJSONResponse {fast:7.3f} ms"
+              f"   returned directly {direct:7.3f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations))
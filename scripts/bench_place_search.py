@@ -0,0 +1,127 @@
+"""
+Benchmark place text search with and without trigram indexes.
+
+Builds a scratch ``bench_places`` table on the configured PostgreSQL
+database (APP_DATABASE_URL) with synthetic names, categories, addresses and
+cities, then times the search query used by /places/search (ILIKE '%q%'
+over four columns, ranked by match type and similarity) before and after
+creating the pg_trgm GIN indexes from the search migration. The scratch
+table is dropped at the end; real tables are not touched.
+
+Usage: python -m scripts.bench_place_search [--rows 1000000] [--iterations 5]
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config import settings
+
+TABLE = "bench_places"
+COLUMNS = ("name", "categories", "address", "city")
+QUERIES = ("coffee", "al olaya", "burger 12", "xyzzy")
+
+WORDS = ("coffee", "burger", "shawarma", "bakery", "tea", "grill", "pizza",
+         "juice", "sushi", "falafel", "kabsa", "dessert", "lounge", "bistro")
+CATEGORIES = ("cafe,coffee", "restaurant,burger", "restaurant,arabic",
+              "bakery,dessert", "juice bar", "restaurant,asian")
+CITIES = ("Riyadh", "Jeddah", "Dammam", "Mecca", "Medina", "Khobar", "Abha")
+STREETS = ("King Fahd Road", "Al Olaya Street", "Tahlia Street",
+           "Prince Sultan Road", "Al Takhassusi Street")
+
+
+def _array(values) -> str:
+    return "ARRAY[" + ", ".join(f"'{v}'" for v in values) + "]"
+
+
+SEARCH_SQL = f"""
+    SELECT id FROM {TABLE}
+    WHERE {" OR ".join(f"{c} ILIKE :pattern" for c in COLUMNS)}
+    ORDER BY
+        CASE
+            WHEN {" OR ".join(f"lower({c}) = lower(:q)" for c in COLUMNS)} THEN 3
+            WHEN {" OR ".join(f"{c} ILIKE :prefix" for c in COLUMNS)} THEN 2
+            WHEN {" OR ".join(f"{c} ILIKE :word" for c in COLUMNS)} THEN 1
+            ELSE 0
+        END DESC,
+        greatest({", ".join(f"similarity(coalesce({c}, ''), :q)" for c in COLUMNS)}) DESC,
+        id DESC
+    LIMIT 20
+"""
+
+
+async def populate(conn, rows: int) -> None:
+    await conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+    await conn.execute(text(f"""
+        CREATE TABLE {TABLE} (
+            id SERIAL PRIMARY KEY,
+            name VARCHAR, categories VARCHAR, address VARCHAR, city VARCHAR
+        )
+    """))
+    await conn.execute(text(f"""
+        INSERT INTO {TABLE} (name, categories, address, city)
+        SELECT
+            initcap(({_array(WORDS)})[1 + (i * 7) % {len(WORDS)}]) || ' ' ||
+                ({_array(WORDS)})[1 + (i * 13) % {len(WORDS)}] || ' ' || i,
+            ({_array(CATEGORIES)})[1 + i % {len(CATEGORIES)}],
+            (i % 900 + 1) || ' ' || ({_array(STREETS)})[1 + i % {len(STREETS)}],
+            ({_array(CITIES)})[1 + (i * 3) % {len(CITIES)}]
+        FROM generate_series(1, :rows) AS s(i)
+    """), {"rows": rows})
+    await conn.execute(text(f"ANALYZE {TABLE}"))
+
+
+async def time_queries(conn, iterations: int) -> dict:
+    timings = {}
+    for q in QUERIES:
+        params = {"q": q, "pattern": f"%{q}%", "prefix": f"{q}%", "word": f"% {q}%"}
+        await conn.execute(text(SEARCH_SQL), params)
+        start = time.perf_counter()
+        for _ in range(iterations):
+            await conn.execute(text(SEARCH_SQL), params)
+        timings[q] = (time.perf_counter() - start) / iterations * 1000
+    return timings
+
+
+async def main(rows: int, iterations: int) -> None:
+    if not settings.database_url.startswith("postgresql"):
+        raise SystemExit("This benchmark needs PostgreSQL (set APP_DATABASE_URL)")
+
+    engine = create_async_engine(settings.database_url)
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            start = time.perf_counter()
+            await populate(conn, rows)
+            print(f"Loaded {rows:,} rows in {time.perf_counter() - start:.1f} s")
+
+            before = await time_queries(conn, iterations)
+
+            start = time.perf_counter()
+            for column in COLUMNS:
+                await conn.execute(text(
+                    f"CREATE INDEX {TABLE}_{column}_trgm ON {TABLE} "
+                    f"USING gin ({column} gin_trgm_ops)"))
+            await conn.execute(text(f"ANALYZE {TABLE}"))
+            print(f"Built trigram indexes in {time.perf_counter() - start:.1f} s\n")
+
+            after = await time_queries(conn, iterations)
+
+            print(f"{'query':<12} {'seq scan':>12} {'trigram':>12}")
+            for q in QUERIES:
+                print(f"{q:<12} {before[q]:>9.1f} ms {after[q]:>9.1f} ms"
+                      f"   ({before[q] / after[q]:.0f}x)")
+
+            await conn.execute(text(f"DROP TABLE {TABLE}"))
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--iterations", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.iterations))
@@ -0,0 +1,134 @@
+"""
+Rebuild the bundled reverse-geocoding boundaries (app/data/boundaries.json).
+
+Takes one GeoJSON FeatureCollection per level (country, city, neighborhood),
+for example administrative boundary exports from OpenStreetMap or
+geoBoundaries, simplifies each polygon with Douglas-Peucker and rounds the
+coordinates so the bundled file stays small.
+
+Usage: python -m scripts.build_boundaries --layer country=countries.geojson
+           --layer city=cities.geojson --layer neighborhood=districts.geojson
+           [--name-property name] [--country-property ISO3166-1]
+           [--tolerance 0.001] [--output app/data/boundaries.json]
+"""
+import argparse
+import json
+from datetime import datetime, timezone
+from typing import List, Optional, Sequence, Tuple
+
+from app.services.reverse_geocoder import DEFAULT_PATH, FORMAT_VERSION, LEVELS
+
+COORD_DECIMALS = 5  # about 1 m
+
+Point = Tuple[float, float]
+
+
+def _distance_to_segment(p: Point, a: Point, b: Point) -> float:
+    (x, y), (x1, y1), (x2, y2) = p, a, b
+    dx, dy = x2 - x1, y2 - y1
+    if dx == 0 and dy == 0:
+        return ((x - x1) ** 2 + (y - y1) ** 2) ** 0.5
+    t = max(0.0, min(1.0, ((x - x1) * dx + (y - y1) * dy) / (dx * dx + dy * dy)))
+    return ((x - x1 - t * dx) ** 2 + (y - y1 - t * dy) ** 2) ** 0.5
+
+
+def simplify(points: Sequence[Point], tolerance: float) -> List[Point]:
+    """Douglas-Peucker, iterative so large rings don't hit the recursion limit."""
+    if len(points) < 3:
+        return list(points)
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        start, end = stack.pop()
+        farthest, index = 0.0, None
+        for i in range(start + 1, end):
+            distance = _distance_to_segment(points[i], points[start], points[end])
+            if distance > farthest:
+                farthest, index = distance, i
+        if index is not None and farthest > tolerance:
+            keep[index] = True
+            stack.extend(((start, index), (index, end)))
+    return [point for point, kept in zip(points, keep) if kept]
+
+
+def _simplify_ring(ring: Sequence[Sequence[float]], tolerance: float) -> Optional[list]:
+    points = [(round(x, COORD_DECIMALS), round(y, COORD_DECIMALS)) for x, y, *_ in ring]
+    if len(points) > 1 and points[0] == points[-1]:
+        points = points[:-1]
+    points = simplify(points + [points[0]], tolerance)[:-1]
+    return [list(p) for p in points] if len(points) >= 3 else None
+
+
+def convert_feature(feature: dict, level: str, name_property: str,
+                    country_property: str, tolerance: float) -> Optional[dict]:
+    geometry = feature.get("geometry") or {}
+    properties = feature.get("properties") or {}
+    name = properties.get(name_property)
+    if not name:
+        return None
+    if geometry.get("type") == "Polygon":
+        raw_polygons = [geometry["coordinates"]]
+    elif geometry.get("type") == "MultiPolygon":
+        raw_polygons = geometry["coordinates"]
+    else:
+        return None
+
+    polygons = []
+    for raw in raw_polygons:
+        outer = _simplify_ring(raw[0], tolerance)
+        if outer is None:
+            continue
+        holes = [h for h in (_simplify_ring(r, tolerance) for r in raw[1:]) if h]
+        polygons.append([outer] + holes)
+    if not polygons:
+        return None
+    return {"level": level, "name": name,
+            "country": properties.get(country_property), "polygons": polygons}
+
+
+def build(layers: List[Tuple[str, str]], name_property: str,
+          country_property: str, tolerance: float) -> dict:
+    features = []
+    for level, path in layers:
+        with open(path, encoding="utf-8") as f:
+            collection = json.load(f)
+        for feature in collection.get("features", []):
+            converted = convert_feature(feature, level, name_property,
+                                        country_property, tolerance)
+            if converted is not None:
+                features.append(converted)
+    return {
+        "format": FORMAT_VERSION,
+        "source": f"GeoJSON boundaries ({datetime.now(timezone.utc).date().isoformat()})",
+        "features": features,
+    }
+
+
+def _layer(value: str) -> Tuple[str, str]:
+    level, _, path = value.partition("=")
+    if level not in LEVELS or not path:
+        raise argparse.ArgumentTypeError(f"expected LEVEL=PATH with LEVEL in {LEVELS}")
+    return level, path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--layer", type=_layer, action="append", required=True,
+                        help="LEVEL=PATH to a GeoJSON FeatureCollection (repeatable)")
+    parser.add_argument("--name-property", default="name")
+    parser.add_argument("--country-property", default="ISO3166-1",
+                        help="Feature property holding the 2-letter country code")
+    parser.add_argument("--tolerance", type=float, default=0.001,
+                        help="Simplification tolerance in degrees (0.001 is about 100 m)")
+    parser.add_argument("--output", default=str(DEFAULT_PATH))
+    args = parser.parse_args()
+
+    data = build(args.layer, args.name_property, args.country_property, args.tolerance)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    print(f"Wrote {len(data['features'])} boundaries to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Build the offline gazetteer (app/data/gazetteer.json) from a GeoNames dump.
+
+Reads GeoNames country extracts (``SA.zip``, ``AE.txt``, ... or
+``allCountries.zip``) plus ``admin1CodesASCII.txt`` for region names, from
+local paths or URLs. By default it downloads the extracts for the countries
+in app/data/popular_cities.json from download.geonames.org. Populated places
+become cities (above --min-population) and sections of populated places
+(feature code PPLX) become neighborhoods. The Dockerfile runs this with the defaults and
+points APP_GAZETTEER_PATH at the output.
+
+Usage: python -m scripts.build_gazetteer [--dump SA.zip ...] [--admin1 FILE]
+           [--min-population 5000] [--output app/data/gazetteer.json]
+"""
+import argparse
+import io
+import json
+import urllib.request
+import zipfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+from app.services.gazetteer import DEFAULT_PATH, FORMAT_VERSION
+
+GEONAMES_DUMP_URL = "https://download.geonames.org/export/dump/"
+POPULAR_CITIES = Path(__file__).resolve().parent.parent / "app" / "data" / "popular_cities.json"
+
+CITY_CODES = {"PPL", "PPLA", "PPLA2", "PPLA3", "PPLA4", "PPLC", "PPLG"}
+NEIGHBORHOOD_CODE = "PPLX"
+COORD_DECIMALS = 4  # about 11 m
+
+
+def _read(source: str) -> bytes:
+    if source.startswith(("http://", "https://")):
+        print(f"Downloading {source}")
+        with urllib.request.urlopen(source, timeout=120) as response:
+            return response.read()
+    return Path(source).read_bytes()
+
+
+def _lines(source: str) -> Iterator[str]:
+    data = _read(source)
+    if source.endswith(".zip"):
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            name = next(n for n in archive.namelist() if n.endswith(".txt") and n != "readme.txt")
+            data = archive.read(name)
+    yield from io.TextIOWrapper(io.BytesIO(data), encoding="utf-8")
+
+
+def default_dumps() -> List[str]:
+    with open(POPULAR_CITIES, encoding="utf-8") as f:
+        countries = sorted({c["country"] for c in json.load(f)["popular_cities"]})
+    return [f"{GEONAMES_DUMP_URL}{country}.zip" for country in countries]
+
+
+def load_regions(source: str) -> Dict[str, str]:
+    regions = {}
+    for line in _lines(source):
+        fields = line.rstrip("\n").split("\t")
+        if len(fields) >= 2:
+            regions[fields[0]] = fields[1]
+    return regions
+
+
+def build(dumps: List[str], admin1: str, min_population: int) -> dict:
+    region_names = load_regions(admin1)
+    regions: List[str] = []
+    region_index: Dict[str, int] = {}
+    cities, neighborhoods = [], []
+
+    for dump in dumps:
+        for line in _lines(dump):
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) < 15 or fields[6] != "P":
+                continue
+            name, code, country = fields[1], fields[7], fields[8]
+            lat = round(float(fields[4]), COORD_DECIMALS)
+            lng = round(float(fields[5]), COORD_DECIMALS)
+            population = int(fields[14] or 0)
+            if code == NEIGHBORHOOD_CODE:
+                neighborhoods.append([name, country, population, lat, lng])
+            elif code in CITY_CODES and population >= min_population:
+                region = region_names.get(f"{country}.{fields[10]}")
+                if region is not None and region not in region_index:
+                    region_index[region] = len(regions)
+                    regions.append(region)
+                cities.append([name, country, region_index.get(region), population, lat, lng])
+
+    # Preindexed for the loader: cities by country, largest first;
+    # neighborhoods by latitude for band lookups.
+    cities.sort(key=lambda c: (c[1], -c[3], c[0]))
+    neighborhoods.sort(key=lambda n: (n[3], n[4]))
+    return {
+        "format": FORMAT_VERSION,
+        "source": f"GeoNames ({datetime.now(timezone.utc).date().isoformat()})",
+        "regions": regions,
+        "cities": cities,
+        "neighborhoods": neighborhoods,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--dump", action="append", default=None,
+                        help="GeoNames extract path or URL (repeatable)")
+    parser.add_argument("--admin1", default=f"{GEONAMES_DUMP_URL}admin1CodesASCII.txt",
+                        help="admin1CodesASCII.txt path or URL")
+    parser.add_argument("--min-population", type=int, default=5000)
+    parser.add_argument("--output", default=str(DEFAULT_PATH))
+    args = parser.parse_args()
+
+    data = build(args.dump or default_dumps(), args.admin1, args.min_population)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    print(f"Wrote {len(data['cities'])} cities and {len(data['neighborhoods'])} "
+          f"neighborhoods to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ Populates missing data like photos, amenities, and other details from OSM
 
 from app.config import settings
 from app.services.place_data_service_v2 import enhanced_place_data_service
+from app.services.reverse_geocoder import fill_place_location
 from app.models import Place
 from app.database import get_db
 import sys
@@ -506,6 +507,10 @@ class OSMDataPopulator:
         """Update place with OSM data"""
         updated = False
 
+        # Fill missing country/city/neighborhood from bundled boundaries
+        if fill_place_location(place):
+            updated = True
+
         # Update basic fields
         if 'website' in osm_data and not place.website:
             place.website = osm_data['website']
@@ -0,0 +1,20 @@
+import argparse
+import asyncio
+
+from app.database import AsyncSessionLocal
+from app.services.dm_unread_service import repair_unread_counts
+
+
+async def main(user_id: int | None):
+    async with AsyncSessionLocal() as session:
+        repaired = await repair_unread_counts(session, user_id=user_id)
+    print(f"Repaired unread_count on {repaired} participant states")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Recompute DM unread counters from last_read_at")
+    parser.add_argument("--user-id", type=int, default=None,
+                        help="Only repair counters for this user")
+    args = parser.parse_args()
+    asyncio.run(main(args.user_id))
@@ -0,0 +1,20 @@
+import argparse
+import asyncio
+
+from app.database import AsyncSessionLocal
+from app.services.user_counters import repair_user_counters
+
+
+async def main(user_id: int | None):
+    async with AsyncSessionLocal() as session:
+        repaired = await repair_user_counters(session, user_id=user_id)
+    print(f"Repaired profile counters on {repaired} users")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Recompute follower, following and check-in counters")
+    parser.add_argument("--user-id", type=int, default=None,
+                        help="Only repair counters for this user")
+    args = parser.parse_args()
+    asyncio.run(main(args.user_id))
@@ -1,3 +1,4 @@
+import itertools
 import os
 import sys
 from pathlib import Path
@@ -20,6 +21,8 @@ if str(project_root) not in sys.path:
 _test_db_path = project_root / "test.db"
 os.environ["APP_DATABASE_URL"] = f"sqlite+aiosqlite:///{_test_db_path.as_posix()}"
 os.environ["APP_DEBUG"] = "false"
+# Lookups read a small hand-made gazetteer instead of a GeoNames build
+os.environ["APP_GAZETTEER_PATH"] = str(project_root / "tests" / "data" / "gazetteer_seed.json")
 
 # Start each test session from a clean database file
 if _test_db_path.exists():
@@ -59,11 +62,64 @@ async def test_session(setup_database):
         await _clear_database(session)
 
 
+@pytest_asyncio.fixture
+async def create_users(test_session):
+    """Factory that inserts ``count`` verified users and returns their ids."""
+    from app.models import User
+
+    numbers = itertools.count(1)
+
+    async def _create_users(count):
+        users = []
+        for _ in range(count):
+            n = next(numbers)
+            users.append(User(phone=f"+1555009{n:04d}", username=f"test_user_{n}",
+                              name=f"Test User {n}", is_verified=True))
+        test_session.add_all(users)
+        await test_session.commit()
+        return [user.id for user in users]
+
+    return _create_users
+
+
+@pytest.fixture
+def auth_headers():
+    """Build bearer-token headers for a user id."""
+    from app.services.jwt_service import JWTService
+
+    def _headers(user_id):
+        return {"Authorization": f"Bearer {JWTService.create_token(user_id)}"}
+
+    return _headers
+
+
 @pytest_asyncio.fixture(autouse=True)
 async def clean_database_after_test(setup_database):
     """Clean up any data created via API calls after each test."""
     yield
     from app.database import AsyncSessionLocal
+    from app.services.place_chat_buffer import place_chat_buffer
+    from app.services.place_chat_room_state import place_chat_room_state
+    from app.services.presence_index import presence_index
+    from app.services.place_detail_cache import place_detail_cache
+    from app.response_cache import response_cache
+    from app.services.follow_graph import follow_graph
+    from app.services.autocomplete_index import autocomplete_index
+    from app.services.lookup_dictionary import lookup_dictionary
+    from app.services.collection_covers import collection_cover_cache
+    from app.services.place_stats import place_stats_cache
+    from app.routers.lookups import geonames_cache
 
     async with AsyncSessionLocal() as session:
         await _clear_database(session)
+    place_chat_buffer.clear()
+    place_chat_room_state.clear()
+    presence_index.clear()
+    place_detail_cache.clear()
+    response_cache.clear()
+    follow_graph.clear()
+    autocomplete_index.clear()
+    lookup_dictionary.clear()
+    collection_cover_cache.clear()
+    place_stats_cache.clear()
+    geonames_cache.clear()
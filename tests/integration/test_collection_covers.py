@@ -0,0 +1,90 @@
+"""Integration tests for batched collection cover photos."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from sqlalchemy import event
+
+from app.database import engine
+from app.main import app
+from app.models import CheckIn, CheckInPhoto, Place, User, UserCollection, UserCollectionPlace
+from app.services.jwt_service import JWTService
+
+
+@pytest.mark.asyncio
+async def test_collection_covers_fetched_in_one_query_and_refreshed(test_session):
+    """Test covers for a page of collections cost one query, are cached, and
+    are dropped when a collection gains a place."""
+    owner = User(phone="+15550014001", username="curator", name="Curator", is_verified=True)
+    other = User(phone="+15550014002", username="visitor", name="Visitor", is_verified=True)
+    test_session.add_all([owner, other])
+    await test_session.flush()
+
+    now = datetime.now(timezone.utc)
+    collections = []
+    for i in range(5):
+        place = Place(name=f"Spot {i}", city="Riyadh")
+        collection = UserCollection(user_id=owner.id, name=f"List {i}", visibility="public")
+        test_session.add_all([place, collection])
+        await test_session.flush()
+        test_session.add(UserCollectionPlace(collection_id=collection.id, place_id=place.id))
+        for author in (owner, other):
+            check_in = CheckIn(user_id=author.id, place_id=place.id, expires_at=now + timedelta(hours=1))
+            test_session.add(check_in)
+            await test_session.flush()
+            for n in range(4):
+                test_session.add(CheckInPhoto(
+                    check_in_id=check_in.id, url=f"https://cdn.test/{author.username}/{i}/{n}.jpg",
+                    created_at=now - timedelta(minutes=10 * n)))
+        collections.append(collection)
+    late_place = Place(name="Late Spot", city="Riyadh")
+    test_session.add(late_place)
+    await test_session.flush()
+    late_check_in = CheckIn(user_id=owner.id, place_id=late_place.id, expires_at=now + timedelta(hours=1))
+    test_session.add(late_check_in)
+    await test_session.flush()
+    test_session.add(CheckInPhoto(check_in_id=late_check_in.id,
+                                  url="https://cdn.test/late.jpg", created_at=now + timedelta(minutes=1)))
+    await test_session.commit()
+
+    photo_queries = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if "check_in_photos" in statement:
+            photo_queries.append(statement)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        event.listen(engine.sync_engine, "before_cursor_execute", record)
+        try:
+            viewed = await client.get(
+                f"/users/{owner.id}/collections",
+                headers={"Authorization": f"Bearer {JWTService.create_token(other.id)}"})
+            queries_first = len(photo_queries)
+            await client.get(
+                f"/users/{owner.id}/collections",
+                headers={"Authorization": f"Bearer {JWTService.create_token(other.id)}"})
+            queries_cached = len(photo_queries) - queries_first
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+        assert queries_first == 1
+        assert queries_cached == 0
+        by_name = {c["name"]: c for c in viewed.json()}
+        # Owner's own check-in photos only, newest first
+        assert by_name["List 2"]["photos"] == [
+            f"https://cdn.test/curator/2/{n}.jpg" for n in range(3)]
+
+        test_session.add(UserCollectionPlace(collection_id=collections[2].id, place_id=late_place.id))
+        await test_session.commit()
+        # The collections.changed event is dispatched after the commit
+        await asyncio.sleep(0)
+        refreshed = await client.get(
+            f"/users/{owner.id}/collections",
+            headers={"Authorization": f"Bearer {JWTService.create_token(other.id)}"})
+
+    by_name = {c["name"]: c for c in refreshed.json()}
+    assert by_name["List 2"]["photos"][0] == "https://cdn.test/late.jpg"
+    assert by_name["List 1"]["photos"][0] == "https://cdn.test/curator/1/0.jpg"
@@ -0,0 +1,99 @@
+"""Integration tests for batched per-place stats on collection items."""
+
+import re
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from sqlalchemy import event
+
+from app.database import engine
+from app.main import app
+from app.models import CheckIn, CheckInPhoto, Place, User, UserCollection, UserCollectionPlace
+from app.services.jwt_service import JWTService
+from app.services.place_stats import _on_presence_change, checkin_totals, place_stats_cache
+
+
+@pytest.mark.asyncio
+async def test_collection_items_query_count_independent_of_page_size(test_session):
+    """Test check-in counts and photos for a page cost the same queries for
+    3 items as for 12, and come from the stats cache on the next request."""
+    owner = User(phone="+15550015001", username="keeper", name="Keeper", is_verified=True)
+    test_session.add(owner)
+    await test_session.flush()
+    collection = UserCollection(user_id=owner.id, name="Saved", visibility="public")
+    test_session.add(collection)
+    await test_session.flush()
+
+    now = datetime.now(timezone.utc)
+    for i in range(12):
+        place = Place(name=f"Spot {i}", city="Riyadh",
+                      photo_url=f"https://cdn.test/place/{i}.jpg")
+        test_session.add(place)
+        await test_session.flush()
+        test_session.add(UserCollectionPlace(
+            collection_id=collection.id, place_id=place.id, added_at=now - timedelta(minutes=i)))
+        for n in range(i % 3):
+            check_in = CheckIn(user_id=owner.id, place_id=place.id,
+                               expires_at=now + timedelta(hours=1))
+            test_session.add(check_in)
+            await test_session.flush()
+            test_session.add(CheckInPhoto(check_in_id=check_in.id,
+                                          url=f"https://cdn.test/{i}/{n}.jpg",
+                                          created_at=now - timedelta(minutes=n)))
+    await test_session.commit()
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    headers = {"Authorization": f"Bearer {JWTService.create_token(owner.id)}"}
+    url = f"/collections/{collection.id}/items"
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        counts = {}
+        event.listen(engine.sync_engine, "before_cursor_execute", record)
+        try:
+            for limit in (3, 12):
+                statements.clear()
+                body = (await client.get(url, params={"limit": limit}, headers=headers)).json()
+                counts[limit] = len(statements)
+            statements.clear()
+            await client.get(url, params={"limit": 12}, headers=headers)
+            cached_stats_queries = [s for s in statements if re.search(r"\bcheck_ins\b", s)]
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+    assert counts[3] == counts[12]
+    assert cached_stats_queries == []
+    items = {item["place_name"]: item for item in body["items"]}
+    assert len(items) == 12
+    assert items["Spot 2"]["checkin_count"] == 2
+    assert items["Spot 2"]["user_checkin_photos"] == [
+        "https://cdn.test/2/0.jpg", "https://cdn.test/2/1.jpg"]
+    assert items["Spot 3"]["checkin_count"] == 0
+    assert items["Spot 3"]["photo_urls"] == ["https://cdn.test/place/3.jpg"]
+
+
+@pytest.mark.asyncio
+async def test_stats_load_raced_by_check_in_is_not_cached(test_session, create_users):
+    """Test a stat loaded while a check-in event invalidates its place is not cached."""
+    [user_id] = await create_users(1)
+    place = Place(name="Racing Spot", city="Riyadh")
+    test_session.add(place)
+    await test_session.flush()
+    test_session.add(CheckIn(user_id=user_id, place_id=place.id,
+                             expires_at=datetime.now(timezone.utc) + timedelta(hours=1)))
+    await test_session.commit()
+
+    class RacingSession:
+        async def execute(self, statement):
+            result = await test_session.execute(statement)
+            _on_presence_change({"op": "add", "place_id": place.id})
+            return result
+
+    assert await checkin_totals(RacingSession(), [place.id]) == {place.id: 1}
+    assert place_stats_cache.get(place.id) is None
+    assert await checkin_totals(test_session, [place.id]) == {place.id: 1}
+    assert place_stats_cache.get(place.id) == {"checkin_total": 1}
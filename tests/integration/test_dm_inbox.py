@@ -0,0 +1,79 @@
+"""Integration tests for the DM inbox endpoint."""
+
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from sqlalchemy import event
+
+from app.database import engine
+from app.main import app
+from app.models import DMMessage, DMParticipantState, DMThread, User
+from app.services.dm_unread_service import repair_unread_counts
+from app.services.jwt_service import JWTService
+
+
+@pytest.mark.asyncio
+async def test_inbox_includes_last_message_and_unread_count(test_session):
+    """Test inbox rows carry the last message, unread count and other user in one query."""
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    me = User(phone="+15550002000", username="inbox_me", name="Me", is_verified=True)
+    others = [
+        User(phone=f"+1555000210{i}", username=f"inbox_friend_{i}", name=f"Friend {i}", is_verified=True)
+        for i in range(3)
+    ]
+    test_session.add_all([me, *others])
+    await test_session.flush()
+
+    for i, other in enumerate(others):
+        thread = DMThread(user_a_id=me.id, user_b_id=other.id, initiator_id=me.id,
+                          status="accepted", updated_at=start + timedelta(hours=i))
+        test_session.add(thread)
+        await test_session.flush()
+        test_session.add_all([
+            DMParticipantState(thread_id=thread.id, user_id=me.id,
+                               last_read_at=start + timedelta(hours=i, minutes=1),
+                               muted=(i == 1)),
+            DMParticipantState(thread_id=thread.id, user_id=other.id),
+        ])
+        for m in range(3):
+            test_session.add(DMMessage(
+                thread_id=thread.id,
+                sender_id=other.id,
+                text=f"hello {i}-{m}",
+                created_at=start + timedelta(hours=i, minutes=m),
+            ))
+    await test_session.commit()
+    # Messages were inserted directly, so materialize the counters
+    await repair_unread_counts(test_session)
+
+    headers = {"Authorization": f"Bearer {JWTService.create_token(me.id)}"}
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        event.listen(engine.sync_engine, "before_cursor_execute", record)
+        try:
+            response = await client.get("/dms/inbox", params={"limit": 2}, headers=headers)
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", record)
+        assert response.status_code == 200
+        page = response.json()
+
+        assert [t["other_user_name"] for t in page["items"]] == ["Friend 2", "Friend 1"]
+        assert page["items"][0]["last_message"] == "hello 2-2"
+        # Messages at minute 2 are newer than last_read_at (minute 1)
+        assert page["items"][0]["unread_count"] == 1
+        assert page["items"][1]["is_muted"] is True
+        assert page["has_more"] is True
+        inbox_queries = [s for s in statements if "dm_threads" in s]
+        assert len(inbox_queries) == 1
+
+        response = await client.get(
+            "/dms/inbox", params={"limit": 2, "before": page["next_cursor"]}, headers=headers)
+        page = response.json()
+        assert [t["other_user_name"] for t in page["items"]] == ["Friend 0"]
+        assert page["has_more"] is False
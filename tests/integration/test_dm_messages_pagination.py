@@ -0,0 +1,120 @@
+"""Integration tests for keyset pagination of DM thread messages."""
+
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from sqlalchemy import event
+
+from app.database import engine
+from app.main import app
+from app.models import DMMessage, DMParticipantState, DMThread, User
+from app.services.jwt_service import JWTService
+
+
+async def _create_thread_with_messages(session, count):
+    alice = User(phone="+15550001001", username="alice_dm", name="Alice", is_verified=True)
+    bob = User(phone="+15550001002", username="bob_dm", name="Bob", is_verified=True)
+    session.add_all([alice, bob])
+    await session.flush()
+
+    thread = DMThread(user_a_id=alice.id, user_b_id=bob.id,
+                      initiator_id=alice.id, status="accepted")
+    session.add(thread)
+    await session.flush()
+    session.add_all([
+        DMParticipantState(thread_id=thread.id, user_id=alice.id),
+        DMParticipantState(thread_id=thread.id, user_id=bob.id),
+    ])
+
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    for i in range(count):
+        session.add(DMMessage(
+            thread_id=thread.id,
+            sender_id=alice.id if i % 2 == 0 else bob.id,
+            text=f"message {i}",
+            created_at=start + timedelta(minutes=i),
+        ))
+    await session.commit()
+    return alice, thread
+
+
+@pytest.mark.asyncio
+async def test_thread_messages_cursor_pagination(test_session):
+    """Test scrolling back with before cursors and forward with after cursors."""
+    alice, thread = await _create_thread_with_messages(test_session, 7)
+    headers = {"Authorization": f"Bearer {JWTService.create_token(alice.id)}"}
+    url = f"/dms/threads/{thread.id}/messages"
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get(url, params={"limit": 3}, headers=headers)
+        assert response.status_code == 200
+        first = response.json()
+        assert [m["text"] for m in first["items"]] == [
+            "message 6", "message 5", "message 4"]
+        assert first["has_more"] is True
+        assert first["total"] is None
+
+        response = await client.get(
+            url, params={"limit": 3, "before": first["next_cursor"]}, headers=headers)
+        second = response.json()
+        assert [m["text"] for m in second["items"]] == [
+            "message 3", "message 2", "message 1"]
+        assert second["has_more"] is True
+
+        response = await client.get(
+            url, params={"limit": 3, "before": second["next_cursor"]}, headers=headers)
+        third = response.json()
+        assert [m["text"] for m in third["items"]] == ["message 0"]
+        assert third["has_more"] is False
+
+        # Newer than the oldest page, newest first
+        response = await client.get(
+            url, params={"limit": 2, "after": third["prev_cursor"]}, headers=headers)
+        newer = response.json()
+        assert [m["text"] for m in newer["items"]] == ["message 2", "message 1"]
+        assert newer["has_more"] is True
+
+
+@pytest.mark.asyncio
+async def test_thread_messages_total_and_bad_cursor(test_session):
+    """Test include_total and rejection of malformed cursors."""
+    alice, thread = await _create_thread_with_messages(test_session, 3)
+    headers = {"Authorization": f"Bearer {JWTService.create_token(alice.id)}"}
+    url = f"/dms/threads/{thread.id}/messages"
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get(url, params={"include_total": True}, headers=headers)
+        assert response.status_code == 200
+        assert response.json()["total"] == 3
+
+        response = await client.get(url, params={"before": "not-a-cursor"}, headers=headers)
+        assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_thread_messages_resolve_senders_once(test_session):
+    """Test that a page of messages looks up its senders in a single query."""
+    alice, thread = await _create_thread_with_messages(test_session, 20)
+    headers = {"Authorization": f"Bearer {JWTService.create_token(alice.id)}"}
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        event.listen(engine.sync_engine, "before_cursor_execute", record)
+        try:
+            response = await client.get(
+                f"/dms/threads/{thread.id}/messages", params={"limit": 20}, headers=headers)
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 20
+    # One lookup for the authenticated user, one for the page's senders
+    user_queries = [s for s in statements if s.lstrip().startswith("SELECT users.")]
+    assert len(user_queries) == 2
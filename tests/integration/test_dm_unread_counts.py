@@ -0,0 +1,114 @@
+"""Integration tests for materialized DM unread counters."""
+
+import httpx
+import pytest
+from sqlalchemy import select
+
+from app.main import app
+from app.models import DMParticipantState, DMThread, User
+from app.services.dm_unread_service import repair_unread_counts
+from app.services.jwt_service import JWTService
+
+
+async def _create_thread(session):
+    alice = User(phone="+15550003001", username="alice_unread", name="Alice", is_verified=True)
+    bob = User(phone="+15550003002", username="bob_unread", name="Bob", is_verified=True)
+    session.add_all([alice, bob])
+    await session.flush()
+    thread = DMThread(user_a_id=alice.id, user_b_id=bob.id,
+                      initiator_id=alice.id, status="accepted")
+    session.add(thread)
+    await session.flush()
+    session.add_all([
+        DMParticipantState(thread_id=thread.id, user_id=alice.id),
+        DMParticipantState(thread_id=thread.id, user_id=bob.id),
+    ])
+    await session.commit()
+    # Plain ids: the tests expire the session to re-read counters
+    return alice.id, bob.id, thread.id
+
+
+async def _unread_for(session, thread_id, user_id):
+    session.expire_all()
+    state = await session.scalar(select(DMParticipantState).where(
+        DMParticipantState.thread_id == thread_id,
+        DMParticipantState.user_id == user_id,
+    ))
+    return state.unread_count
+
+
+@pytest.mark.asyncio
+async def test_unread_counter_lifecycle(test_session):
+    """Test counters increment on send, total across threads, and reset on mark-read."""
+    alice_id, bob_id, thread_id = await _create_thread(test_session)
+    alice_headers = {"Authorization": f"Bearer {JWTService.create_token(alice_id)}"}
+    bob_headers = {"Authorization": f"Bearer {JWTService.create_token(bob_id)}"}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        for text in ("one", "two"):
+            response = await client.post(
+                f"/dms/threads/{thread_id}/messages", json={"text": text}, headers=alice_headers)
+            assert response.status_code == 200
+
+        assert await _unread_for(test_session, thread_id, bob_id) == 2
+        assert await _unread_for(test_session, thread_id, alice_id) == 0
+
+        response = await client.get("/dms/unread-count", headers=bob_headers)
+        assert response.json() == {"unread": 2}
+        response = await client.get(f"/dms/threads/{thread_id}/unread-count", headers=bob_headers)
+        assert response.json() == {"unread_count": 2}
+
+        response = await client.post(f"/dms/threads/{thread_id}/mark-read", headers=bob_headers)
+        assert response.status_code == 204
+        response = await client.get("/dms/unread-count", headers=bob_headers)
+        assert response.json() == {"unread": 0}
+
+
+@pytest.mark.asyncio
+async def test_repair_recomputes_drifted_counters(test_session):
+    """Test the repair job restores counters from last_read_at."""
+    alice_id, bob_id, thread_id = await _create_thread(test_session)
+    headers = {"Authorization": f"Bearer {JWTService.create_token(alice_id)}"}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.post(f"/dms/threads/{thread_id}/messages", json={"text": "hi"}, headers=headers)
+
+    state = await test_session.scalar(select(DMParticipantState).where(
+        DMParticipantState.thread_id == thread_id, DMParticipantState.user_id == bob_id))
+    state.unread_count = 42
+    await test_session.commit()
+
+    assert await repair_unread_counts(test_session) == 1
+    assert await _unread_for(test_session, thread_id, bob_id) == 1
+
+
+@pytest.mark.asyncio
+async def test_unread_counter_created_for_missing_recipient_state(test_session):
+    """Test a thread where only the sender has a participant state row (e.g.
+    one opened by a block) still counts the recipient's unread messages."""
+    alice = User(phone="+15550003003", username="alice_nostate", name="Alice", is_verified=True)
+    bob = User(phone="+15550003004", username="bob_nostate", name="Bob", is_verified=True)
+    test_session.add_all([alice, bob])
+    await test_session.flush()
+    thread = DMThread(user_a_id=alice.id, user_b_id=bob.id,
+                      initiator_id=alice.id, status="accepted")
+    test_session.add(thread)
+    await test_session.flush()
+    test_session.add(DMParticipantState(thread_id=thread.id, user_id=alice.id))
+    await test_session.commit()
+    alice_id, bob_id, thread_id = alice.id, bob.id, thread.id
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        for text in ("one", "two"):
+            response = await client.post(
+                f"/dms/threads/{thread_id}/messages", json={"text": text},
+                headers={"Authorization": f"Bearer {JWTService.create_token(alice_id)}"})
+            assert response.status_code == 200
+        response = await client.get(
+            "/dms/unread-count", headers={"Authorization": f"Bearer {JWTService.create_token(bob_id)}"})
+
+    assert response.json() == {"unread": 2}
+    assert await _unread_for(test_session, thread_id, alice_id) == 0
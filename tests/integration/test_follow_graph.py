@@ -0,0 +1,102 @@
+"""Integration tests for the follow graph cache."""
+
+import httpx
+import pytest
+from sqlalchemy import event
+
+from app.database import engine
+from app.main import app
+from app.models import Follow
+from app.services.follow_graph import follow_graph
+from app.utils.common import PrivacyEngine, can_view_checkin
+
+
+@pytest.mark.asyncio
+async def test_follow_and_unfollow_update_cached_graph(test_session, create_users, auth_headers):
+    """Test that follow endpoints keep a cached followee set current."""
+    me, a, b = await create_users(3)
+    test_session.add(Follow(follower_id=me, followee_id=a))
+    await test_session.commit()
+
+    assert await follow_graph.is_following(test_session, me, [a, b]) == {a}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        assert (await client.post(f"/follow/{b}", headers=auth_headers(me))).status_code == 200
+        assert follow_graph.cached_following(me) == {a, b}
+
+        assert (await client.delete(f"/follow/{a}", headers=auth_headers(me))).status_code == 200
+        assert follow_graph.cached_following(me) == {b}
+
+
+@pytest.mark.asyncio
+async def test_mutuals_and_follower_list_use_cache(test_session, create_users, auth_headers):
+    """Test mutual intersections and follow-back flags without repeated follow queries."""
+    me, a, b, c = await create_users(4)
+    test_session.add_all([
+        Follow(follower_id=me, followee_id=a),
+        Follow(follower_id=me, followee_id=c),
+        Follow(follower_id=a, followee_id=me),
+        Follow(follower_id=a, followee_id=c),
+        Follow(follower_id=b, followee_id=me),
+    ])
+    await test_session.commit()
+
+    assert await follow_graph.mutuals(test_session, me, a) == {c}
+
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/follow/followers", headers=auth_headers(me))
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+    assert response.status_code == 200
+    followed = {item["id"]: item["followed"] for item in response.json()["items"]}
+    assert followed == {a: True, b: False}
+    # The followee set cached by mutuals() answers the follow-back check
+    assert not [s for s in statements if s.startswith("SELECT follows.followee_id")]
+
+
+@pytest.mark.asyncio
+async def test_load_raced_by_unfollow_is_not_cached(test_session, create_users):
+    """Test a followee set loaded while an unfollow event arrives is not cached."""
+    me, a = await create_users(2)
+    test_session.add(Follow(follower_id=me, followee_id=a))
+    await test_session.commit()
+
+    class RacingSession:
+        async def execute(self, statement):
+            result = await test_session.execute(statement)
+            follow_graph.apply({"op": "unfollow", "follower_id": me, "followee_id": a})
+            return result
+
+    assert await follow_graph.following(RacingSession(), me) == {a}
+    assert follow_graph.cached_following(me) is None
+    assert await follow_graph.following(test_session, me) == {a}
+    assert follow_graph.cached_following(me) == {a}
+
+
+@pytest.mark.asyncio
+async def test_privacy_checks_query_follows_without_distributed_bus(test_session, create_users):
+    """Test followers-only decisions ignore a stale cached graph on the local bus."""
+    me, a = await create_users(2)
+    test_session.add(Follow(follower_id=me, followee_id=a))
+    await test_session.commit()
+    assert await follow_graph.following(test_session, me) == {a}
+
+    # Unfollowed on another node: this node's cache never heard about it
+    await test_session.execute(Follow.__table__.delete())
+    await test_session.commit()
+
+    assert follow_graph.cached_following(me) == {a}
+    assert await follow_graph.followed_among(test_session, me, [a]) == set()
+    privacy = await PrivacyEngine.load(test_session, me, [a])
+    assert privacy.can_view(a, "followers") is False
+    assert await can_view_checkin(test_session, a, me, "followers") is False
@@ -0,0 +1,97 @@
+"""Integration tests for the gazetteer-backed city and neighborhood lookups."""
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.main import app
+from app.routers.lookups import _geonames
+
+
+@pytest.mark.asyncio
+async def test_city_and_neighborhood_lookups_make_no_external_calls(monkeypatch):
+    """Test /lookups/cities and /lookups/neighborhoods are answered locally."""
+    transport = httpx.ASGITransport(app=app)
+    client = httpx.AsyncClient(transport=transport, base_url="http://test")
+
+    def no_outbound(*args, **kwargs):
+        raise AssertionError("external HTTP call")
+
+    monkeypatch.setattr(httpx, "AsyncClient", no_outbound)
+    async with client:
+        cities = await client.get("/lookups/cities", params={"country": "ae", "limit": 2})
+        by_name = await client.get("/lookups/neighborhoods", params={"city": "Dubai"})
+        by_coords = await client.get("/lookups/neighborhoods",
+                                     params={"city": "Riyadh", "lat": 24.69, "lng": 46.685})
+        # Outside the gazetteer, with the GeoNames fallback off by default
+        uncovered = await client.get("/lookups/cities", params={"country": "us"})
+        unknown = await client.get("/lookups/neighborhoods", params={"city": "Atlantis"})
+
+    assert cities.status_code == 200
+    assert [c["name"] for c in cities.json()] == ["Dubai", "Sharjah"]
+    assert cities.json()[0]["latitude"] is not None
+
+    names = [n["name"] for n in by_name.json()]
+    assert "Dubai Marina" in names and "Al Olaya" not in names
+    distances = [n["distance"] for n in by_name.json()]
+    assert distances == sorted(distances)
+
+    assert by_coords.json()[0]["name"] == "Al Olaya"
+    assert uncovered.json() == []
+    assert unknown.json() == []
+
+
+@pytest.mark.asyncio
+async def test_lookups_fall_back_to_geonames_outside_gazetteer(monkeypatch):
+    """Test uncovered countries and cities without neighborhoods go to GeoNames."""
+    calls = []
+
+    async def fake_geonames(endpoint, params):
+        calls.append((endpoint, params))
+        if endpoint == "searchJSON" and "country" in params:
+            return [{"name": "Los Angeles", "countryCode": "US", "adminName1": "California",
+                     "population": 3900000, "lat": "34.05", "lng": "-118.24"}]
+        return [{"name": "Atlantis", "distance": "0"},
+                {"name": "Poseidonia", "distance": "3.5", "population": 10}]
+
+    monkeypatch.setattr("app.routers.lookups._geonames", fake_geonames)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        cities = await client.get("/lookups/cities", params={"country": "us"})
+        unknown = await client.get("/lookups/neighborhoods", params={"city": "Atlantis"})
+        remote = await client.get("/lookups/neighborhoods",
+                                  params={"city": "Atlantis", "lat": 0.0, "lng": 0.0})
+
+    assert [c["name"] for c in cities.json()] == ["Los Angeles"]
+    assert [n["name"] for n in unknown.json()] == ["Poseidonia"]
+    assert [n["name"] for n in remote.json()] == ["Poseidonia"]
+    assert [endpoint for endpoint, _ in calls] == [
+        "searchJSON", "searchJSON", "findNearbyPlaceNameJSON"]
+    assert calls[0][1]["country"] == "US"
+
+
+@pytest.mark.asyncio
+async def test_geonames_fallback_results_are_cached(monkeypatch):
+    """Test an enabled GeoNames fallback asks once per query and caches rows."""
+    requests = []
+
+    class FakeClient:
+        def __init__(self, timeout):
+            assert timeout == settings.geonames_timeout_seconds
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc_info):
+            return False
+
+        async def get(self, url, params):
+            requests.append(url)
+            return httpx.Response(200, json={"geonames": [{"name": "Los Angeles"}]})
+
+    monkeypatch.setattr("app.routers.lookups.settings.geonames_fallback", True)
+    monkeypatch.setattr("app.routers.lookups.httpx.AsyncClient", FakeClient)
+    params = {"country": "US", "maxRows": 5}
+    assert await _geonames("searchJSON", params) == [{"name": "Los Angeles"}]
+    assert await _geonames("searchJSON", dict(reversed(params.items()))) == [{"name": "Los Angeles"}]
+    assert requests == ["http://api.geonames.org/searchJSON"]
@@ -0,0 +1,68 @@
+"""Integration tests for the in-memory country/city/neighborhood lookups."""
+
+import asyncio
+
+import httpx
+import pytest
+from sqlalchemy import event
+
+from app.database import engine
+from app.main import app
+from app.models import Place
+from app.services.lookup_dictionary import match_values
+
+
+def test_match_values_puts_prefix_matches_first():
+    """Test prefix matches sort ahead of other substring matches."""
+    values = ["Al Riyadh", "Riyadh", "Jeddah", "riyadh Gardens"]
+    assert match_values(values, "riy", 10) == ["Riyadh", "riyadh Gardens", "Al Riyadh"]
+    assert match_values(values, "", 2) == ["Al Riyadh", "Jeddah"]
+
+
+@pytest.mark.asyncio
+async def test_lookups_served_from_memory_and_follow_new_places(test_session):
+    """Test lookups load once, filter in memory and pick up new values."""
+    test_session.add_all([
+        Place(name="A", country="SA", city="Riyadh", neighborhood="Al Olaya"),
+        Place(name="B", country="SA", city="Jeddah", neighborhood="Al Rawdah"),
+        Place(name="C", country="AE", city="Dubai", neighborhood="Marina"),
+    ])
+    await test_session.commit()
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        first = await client.get("/places/lookups/cities", params={"country": "SA"})
+        assert first.json() == ["Jeddah", "Riyadh"]
+        version = first.headers["X-Lookups-Version"]
+
+        event.listen(engine.sync_engine, "before_cursor_execute", record)
+        try:
+            neighborhoods = await client.get("/places/lookups/neighborhoods",
+                                             params={"q": "al"})
+            countries = await client.get("/places/lookups/countries", params={"q": "a"})
+            all_cities = await client.get("/lookups/cities/all", params={"country": "ae"})
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", record)
+        assert statements == []
+        assert neighborhoods.json() == ["Al Olaya", "Al Rawdah"]
+        assert countries.json() == ["AE", "SA"]
+        assert all_cities.json() == ["Dubai"]
+
+        test_session.add(Place(name="D", country="SA", city="Dammam"))
+        await test_session.commit()
+        # The places.changed event is dispatched after the commit
+        for _ in range(10):
+            current = (await client.get("/places/lookups/version")).json()["version"]
+            if current != version:
+                break
+            await asyncio.sleep(0.01)
+        cities = await client.get("/places/lookups/cities", params={"country": "SA"})
+
+    assert current != version
+    assert cities.json() == ["Dammam", "Jeddah", "Riyadh"]
+    assert cities.headers["X-Lookups-Version"] == current
@@ -0,0 +1,63 @@
+"""Integration tests for serving place chat history from the ring buffer."""
+
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from sqlalchemy import event
+
+from app.database import engine
+from app.main import app
+from app.models import CheckIn, Place, PlaceChatMessage, User
+from app.services.jwt_service import JWTService
+
+
+async def _create_room(session):
+    user = User(phone="+15550005001", username="buffer_user", name="Buffer", is_verified=True)
+    place = Place(name="Buffer Cafe")
+    session.add_all([user, place])
+    await session.flush()
+    now = datetime.now(timezone.utc)
+    session.add(CheckIn(user_id=user.id, place_id=place.id,
+                        created_at=now, expires_at=now + timedelta(hours=1)))
+    session.add_all([
+        PlaceChatMessage(place_id=place.id, user_id=user.id, text=text,
+                         created_at=now - timedelta(minutes=minutes))
+        for text, minutes in (("one", 2), ("two", 1))
+    ])
+    await session.commit()
+    return user.id, place.id
+
+
+@pytest.mark.asyncio
+async def test_history_served_from_buffer_after_first_read(test_session):
+    """Test that only the first history read queries messages from the database."""
+    user_id, place_id = await _create_room(test_session)
+    headers = {"Authorization": f"Bearer {JWTService.create_token(user_id)}"}
+    url = f"/places/{place_id}/chat/messages"
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        event.listen(engine.sync_engine, "before_cursor_execute", record)
+        try:
+            first = await client.get(url, headers=headers)
+            second = await client.get(url, headers=headers)
+            response = await client.post(url, json={"text": "three"}, headers=headers)
+            assert response.status_code == 200
+            third = await client.get(url, params={"offset": 1, "limit": 5}, headers=headers)
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+    assert [m["text"] for m in first.json()["items"]] == ["one", "two"]
+    assert second.json() == first.json()
+    assert [m["text"] for m in third.json()["items"]] == ["two", "three"]
+    assert third.json()["total"] == 3
+
+    # The post refreshes its own row by id; history is only read once
+    message_reads = [s for s in statements if "FROM place_chat_messages" in s
+                     and "ORDER BY" in s]
+    assert len(message_reads) == 1
@@ -0,0 +1,82 @@
+"""Integration tests for the place detail endpoint."""
+
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from sqlalchemy import event
+
+from app.database import engine
+from app.main import app
+from app.models import CheckIn, CheckInPhoto, Place, Review, User
+from app.services.jwt_service import JWTService
+
+
+async def _create_place(session):
+    place = Place(name="Detail Cafe")
+    viewer = User(phone="+15550008001", username="detail_viewer", is_verified=True)
+    session.add_all([place, viewer])
+    await session.flush()
+
+    now = datetime.now(timezone.utc)
+    for i in range(6):
+        checkin = CheckIn(user_id=viewer.id, place_id=place.id,
+                          created_at=now - timedelta(days=i),
+                          expires_at=now - timedelta(days=i) + timedelta(hours=1))
+        session.add(checkin)
+        await session.flush()
+        session.add(CheckInPhoto(check_in_id=checkin.id, url=f"https://cdn.test/{i}.jpg"))
+    session.add_all([
+        Review(user_id=viewer.id, place_id=place.id, rating=4, created_at=now),
+        Review(user_id=viewer.id, place_id=place.id, rating=5,
+               created_at=now - timedelta(days=90)),
+    ])
+    await session.commit()
+    return viewer.id, place.id
+
+
+@pytest.mark.asyncio
+async def test_place_details_totals_and_batched_photos(test_session):
+    """Test real totals and that check-in photos are loaded in one query."""
+    viewer_id, place_id = await _create_place(test_session)
+    headers = {"Authorization": f"Bearer {JWTService.create_token(viewer_id)}"}
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        event.listen(engine.sync_engine, "before_cursor_execute", record)
+        try:
+            response = await client.get(f"/places/{place_id}", headers=headers)
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+        body = response.json()
+        assert response.status_code == 200
+        assert body["total_checkins"] == 6
+        assert body["stats"]["reviews_count"] == 2
+        assert body["recent_reviews"] == 1
+        assert body["is_checked_in"] is True
+        assert body["current_checkins"] == 1
+        assert len(body["photos"]) == 6
+
+        photo_queries = [s for s in statements if "FROM check_in_photos" in s]
+        assert len(photo_queries) == 1
+
+        # Served from the cache until a check-in at the place invalidates it
+        statements.clear()
+        event.listen(engine.sync_engine, "before_cursor_execute", record)
+        try:
+            await client.get(f"/places/{place_id}", headers=headers)
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", record)
+        assert not [s for s in statements if "FROM places" in s]
+
+        response = await client.post(
+            "/places/check-ins",
+            json={"place_id": place_id, "latitude": 24.7, "longitude": 46.6}, headers=headers)
+        assert response.status_code == 200
+        body = (await client.get(f"/places/{place_id}", headers=headers)).json()
+        assert body["total_checkins"] == 7
@@ -0,0 +1,67 @@
+"""Integration tests for the public response cache."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.main import app
+from app.models import Place
+
+
+@pytest.mark.asyncio
+async def test_lookup_responses_cached_with_etag(test_session):
+    """Test cache hits, 304 on If-None-Match, and invalidation on place writes."""
+    test_session.add(Place(name="Cache Cafe", country="SA", city="Riyadh"))
+    await test_session.commit()
+    url = "/places/lookups/countries"
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        first = await client.get(url)
+        assert first.status_code == 200
+        assert first.json() == ["SA"]
+        assert first.headers["x-cache"] == "MISS"
+        assert first.headers["cache-control"] == "public, max-age=300"
+        etag = first.headers["etag"]
+
+        second = await client.get(url)
+        assert second.headers["x-cache"] == "HIT"
+        assert second.json() == ["SA"]
+
+        not_modified = await client.get(url, headers={"If-None-Match": etag})
+        assert not_modified.status_code == 304
+        assert not_modified.content == b""
+
+        test_session.add(Place(name="Dubai Cafe", country="AE", city="Dubai"))
+        await test_session.commit()
+        # Change notifications are delivered on the next loop turn
+        await asyncio.sleep(0)
+
+        third = await client.get(url, headers={"If-None-Match": etag})
+        assert third.status_code == 200
+        assert third.json() == ["AE", "SA"]
+        assert third.headers["etag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_cached_responses_get_cors_headers_per_origin(test_session):
+    """Test a response cached for a request without Origin is replayed with
+    the CORS headers of the next request's Origin."""
+    test_session.add(Place(name="Cors Cafe", country="SA", city="Riyadh"))
+    await test_session.commit()
+    url = "/places/lookups/countries"
+    origin = "http://localhost:3000"
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        first = await client.get(url)
+        assert first.headers["x-cache"] == "MISS"
+        assert "access-control-allow-origin" not in first.headers
+
+        second = await client.get(url, headers={"Origin": origin})
+        assert second.headers["x-cache"] == "HIT"
+        assert second.headers["access-control-allow-origin"] == origin
+
+        third = await client.get(url)
+        assert "access-control-allow-origin" not in third.headers
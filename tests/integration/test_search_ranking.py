@@ -0,0 +1,60 @@
+"""Integration tests for ranked place and user text search."""
+
+import httpx
+import pytest
+
+from app.main import app
+from app.models import Place, User
+from app.services.jwt_service import JWTService
+from app.services.search_service import escape_like
+
+
+def test_escape_like_matches_wildcards_literally():
+    """Test that LIKE wildcards in user input are escaped."""
+    assert escape_like("100%_off\\") == "100\\%\\_off\\\\"
+
+
+@pytest.mark.asyncio
+async def test_place_search_ranks_exact_then_prefix_then_word(test_session):
+    """Test exact, prefix, word-prefix and substring matches come back in order."""
+    viewer = User(phone="+15550012001", username="searcher", name="Searcher", is_verified=True)
+    test_session.add_all([
+        viewer,
+        Place(name="Decoffeeinated", city="Riyadh"),
+        Place(name="Best Coffee", city="Riyadh"),
+        Place(name="Coffee Lab", city="Riyadh"),
+        Place(name="Coffee", city="Riyadh"),
+        Place(name="100% Juice", city="Riyadh"),
+    ])
+    await test_session.commit()
+    headers = {"Authorization": f"Bearer {JWTService.create_token(viewer.id)}"}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        body = (await client.get("/places/search", params={"q": "coffee"}, headers=headers)).json()
+        literal = (await client.get("/places/search", params={"q": "0%"}, headers=headers)).json()
+
+    assert [item["name"] for item in body["items"]] == [
+        "Coffee", "Coffee Lab", "Best Coffee", "Decoffeeinated"]
+    assert body["total"] == 4
+    assert [item["name"] for item in literal["items"]] == ["100% Juice"]
+
+
+@pytest.mark.asyncio
+async def test_user_search_ranks_prefix_matches_first(test_session):
+    """Test user search puts username prefix matches before substring matches."""
+    viewer = User(phone="+15550012101", username="viewer", name="Viewer", is_verified=True)
+    test_session.add_all([
+        viewer,
+        User(phone="+15550012102", username="the_sara", name="Someone", is_verified=True),
+        User(phone="+15550012103", username="sara_k", name="Sara K", is_verified=True),
+    ])
+    await test_session.commit()
+    headers = {"Authorization": f"Bearer {JWTService.create_token(viewer.id)}"}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post("/users/search", json={"q": "sara"}, headers=headers)
+
+    assert response.status_code == 200
+    assert [item["username"] for item in response.json()] == ["sara_k", "the_sara"]
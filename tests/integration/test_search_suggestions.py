@@ -0,0 +1,50 @@
+"""Integration tests for the search suggestions endpoint."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+
+from app.main import app
+from app.models import CheckIn, Place, User
+from app.services.jwt_service import JWTService
+
+
+@pytest.mark.asyncio
+async def test_suggestions_load_from_database_and_follow_new_places(test_session):
+    """Test suggestions are weighted by check-ins and pick up places added later."""
+    user = User(phone="+15550013001", username="typer", name="Typer", is_verified=True)
+    quiet = Place(name="Olaya Books", city="Riyadh", neighborhood="Al Olaya", categories="Bookstore")
+    busy = Place(name="Olive Garden", city="Riyadh", neighborhood="Al Olaya", categories="Restaurant")
+    test_session.add_all([user, quiet, busy])
+    await test_session.flush()
+    now = datetime.now(timezone.utc)
+    test_session.add_all([
+        CheckIn(user_id=user.id, place_id=busy.id, expires_at=now + timedelta(hours=1))
+        for _ in range(3)
+    ])
+    await test_session.commit()
+    headers = {"Authorization": f"Bearer {JWTService.create_token(user.id)}"}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        body = (await client.get("/places/search/suggestions",
+                                 params={"q": "ol"}, headers=headers)).json()
+        assert [s["value"] for s in body["places"]] == ["Olive Garden", "Olaya Books"]
+        assert body["places"][0]["count"] == 3
+        assert body["places"][0]["place_id"] == busy.id
+        assert body["neighborhoods"] == [
+            {"type": "neighborhood", "value": "Al Olaya", "count": 2, "place_id": None}]
+
+        test_session.add(Place(name="Oliva Bakery", city="Olaya Heights"))
+        await test_session.commit()
+        # The places.changed event is dispatched after the commit
+        for _ in range(10):
+            body = (await client.get("/places/search/suggestions",
+                                     params={"q": "oliva"}, headers=headers)).json()
+            if body["places"]:
+                break
+            await asyncio.sleep(0.01)
+
+    assert [s["value"] for s in body["places"]] == ["Oliva Bakery"]
@@ -0,0 +1,89 @@
+"""Integration tests for visibility filtering of a user's check-ins."""
+
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from sqlalchemy import and_, func, select
+
+from app.main import app
+from app.models import CheckIn, Follow, Place, User
+from app.services.jwt_service import JWTService
+from app.utils import PrivacyEngine, visible_to_viewer_clause
+
+
+async def _create_owner_with_checkins(session, visibilities, follower=False):
+    owner = User(phone="+15550008001", username="owner", name="Owner", is_verified=True)
+    viewer = User(phone="+15550008002", username="viewer", name="Viewer", is_verified=True)
+    place = Place(name="Corner Bakery")
+    session.add_all([owner, viewer, place])
+    await session.flush()
+    if follower:
+        session.add(Follow(follower_id=viewer.id, followee_id=owner.id))
+
+    now = datetime.now(timezone.utc)
+    for i, visibility in enumerate(visibilities):
+        session.add(CheckIn(user_id=owner.id, place_id=place.id, visibility=visibility,
+                            created_at=now - timedelta(minutes=i),
+                            expires_at=now + timedelta(hours=1)))
+    await session.commit()
+    return owner.id, viewer.id
+
+
+async def _get_checkins(owner_id, viewer_id, **params):
+    headers = {"Authorization": f"Bearer {JWTService.create_token(viewer_id)}"}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get(f"/users/{owner_id}/check-ins", params=params, headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.mark.asyncio
+async def test_user_checkins_paginate_visible_items(test_session):
+    """Test that totals and pages only count check-ins the viewer may see."""
+    owner_id, viewer_id = await _create_owner_with_checkins(
+        test_session, ["public", "private"] * 10)
+
+    body = await _get_checkins(owner_id, viewer_id, limit=4, offset=8)
+    assert body["total"] == 10
+    assert len(body["items"]) == 2
+    assert {item["visibility"] for item in body["items"]} == {"public"}
+
+    own = await _get_checkins(owner_id, owner_id, limit=100)
+    assert own["total"] == 20
+
+
+@pytest.mark.asyncio
+async def test_visible_to_viewer_clause_matches_follow_edges(test_session):
+    """Test the SQL visibility filter against public, followers and private rows."""
+    owner_id, viewer_id = await _create_owner_with_checkins(
+        test_session, ["public", "followers", "private"] * 3, follower=True)
+
+    async def visible_count(viewer):
+        return (await test_session.execute(
+            select(func.count(CheckIn.id)).where(and_(
+                CheckIn.user_id == owner_id,
+                visible_to_viewer_clause(CheckIn.user_id, CheckIn.visibility, viewer),
+            ))
+        )).scalar_one()
+
+    assert await visible_count(viewer_id) == 6
+    assert await visible_count(owner_id) == 9
+    assert await visible_count(999) == 3
+
+
+@pytest.mark.asyncio
+async def test_privacy_engine_loads_follow_edges_once(test_session):
+    """Test batch visibility evaluation for items owned by several users."""
+    owner_id, viewer_id = await _create_owner_with_checkins(test_session, [], follower=True)
+
+    privacy = await PrivacyEngine.load(test_session, viewer_id, [owner_id, viewer_id, 999])
+
+    assert privacy.followed_owner_ids == {owner_id}
+    assert privacy.can_view(owner_id, "followers") is True
+    assert privacy.can_view(999, "followers") is False
+    assert privacy.can_view(999, "public") is True
+    assert privacy.can_view(viewer_id, "private") is True
+    assert privacy.can_view(owner_id, "private") is False
+    assert privacy.can_view(owner_id, "unknown") is False
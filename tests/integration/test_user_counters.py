@@ -0,0 +1,111 @@
+"""Integration tests for materialized profile counters."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from sqlalchemy import event, select
+
+from app.database import engine
+from app.main import app
+from app.models import CheckIn, Place, User
+from app.services.user_counters import repair_user_counters
+
+
+async def _create_place(session):
+    place = Place(name="Counter Cafe", latitude=24.7, longitude=46.7)
+    session.add(place)
+    await session.commit()
+    return place.id
+
+
+@pytest.mark.asyncio
+async def test_counters_follow_writes_and_profile_reads_them(test_session, create_users, auth_headers):
+    """Test follow, unfollow, check-in and delete keep counters in step."""
+    alice_id, bob_id = await create_users(2)
+    place_id = await _create_place(test_session)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        assert (await client.post(f"/follow/{bob_id}", headers=auth_headers(alice_id))).status_code == 200
+        assert (await client.post(f"/follow/{alice_id}", headers=auth_headers(bob_id))).status_code == 200
+        checkin = await client.post("/places/check-ins", headers=auth_headers(bob_id), json={
+            "place_id": place_id, "latitude": 24.7, "longitude": 46.7})
+        assert checkin.status_code == 200
+        second = await client.post("/places/check-ins", headers=auth_headers(bob_id), json={
+            "place_id": place_id, "latitude": 24.7, "longitude": 46.7})
+        assert (await client.delete(
+            f"/places/check-ins/{second.json()['id']}", headers=auth_headers(bob_id))).status_code == 204
+        assert (await client.delete(f"/follow/{alice_id}", headers=auth_headers(bob_id))).status_code == 200
+
+        statements: list[str] = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine.sync_engine, "before_cursor_execute", record)
+        try:
+            profile = (await client.get(f"/users/{bob_id}", headers=auth_headers(alice_id))).json()
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+    assert profile["followers_count"] == 1
+    assert profile["following_count"] == 0
+    assert profile["check_ins_count"] == 1
+    assert not [s for s in statements if "count(" in s.lower()]
+
+
+@pytest.mark.asyncio
+async def test_repair_user_counters_fixes_drift(test_session, create_users):
+    """Test the reconciler recomputes counters from follows and check-ins."""
+    alice_id, bob_id = await create_users(2)
+    place_id = await _create_place(test_session)
+    test_session.add(CheckIn(user_id=alice_id, place_id=place_id,
+                             expires_at=datetime.now(timezone.utc) + timedelta(hours=1)))
+    await test_session.commit()
+
+    assert await repair_user_counters(test_session) == 1
+    test_session.expire_all()
+    alice = await test_session.scalar(select(User).where(User.id == alice_id))
+    assert (alice.check_ins_count, alice.followers_count, alice.following_count) == (1, 0, 0)
+
+    assert await repair_user_counters(test_session) == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_unfollows_decrement_once(test_session, create_users, auth_headers):
+    """Test that racing unfollow requests only count the row actually deleted."""
+    alice_id, bob_id = await create_users(2)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        assert (await client.post(f"/follow/{bob_id}", headers=auth_headers(alice_id))).status_code == 200
+        responses = await asyncio.gather(*[
+            client.delete(f"/follow/{bob_id}", headers=auth_headers(alice_id)) for _ in range(3)])
+
+    assert [r.status_code for r in responses] == [200, 200, 200]
+    test_session.expire_all()
+    alice = await test_session.scalar(select(User).where(User.id == alice_id))
+    bob = await test_session.scalar(select(User).where(User.id == bob_id))
+    assert (alice.following_count, bob.followers_count) == (0, 0)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_check_in_deletes_decrement_once(test_session, create_users, auth_headers):
+    """Test that racing check-in deletes only count the row actually deleted."""
+    [bob_id] = await create_users(1)
+    place_id = await _create_place(test_session)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        checkin = await client.post("/places/check-ins", headers=auth_headers(bob_id), json={
+            "place_id": place_id, "latitude": 24.7, "longitude": 46.7})
+        responses = await asyncio.gather(*[
+            client.delete(f"/places/check-ins/{checkin.json()['id']}", headers=auth_headers(bob_id))
+            for _ in range(3)])
+
+    assert sorted(r.status_code for r in responses) == [204, 404, 404]
+    test_session.expire_all()
+    bob = await test_session.scalar(select(User).where(User.id == bob_id))
+    assert bob.check_ins_count == 0
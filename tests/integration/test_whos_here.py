@@ -0,0 +1,81 @@
+"""Integration tests for the who's-here listing."""
+
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from sqlalchemy import event
+
+from app.database import engine
+from app.main import app
+from app.models import CheckIn, Place, User
+from app.services.jwt_service import JWTService
+
+
+async def _create_place_with_visitors(session, count):
+    place = Place(name="Busy Cafe")
+    users = [User(phone=f"+1555000710{i}", username=f"visitor_{i}", name=f"Visitor {i}",
+                  is_verified=True) for i in range(count)]
+    session.add_all([place, *users])
+    await session.flush()
+
+    now = datetime.now(timezone.utc)
+    for i, user in enumerate(users):
+        session.add(CheckIn(user_id=user.id, place_id=place.id,
+                            created_at=now - timedelta(minutes=10 * (i + 1)),
+                            expires_at=now + timedelta(hours=1)))
+    # An older repeat check-in by the first visitor must not list them twice
+    session.add(CheckIn(user_id=users[0].id, place_id=place.id,
+                        created_at=now - timedelta(hours=3),
+                        expires_at=now + timedelta(hours=1)))
+    await session.commit()
+    return users[0].id, place.id
+
+
+@pytest.mark.asyncio
+async def test_whos_here_lists_each_person_once_with_cursor(test_session):
+    """Test deduplicated visitors, newest first, paged with keyset cursors."""
+    user_id, place_id = await _create_place_with_visitors(test_session, 5)
+    headers = {"Authorization": f"Bearer {JWTService.create_token(user_id)}"}
+    url = f"/places/{place_id}/whos-here"
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        first = (await client.get(url, params={"limit": 3}, headers=headers)).json()
+        assert [item["username"] for item in first["items"]] == [
+            "visitor_0", "visitor_1", "visitor_2"]
+        assert first["total"] == 5
+        assert first["has_more"] is True
+
+        second = (await client.get(
+            url, params={"limit": 3, "before": first["next_cursor"]}, headers=headers)).json()
+        assert [item["username"] for item in second["items"]] == ["visitor_3", "visitor_4"]
+        assert second["has_more"] is False
+        assert second["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_whos_here_loads_users_with_checkins(test_session):
+    """Test that visitors are fetched with their check-ins, not one query per user."""
+    user_id, place_id = await _create_place_with_visitors(test_session, 8)
+    headers = {"Authorization": f"Bearer {JWTService.create_token(user_id)}"}
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        # Warm the presence index so only the request's own queries are counted
+        await client.get(f"/places/{place_id}/whos-here", headers=headers)
+        event.listen(engine.sync_engine, "before_cursor_execute", record)
+        try:
+            response = await client.get(f"/places/{place_id}/whos-here", headers=headers)
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 8
+    # One lookup for the authenticated user; visitors come joined to check-ins
+    user_queries = [s for s in statements if s.lstrip().startswith("SELECT users.")]
+    assert len(user_queries) == 1
@@ -0,0 +1,56 @@
+"""Unit tests for the in-memory autocomplete prefix index."""
+
+from app.services.autocomplete_index import AutocompleteIndex, PrefixIndex
+
+
+def test_prefix_search_ranks_by_weight_and_matches_word_starts():
+    """Test prefix lookups over every word of a name, best weighted first."""
+    index = PrefixIndex()
+    index.bulk_load([
+        (1, "Coffee Lab", 5, 1),
+        (2, "Best Coffee", 20, 2),
+        (3, "Cofe Corner", 1, 3),
+        (4, "Tea House", 50, 4),
+    ], word_starts=True)
+
+    assert [e.value for e in index.search("coff", 5, 100)] == ["Best Coffee", "Coffee Lab"]
+    assert [e.value for e in index.search("co", 2, 100)] == ["Best Coffee", "Coffee Lab"]
+    assert index.search("  BEST  c", 5, 100)[0].place_id == 2
+    assert index.search("x", 5, 100) == []
+
+
+def test_popular_entries_found_beyond_scan_budget():
+    """Test a heavy entry sorting after thousands of lighter matches is still
+    returned for short and long prefixes."""
+    index = PrefixIndex()
+    index.bulk_load([(i, f"Cafe {i:05d}", 0, i) for i in range(6000)]
+                    + [(9999, "Cafe Zzz Popular", 1000, 9999)], word_starts=True)
+
+    assert index.search("caf", 3, 5000)[0].value == "Cafe Zzz Popular"
+    assert index.search("cafe", 3, 5000)[0].value == "Cafe Zzz Popular"
+    assert index.search("cafe 0001", 3, 5000)[0].value == "Cafe 00010"
+
+    index.set_weight(5, 2000)
+    assert [e.value for e in index.search("ca", 2, 5000)] == ["Cafe 00005", "Cafe Zzz Popular"]
+    index.remove(5)
+    assert index.search("ca", 1, 5000)[0].value == "Cafe Zzz Popular"
+
+
+def test_incremental_updates_follow_places_and_checkins():
+    """Test new places, renames, removals and check-in weights."""
+    autocomplete = AutocompleteIndex()
+    autocomplete.upsert_place(1, "Falafel King", city="Riyadh", categories="Restaurant, Falafel")
+    autocomplete.upsert_place(2, "Falafel Corner", city="riyadh")
+    autocomplete.record_checkin(2)
+
+    found = autocomplete.suggest("fal")
+    assert [e.value for e in found["place"]] == ["Falafel Corner", "Falafel King"]
+    assert [e.value for e in found["category"]] == ["Falafel"]
+    assert [e.value for e in autocomplete.suggest("riy")["city"]] == ["Riyadh"]
+
+    autocomplete.upsert_place(2, "Shawarma Corner")
+    assert [e.value for e in autocomplete.suggest("fal")["place"]] == ["Falafel King"]
+    assert autocomplete.suggest("shaw")["place"][0].weight == 1
+
+    autocomplete.indexes["place"].remove(1)
+    assert autocomplete.suggest("fal")["place"] == []
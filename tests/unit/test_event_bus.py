@@ -0,0 +1,20 @@
+"""Unit tests for the cross-node event bus."""
+
+import pytest
+
+from app.services.event_bus import EventBus
+
+
+@pytest.mark.asyncio
+async def test_local_backend_refuses_multiple_workers(monkeypatch):
+    """Test that the local backend fails fast when several workers would share it."""
+    monkeypatch.setattr("app.services.event_bus.settings.event_bus_backend", "local")
+    bus = EventBus()
+
+    monkeypatch.setenv("WEB_CONCURRENCY", "1")
+    await bus.start()
+    assert bus.is_distributed is False
+
+    monkeypatch.setenv("WEB_CONCURRENCY", "4")
+    with pytest.raises(RuntimeError):
+        await bus.start()
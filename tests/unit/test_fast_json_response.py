@@ -0,0 +1,35 @@
+"""Unit tests for the pydantic-core JSON response class."""
+
+import json
+import math
+import uuid
+from datetime import datetime, timezone
+
+from app.schemas import PlaceChatMessageResponse
+from app.utils import FastJSONResponse
+
+
+def test_matches_response_model_serialization():
+    """Test output is byte-identical to FastAPI's response_model JSON."""
+    message = PlaceChatMessageResponse(
+        id=str(uuid.uuid4()), room_id=1, place_id=1, user_id=2, author_id="2",
+        author_name="Nour é", text="مرحبا", status="sent",
+        created_at=datetime(2026, 1, 1, 9, 30, tzinfo=timezone.utc),
+    )
+    expected = json.dumps(message.model_dump(mode="json"), ensure_ascii=False,
+                          separators=(",", ":")).encode()
+
+    assert FastJSONResponse(message).body == expected
+    assert FastJSONResponse(message.model_dump(mode="json")).body == expected
+
+
+def test_encodes_native_types():
+    """Test datetimes, UUIDs and non-finite floats without jsonable_encoder."""
+    value = uuid.UUID("12345678-1234-5678-1234-567812345678")
+    body = FastJSONResponse({
+        "at": datetime(2026, 1, 1, tzinfo=timezone.utc),
+        "id": value,
+        "score": math.nan,
+    }).body
+
+    assert json.loads(body) == {"at": "2026-01-01T00:00:00Z", "id": str(value), "score": None}
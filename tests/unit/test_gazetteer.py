@@ -0,0 +1,60 @@
+"""Unit tests for the offline gazetteer and its GeoNames build."""
+
+import json
+
+from app.services.gazetteer import DEFAULT_PATH, Gazetteer
+from scripts.build_gazetteer import build
+
+
+def _geonames_row(geoname_id, name, lat, lng, code, country, admin1, population):
+    fields = [str(geoname_id), name, name, "", str(lat), str(lng), "P", code, country,
+              "", admin1, "", "", "", str(population), "", "", "Asia/Riyadh", "2024-01-01"]
+    return "\t".join(fields) + "\n"
+
+
+def test_build_from_geonames_dump_and_query(tmp_path):
+    """Test a GeoNames extract builds a gazetteer that ranks and searches locally."""
+    dump = tmp_path / "SA.txt"
+    dump.write_text("".join([
+        _geonames_row(1, "Jeddah", 21.5424, 39.198, "PPLA", "SA", "14", 2867446),
+        _geonames_row(2, "Riyadh", 24.6877, 46.7219, "PPLC", "SA", "10", 4205961),
+        _geonames_row(3, "Tiny Village", 24.0, 46.0, "PPL", "SA", "10", 40),
+        _geonames_row(4, "Al Olaya", 24.6905, 46.6853, "PPLX", "SA", "10", 0),
+        _geonames_row(5, "Al Malaz", 24.6639, 46.7275, "PPLX", "SA", "10", 0),
+        _geonames_row(6, "Al Balad", 21.4858, 39.1925, "PPLX", "SA", "14", 0),
+    ]), encoding="utf-8")
+    admin1 = tmp_path / "admin1CodesASCII.txt"
+    admin1.write_text("SA.10\tRiyadh Region\tRiyadh Region\t108410\n"
+                      "SA.14\tMakkah Region\tMakkah Region\t104515\n", encoding="utf-8")
+    output = tmp_path / "gazetteer.json"
+    output.write_text(json.dumps(build([str(dump)], str(admin1), min_population=1000)))
+
+    gazetteer = Gazetteer(output)
+    assert [(c.name, c.region) for c in gazetteer.cities("sa")] == [
+        ("Riyadh", "Riyadh Region"), ("Jeddah", "Makkah Region")]
+    assert gazetteer.cities("AE") == []
+
+    riyadh = gazetteer.find_city(" riyadh ")
+    near = gazetteer.neighborhoods_near(riyadh.latitude, riyadh.longitude)
+    assert [n.name for n, _ in near] == ["Al Malaz", "Al Olaya"]
+    assert all(distance < 20 for _, distance in near)
+
+
+def test_seed_gazetteer_loads():
+    """Test the test seed gazetteer covers the popular cities."""
+    gazetteer = Gazetteer()
+    with open(DEFAULT_PATH.parent / "popular_cities.json", encoding="utf-8") as f:
+        popular = json.load(f)["popular_cities"]
+
+    assert gazetteer.path.name == "gazetteer_seed.json"
+    for city in popular:
+        assert gazetteer.find_city(city["name"]).country == city["country"]
+    assert gazetteer.cities("SA", 1)[0].name == "Riyadh"
+
+
+def test_missing_gazetteer_loads_empty(tmp_path):
+    """Test an unbuilt gazetteer answers nothing instead of failing startup."""
+    gazetteer = Gazetteer(tmp_path / "gazetteer.json")
+    gazetteer.ensure_loaded()
+    assert not gazetteer.covers("SA")
+    assert gazetteer.find_city("Riyadh") is None
@@ -0,0 +1,85 @@
+"""Unit tests for the write-behind chat message batcher."""
+
+import asyncio
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+
+from app.models import Place, PlaceChatMessage, User
+from app.services.message_batcher import MessageBatcher
+
+
+async def _create_user_and_place(session):
+    user = User(phone="+15550000001", username="batcher_user", is_verified=True)
+    place = Place(name="Batch Cafe")
+    session.add_all([user, place])
+    await session.commit()
+    return user, place
+
+
+@pytest.mark.asyncio
+async def test_concurrent_messages_share_one_insert(test_session):
+    """Test that messages arriving together are written in a single batch."""
+    user, place = await _create_user_and_place(test_session)
+    batches = []
+
+    async def record_batch(db, rows):
+        batches.append(len(rows))
+
+    batcher = MessageBatcher(PlaceChatMessage, after_insert=record_batch, max_latency_ms=50)
+    results = await asyncio.gather(*[
+        batcher.submit({"place_id": place.id, "user_id": user.id, "text": f"msg {i}"})
+        for i in range(5)
+    ])
+    await batcher.stop()
+
+    assert batches == [5]
+    assert [r["text"] for r in results] == [f"msg {i}" for i in range(5)]
+    assert all(r["id"] and r["created_at"] for r in results)
+
+    count = await test_session.scalar(select(func.count(PlaceChatMessage.id)))
+    assert count == 5
+
+
+@pytest.mark.asyncio
+async def test_batch_size_limit_splits_batches(test_session):
+    """Test that a batch never exceeds max_batch_size rows."""
+    user, place = await _create_user_and_place(test_session)
+    batches = []
+
+    async def record_batch(db, rows):
+        batches.append(len(rows))
+
+    batcher = MessageBatcher(
+        PlaceChatMessage, after_insert=record_batch, max_batch_size=2, max_latency_ms=50)
+    await asyncio.gather(*[
+        batcher.submit({"place_id": place.id, "user_id": user.id, "text": "hi"})
+        for _ in range(5)
+    ])
+    await batcher.stop()
+
+    assert max(batches) <= 2
+    assert sum(batches) == 5
+
+
+@pytest.mark.asyncio
+async def test_failed_row_only_fails_its_caller(test_session):
+    """Test that a bad row in a batch fails its own caller and the rest commit."""
+    user, place = await _create_user_and_place(test_session)
+    batcher = MessageBatcher(PlaceChatMessage, max_latency_ms=50)
+
+    results = await asyncio.gather(
+        batcher.submit({"place_id": place.id, "user_id": user.id, "text": "before"}),
+        # text is NOT NULL
+        batcher.submit({"place_id": place.id, "user_id": user.id, "text": None}),
+        batcher.submit({"place_id": place.id, "user_id": user.id, "text": "after"}),
+        return_exceptions=True,
+    )
+    await batcher.stop()
+
+    assert results[0]["text"] == "before"
+    assert isinstance(results[1], IntegrityError)
+    assert results[2]["text"] == "after"
+    count = await test_session.scalar(select(func.count(PlaceChatMessage.id)))
+    assert count == 2
@@ -0,0 +1,89 @@
+"""Unit tests for the place chat ring buffer."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.services.place_chat_buffer import PlaceChatBuffer
+
+
+START = datetime(2026, 1, 1, 12, tzinfo=timezone.utc)
+
+
+def _message(message_id, minutes, place_id=1):
+    return {
+        "id": str(message_id),
+        "place_id": place_id,
+        "text": f"message {message_id}",
+        "created_at": (START + timedelta(minutes=minutes)).isoformat(),
+    }
+
+
+def _loader(messages):
+    calls = []
+
+    async def load(place_id, count):
+        calls.append(place_id)
+        return messages[-count:]
+
+    return load, calls
+
+
+@pytest.mark.asyncio
+async def test_loads_room_once_and_appends_new_messages():
+    """Test that a cold room is loaded once and then kept current by appends."""
+    buffer = PlaceChatBuffer(capacity=10)
+    load, calls = _loader([_message(1, 0), _message(2, 1)])
+
+    await buffer.ensure_loaded(1, load)
+    await buffer.ensure_loaded(1, load)
+    buffer.append(1, _message(3, 2))
+    buffer.append(1, _message(3, 2))
+
+    assert calls == [1]
+    items = buffer.recent(1, START - timedelta(hours=1))
+    assert [m["id"] for m in items] == ["1", "2", "3"]
+
+
+@pytest.mark.asyncio
+async def test_recent_filters_window_and_since():
+    """Test that buffered reads respect the chat window and since cursor."""
+    buffer = PlaceChatBuffer(capacity=10)
+    load, _ = _loader([_message(i, i) for i in range(5)])
+    await buffer.ensure_loaded(1, load)
+
+    items = buffer.recent(1, START + timedelta(minutes=1), since=START + timedelta(minutes=2))
+    assert [m["id"] for m in items] == ["3", "4"]
+
+
+@pytest.mark.asyncio
+async def test_reads_past_the_buffer_fall_back():
+    """Test that a full ring cannot answer for messages it has evicted."""
+    buffer = PlaceChatBuffer(capacity=3)
+    load, _ = _loader([_message(i, i) for i in range(5)])
+    await buffer.ensure_loaded(1, load)
+
+    assert buffer.recent(1, START - timedelta(hours=1)) is None
+    # Everything newer than the oldest buffered message is still served
+    items = buffer.recent(1, START - timedelta(hours=1), since=START + timedelta(minutes=2))
+    assert [m["id"] for m in items] == ["3", "4"]
+
+
+def test_unloaded_rooms_are_not_served_or_appended():
+    """Test that appends to cold rooms are ignored until the room is loaded."""
+    buffer = PlaceChatBuffer(capacity=3)
+    buffer.append(7, _message(1, 0, place_id=7))
+
+    assert buffer.recent(7, START - timedelta(hours=1)) is None
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_rooms_are_dropped():
+    """Test that only max_rooms rooms are kept in memory."""
+    buffer = PlaceChatBuffer(capacity=3, max_rooms=2)
+    load, _ = _loader([])
+    for place_id in (1, 2, 3):
+        await buffer.ensure_loaded(place_id, load)
+
+    assert buffer.recent(1, START) is None
+    assert buffer.recent(3, START) == []
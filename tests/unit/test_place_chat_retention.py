@@ -0,0 +1,115 @@
+"""Unit tests for place chat retention."""
+
+from datetime import date, datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models import Place, PlaceChatMessage, PlaceChatMessageArchive, User
+from app.services.place_chat_retention import PlaceChatRetentionService
+
+
+def test_partition_names_round_trip():
+    """Test that partition names encode and decode their day."""
+    service = PlaceChatRetentionService()
+    name = service.partition_name(date(2026, 3, 9))
+
+    assert name == "place_chat_messages_p20260309"
+    assert service.partition_day(name) == date(2026, 3, 9)
+    assert service.partition_day("place_chat_messages_default") is None
+
+
+def test_retention_never_shorter_than_chat_window():
+    """Test that the cutoff keeps at least place_chat_window_hours of history."""
+    now = datetime(2026, 1, 2, tzinfo=timezone.utc)
+    with patch("app.services.place_chat_retention.settings") as settings:
+        settings.place_chat_retention_hours = 1
+        settings.place_chat_window_hours = 12
+        assert PlaceChatRetentionService.retention_cutoff(now) == now - timedelta(hours=12)
+
+
+async def _seed_messages(session, now):
+    user = User(phone="+15550004001", username="retention_user", is_verified=True)
+    place = Place(name="Retention Cafe")
+    session.add_all([user, place])
+    await session.flush()
+    session.add_all([
+        PlaceChatMessage(place_id=place.id, user_id=user.id, text="old",
+                         created_at=now - timedelta(days=5)),
+        PlaceChatMessage(place_id=place.id, user_id=user.id, text="fresh",
+                         created_at=now - timedelta(hours=1)),
+    ])
+    await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_expired_rows_are_archived(test_session):
+    """Test the row-level fallback moves expired messages to the archive table."""
+    now = datetime.now(timezone.utc)
+    await _seed_messages(test_session, now)
+
+    with patch("app.services.place_chat_retention.settings.place_chat_retention_mode", "archive"):
+        summary = await PlaceChatRetentionService().run_once(now)
+
+    assert summary == {"expired_rows": 1}
+    live = (await test_session.execute(select(PlaceChatMessage.text))).scalars().all()
+    archived = (await test_session.execute(select(PlaceChatMessageArchive.text))).scalars().all()
+    assert live == ["fresh"]
+    assert archived == ["old"]
+
+
+@pytest.mark.asyncio
+async def test_expired_rows_are_dropped(test_session):
+    """Test that drop mode deletes expired messages without archiving."""
+    now = datetime.now(timezone.utc)
+    await _seed_messages(test_session, now)
+
+    with patch("app.services.place_chat_retention.settings.place_chat_retention_mode", "drop"):
+        await PlaceChatRetentionService().run_once(now)
+
+    assert await test_session.scalar(select(func.count(PlaceChatMessage.id))) == 1
+    assert await test_session.scalar(select(func.count(PlaceChatMessageArchive.id))) == 0
+
+
+class _FakePartitionSession:
+    """Records DDL; fails the statements mentioning ``fail_on``."""
+
+    def __init__(self, fail_on):
+        self.fail_on = fail_on
+        self.statements = []
+
+    async def execute(self, statement, params=None):
+        sql = str(statement)
+        if "to_regclass" in sql:
+            return type("Result", (), {"scalar": lambda self: None})()
+        if self.fail_on in sql and "ATTACH" in sql:
+            raise RuntimeError("partition constraint violated")
+        self.statements.append(" ".join(sql.split()))
+
+    def begin_nested(self):
+        return _NullSavepoint()
+
+
+class _NullSavepoint:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+@pytest.mark.asyncio
+async def test_partition_creation_moves_default_rows_and_isolates_failures():
+    """Test each day's partition takes its rows from DEFAULT and a failing
+    day does not stop the others being created."""
+    service = PlaceChatRetentionService()
+    now = datetime(2026, 3, 9, 12, tzinfo=timezone.utc)
+    db = _FakePartitionSession(fail_on="place_chat_messages_p20260310")
+
+    with patch("app.services.place_chat_retention.settings.place_chat_partition_days_ahead", 2):
+        created = await service.ensure_partitions(db, now)
+
+    assert created == ["place_chat_messages_p20260309", "place_chat_messages_p20260311"]
+    assert any(s.startswith("WITH moved AS ( DELETE FROM place_chat_messages_default")
+               for s in db.statements)
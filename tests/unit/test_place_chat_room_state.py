@@ -0,0 +1,85 @@
+"""Unit tests for the cached place chat room state."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import event
+
+from app.database import engine
+from app.models import CheckIn, Place, PlaceChatMessage, User
+from app.services.place_chat_room_state import PlaceChatRoomStateCache
+
+
+async def _seed_room(session, now):
+    alice = User(phone="+15550006001", username="room_alice", is_verified=True)
+    bob = User(phone="+15550006002", username="room_bob", is_verified=True)
+    place = Place(name="Room Cafe")
+    session.add_all([alice, bob, place])
+    await session.flush()
+    session.add_all([
+        CheckIn(user_id=alice.id, place_id=place.id,
+                created_at=now - timedelta(hours=1), expires_at=now + timedelta(hours=1)),
+        # Inside the window but already expired
+        CheckIn(user_id=bob.id, place_id=place.id,
+                created_at=now - timedelta(hours=2), expires_at=now - timedelta(minutes=5)),
+        PlaceChatMessage(place_id=place.id, user_id=alice.id, text="hello",
+                         created_at=now - timedelta(minutes=30)),
+    ])
+    await session.commit()
+    return alice.id, bob.id, place.id
+
+
+@pytest.mark.asyncio
+async def test_summary_loads_once_then_updates_incrementally(test_session):
+    """Test a cold load followed by check-in and message events without queries."""
+    now = datetime.now(timezone.utc)
+    alice_id, bob_id, place_id = await _seed_room(test_session, now)
+    cache = PlaceChatRoomStateCache()
+
+    summary = await cache.get_summary(test_session, place_id, bob_id, now)
+    assert summary["active_users_count"] == 1
+    assert summary["has_joined"] is False
+    assert summary["last_message"] == "hello"
+
+    cache.apply({
+        "op": "checkin", "place_id": place_id, "checkin_id": 999, "user_id": bob_id,
+        "created_at": now.isoformat(), "expires_at": (now + timedelta(hours=1)).isoformat(),
+    })
+    cache.record_message({"place_id": place_id, "text": "hi bob",
+                          "created_at": now.isoformat()})
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        summary = await cache.get_summary(test_session, place_id, bob_id, now)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+    assert statements == []
+    assert summary["active_users_count"] == 2
+    assert summary["has_joined"] is True
+    assert summary["last_message"] == "hi bob"
+    assert summary["expires_at"] == now + timedelta(hours=12)
+
+
+@pytest.mark.asyncio
+async def test_expiry_and_invalidation(test_session):
+    """Test that check-ins expire on read and invalidation forces a reload."""
+    now = datetime.now(timezone.utc)
+    alice_id, _, place_id = await _seed_room(test_session, now)
+    cache = PlaceChatRoomStateCache()
+    await cache.get_summary(test_session, place_id, alice_id, now)
+
+    later = await cache.get_summary(test_session, place_id, alice_id, now + timedelta(hours=2))
+    assert later["active_users_count"] == 0
+    assert later["has_joined"] is False
+
+    await test_session.execute(CheckIn.__table__.delete())
+    await test_session.commit()
+    cache.apply({"op": "invalidate", "place_id": place_id})
+    summary = await cache.get_summary(test_session, place_id, alice_id, now)
+    assert summary["active_users_count"] == 0
@@ -0,0 +1,92 @@
+"""Unit tests for the in-process check-in presence index."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models import CheckIn, Place, User
+from app.services.presence_index import PresenceIndex
+
+
+NOW = datetime(2026, 1, 1, 12, tzinfo=timezone.utc)
+
+
+def _index():
+    index = PresenceIndex()
+    # place 1: user 10 active, user 11 checked in but expired; place 2: user 10
+    index.add(1, 10, 1, NOW - timedelta(hours=1), NOW + timedelta(hours=1), now=NOW)
+    index.add(2, 11, 1, NOW - timedelta(hours=2), NOW - timedelta(minutes=1), now=NOW)
+    index.add(3, 10, 2, NOW - timedelta(minutes=5), NOW + timedelta(hours=3), now=NOW)
+    return index
+
+
+def test_active_and_window_membership():
+    """Test active checks require an unexpired check-in, window checks do not."""
+    index = _index()
+
+    assert index.is_active(1, 10, NOW)
+    assert not index.is_active(1, 11, NOW)
+    assert index.in_window(1, 11, NOW)
+    assert not index.in_window(2, 11, NOW)
+    assert index.active_user_count(1, NOW) == 1
+    assert index.total_active_users(NOW) == 1
+    assert index.latest_checkin_at(1, NOW) == NOW - timedelta(hours=1)
+
+
+def test_present_users_newest_first_once_per_user():
+    """Test who's-here ordering, one entry per user, and duplicate events ignored."""
+    index = _index()
+    index.add(4, 12, 1, NOW - timedelta(minutes=10), NOW + timedelta(hours=1), now=NOW)
+    index.add(4, 12, 1, NOW - timedelta(minutes=10), NOW + timedelta(hours=1), now=NOW)
+    index.add(5, 10, 1, NOW - timedelta(minutes=20), NOW + timedelta(hours=1), now=NOW)
+
+    assert [cid for _, cid in index.present_users(1, NOW)] == [4, 5]
+    assert index.active_user_count(1, NOW) == 2
+
+
+def test_expiry_and_window_eviction():
+    """Test that check-ins deactivate at expires_at and leave at the window edge."""
+    index = _index()
+    later = NOW + timedelta(hours=2)
+
+    assert not index.is_active(1, 10, later)
+    assert index.is_active(2, 10, later)
+    assert index.in_window(1, 10, later)
+
+    much_later = NOW + timedelta(hours=12)
+    assert not index.in_window(1, 10, much_later)
+    assert index.latest_checkin_at(1, much_later) is None
+
+
+def test_remove_event():
+    """Test that deleting a check-in removes the user's presence."""
+    index = _index()
+    index.apply({"op": "remove", "checkin_id": 3})
+
+    assert not index.is_active(2, 10, NOW)
+    assert index.total_active_users(NOW) == 1
+    assert index.is_active(1, 10, NOW)
+
+
+@pytest.mark.asyncio
+async def test_confirm_falls_back_to_database_and_fills_index(test_session):
+    """Test a check-in the index never heard about is found in the database
+    and added to the index."""
+    user = User(phone="+15550006101", username="presence_late", is_verified=True)
+    place = Place(name="Late Event Cafe")
+    test_session.add_all([user, place])
+    await test_session.commit()
+    index = PresenceIndex()
+    await index.ensure_loaded()
+
+    # Written after the load, with no event published
+    now = datetime.now(timezone.utc)
+    test_session.add(CheckIn(user_id=user.id, place_id=place.id,
+                             created_at=now - timedelta(minutes=5),
+                             expires_at=now + timedelta(hours=1)))
+    await test_session.commit()
+
+    assert index.is_active(place.id, user.id) is False
+    assert await index.confirm(place.id, user.id) is True
+    assert index.is_active(place.id, user.id) is True
+    assert await index.confirm(place.id, user.id + 1) is False
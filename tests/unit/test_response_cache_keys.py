@@ -0,0 +1,26 @@
+"""Unit tests for response cache keys and route TTLs."""
+
+from unittest.mock import patch
+
+from app.response_cache import cache_key, route_ttl
+
+
+def test_cache_key_sorts_params_and_quantizes_coordinates():
+    """Test that nearby coordinates and reordered params share a key."""
+    first = cache_key("/places/nearby", [("lng", "46.675312"), ("lat", "24.713601"),
+                                         ("radius_m", "1000")])
+    second = cache_key("/places/nearby", [("radius_m", "1000"), ("lat", "24.71351"),
+                                          ("lng", "46.67541")])
+
+    assert first == second == "/places/nearby?lat=24.714&lng=46.675&radius_m=1000"
+    assert cache_key("/places/nearby", [("lat", "24.72")]) != first
+
+
+def test_route_ttl_matches_paths_and_prefixes():
+    """Test exact routes, prefix routes and uncached routes."""
+    ttls = {"/places/trending": 60, "/places/lookups/": 300}
+    with patch("app.response_cache.settings.response_cache_ttls", ttls):
+        assert route_ttl("/places/trending") == 60
+        assert route_ttl("/places/lookups/cities") == 300
+        assert route_ttl("/places/trending/extra") is None
+        assert route_ttl("/places/42") is None
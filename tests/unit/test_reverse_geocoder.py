@@ -0,0 +1,107 @@
+"""Unit tests for offline reverse geocoding over bundled boundaries."""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.place_data_service_v2 import EnhancedPlaceDataService
+from app.services.reverse_geocoder import ReverseGeocoder, fill_place_location
+from scripts.build_boundaries import build, simplify
+
+
+def _square(min_lng, min_lat, max_lng, max_lat):
+    return [[min_lng, min_lat], [max_lng, min_lat], [max_lng, max_lat], [min_lng, max_lat]]
+
+
+def _feature(name, ring, holes=(), **properties):
+    return {"type": "Feature", "properties": {"name": name, **properties},
+            "geometry": {"type": "Polygon", "coordinates": [ring + ring[:1], *holes]}}
+
+
+@pytest.fixture
+def geocoder(tmp_path):
+    layers = {
+        "country": [_feature("SA", _square(40, 20, 50, 30))],
+        "city": [
+            # Hole cut out around (46.0, 24.0)
+            _feature("Riyadh", _square(45, 23, 47, 25), holes=[_square(45.9, 23.9, 46.1, 24.1)],
+                     **{"ISO3166-1": "SA"}),
+            _feature("Dubai", _square(55, 25, 55.5, 25.5), **{"ISO3166-1": "AE"}),
+        ],
+        "neighborhood": [
+            _feature("Al Olaya", _square(46.6, 24.6, 46.8, 24.8)),
+            _feature("Olaya North", _square(46.65, 24.7, 46.75, 24.8)),
+        ],
+    }
+    paths = []
+    for level, features in layers.items():
+        path = tmp_path / f"{level}.geojson"
+        path.write_text(json.dumps({"type": "FeatureCollection", "features": features}))
+        paths.append((level, str(path)))
+    output = tmp_path / "boundaries.json"
+    output.write_text(json.dumps(build(paths, "name", "ISO3166-1", tolerance=0.001)))
+    return ReverseGeocoder(output)
+
+
+def test_lookup_picks_smallest_containing_boundary_per_level(geocoder):
+    """Test nested neighborhoods, polygon holes and country fallback."""
+    assert geocoder.lookup(24.75, 46.7) == {
+        "country": "SA", "city": "Riyadh", "neighborhood": "Olaya North"}
+    assert geocoder.lookup(24.65, 46.7)["neighborhood"] == "Al Olaya"
+    assert geocoder.lookup(24.0, 46.0) == {"country": "SA", "city": None, "neighborhood": None}
+    # No country polygon here, so the city's country code is used
+    assert geocoder.lookup(25.2, 55.2) == {"country": "AE", "city": "Dubai", "neighborhood": None}
+    assert geocoder.lookup(0, 0) == {"country": None, "city": None, "neighborhood": None}
+
+
+def test_fill_place_location_only_fills_gaps(geocoder):
+    """Test existing place fields are kept and missing ones filled."""
+    place = SimpleNamespace(latitude=24.75, longitude=46.7, country=None,
+                            city="Ar Riyad", neighborhood=None)
+    assert fill_place_location(place, geocoder) is True
+    assert (place.country, place.city, place.neighborhood) == ("SA", "Ar Riyad", "Olaya North")
+    assert fill_place_location(place, geocoder) is False
+
+
+def test_simplify_drops_collinear_points():
+    """Test Douglas-Peucker keeps corners and drops points within tolerance."""
+    line = [(0, 0), (1, 0.0001), (2, 0), (2, 2)]
+    assert simplify(line, 0.001) == [(0, 0), (2, 0), (2, 2)]
+
+
+@pytest.mark.asyncio
+async def test_service_reverse_geocode_asks_nominatim_only_for_gaps(geocoder, monkeypatch):
+    """Test Nominatim is off by default, and once enabled is skipped when
+    every level is local and only fills the levels the boundaries miss."""
+    service = EnhancedPlaceDataService()
+    calls = []
+
+    async def nominatim(lat, lon):
+        calls.append((lat, lon))
+        return {"country": "Saudi Arabia", "city": "Ar Riyad", "neighborhood": "Al Malaz"}
+
+    monkeypatch.setattr("app.services.place_data_service_v2.reverse_geocoder", geocoder)
+    monkeypatch.setattr(service, "_nominatim_reverse_details", nominatim)
+
+    assert await service.reverse_geocode_details(24.3, 46.2) == {
+        "country": "SA", "city": "Riyadh", "neighborhood": None}
+    assert calls == []
+
+    monkeypatch.setattr(
+        "app.services.place_data_service_v2.settings.reverse_geocode_nominatim_fallback", True)
+    assert await service.reverse_geocode_details(24.75, 46.7) == {
+        "country": "SA", "city": "Riyadh", "neighborhood": "Olaya North"}
+    assert calls == []
+
+    assert await service.reverse_geocode_details(24.3, 46.2) == {
+        "country": "SA", "city": "Riyadh", "neighborhood": "Al Malaz"}
+    assert calls == [(24.3, 46.2)]
+
+
+def test_fill_place_location_survives_unreadable_boundaries(tmp_path):
+    """Test a missing boundaries file leaves the place untouched instead of raising."""
+    place = SimpleNamespace(latitude=24.75, longitude=46.7, country=None,
+                            city=None, neighborhood=None)
+    assert fill_place_location(place, ReverseGeocoder(tmp_path / "missing.json")) is False
+    assert place.city is None
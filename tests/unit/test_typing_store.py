@@ -0,0 +1,69 @@
+"""Unit tests for the in-memory typing indicator store."""
+
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+
+from app.services.typing_store import TypingStateStore, TYPING_TOPIC
+
+
+def test_typing_state_expires():
+    """Test that typing state is dropped once its TTL has passed."""
+    store = TypingStateStore(ttl_seconds=5)
+
+    store.apply(1, 10, True)
+    assert store.is_typing(1, 10) is True
+
+    store.apply(1, 10, True, until=datetime.now(timezone.utc) - timedelta(seconds=1))
+    assert store.get_typing_until(1, 10) is None
+    assert store.is_typing(1, 10) is False
+
+
+def test_typing_stop_clears_state():
+    """Test that a stop frame clears the state immediately."""
+    store = TypingStateStore()
+
+    store.apply(1, 10, True)
+    store.apply(1, 10, False)
+
+    assert store.is_typing(1, 10) is False
+
+
+def test_broadcast_is_rate_limited():
+    """Test that repeated typing frames only broadcast on change or after the interval."""
+    store = TypingStateStore(rebroadcast_seconds=60)
+
+    # Stop without a prior start is not announced
+    assert store.should_broadcast(1, 10, False) is False
+    assert store.should_broadcast(1, 10, True) is True
+    assert store.should_broadcast(1, 10, True) is False
+    assert store.should_broadcast(1, 10, False) is True
+    assert store.should_broadcast(1, 10, False) is False
+
+
+def test_prune_removes_expired_entries():
+    """Test that prune drops only expired entries."""
+    store = TypingStateStore()
+    store.apply(1, 10, True, until=datetime.now(timezone.utc) - timedelta(seconds=1))
+    store.apply(1, 11, True)
+
+    assert store.prune() == 1
+    assert store.is_typing(1, 11) is True
+
+
+@pytest.mark.asyncio
+async def test_update_publishes_event():
+    """Test that update publishes a typing event only when it passes the rate limit."""
+    store = TypingStateStore(rebroadcast_seconds=60)
+
+    with patch("app.services.typing_store.event_bus.publish", new_callable=AsyncMock) as publish:
+        assert await store.update(5, 10, True) is True
+        assert await store.update(5, 10, True) is False
+
+    publish.assert_awaited_once()
+    topic, payload = publish.await_args.args
+    assert topic == TYPING_TOPIC
+    assert payload["thread_id"] == 5
+    assert payload["user_id"] == 10
+    assert payload["typing"] is True
+    assert payload["until"] is not None